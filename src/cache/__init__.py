@@ -0,0 +1,2 @@
+from .response_cache import response_cache, CachedResponse, ResponseCache  # noqa:F401
+from .single_flight import SingleFlight  # noqa:F401
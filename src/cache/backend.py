@@ -0,0 +1,113 @@
+"""
+Storage backends for the response cache.
+
+The in-memory backend is local to a single process. If the REST API runs with multiple workers,
+or if the connectors should be able to invalidate the cache of the REST API, a shared backend
+such as Redis should be used.
+"""
+
+import abc
+import collections
+import threading
+import time
+
+
+class CacheBackend(abc.ABC):
+    """A key-value store with expiring keys"""
+
+    @abc.abstractmethod
+    def get(self, key: str) -> bytes | None:
+        pass
+
+    @abc.abstractmethod
+    def set(self, key: str, value: bytes, ttl_seconds: int):
+        pass
+
+    @abc.abstractmethod
+    def increment(self, key: str) -> int:
+        """Atomically increment a (non-expiring) counter, returning the new value."""
+
+    @abc.abstractmethod
+    def get_counter(self, key: str) -> int:
+        pass
+
+    @abc.abstractmethod
+    def clear(self):
+        pass
+
+
+class InMemoryCache(CacheBackend):
+    """A thread-safe, bounded cache, evicting the least recently used keys first."""
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._values: collections.OrderedDict[str, tuple[float, bytes]] = collections.OrderedDict()
+        self._counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            if key not in self._values:
+                return None
+            expires_at, value = self._values[key]
+            if expires_at < time.monotonic():
+                del self._values[key]
+                return None
+            self._values.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl_seconds: int):
+        with self._lock:
+            self._values[key] = (time.monotonic() + ttl_seconds, value)
+            self._values.move_to_end(key)
+            while len(self._values) > self.max_size:
+                self._values.popitem(last=False)
+
+    def increment(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def get_counter(self, key: str) -> int:
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+            self._counters.clear()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+class RedisCache(CacheBackend):
+    """A cache shared between processes, stored on a Redis server."""
+
+    def __init__(self, url: str, prefix: str = "aiod:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError(
+                "The redis cache backend requires the redis package. Please install it, or "
+                "configure another cache backend."
+            ) from e
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> bytes | None:
+        return self._client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl_seconds: int):
+        self._client.set(self.prefix + key, value, ex=ttl_seconds)
+
+    def increment(self, key: str) -> int:
+        return self._client.incr(self.prefix + key)
+
+    def get_counter(self, key: str) -> int:
+        value = self._client.get(self.prefix + key)
+        return int(value) if value is not None else 0
+
+    def clear(self):
+        for key in self._client.scan_iter(match=self.prefix + "*"):
+            self._client.delete(key)
@@ -0,0 +1,117 @@
+"""
+Caching of serialized GET responses.
+
+Cached responses are stored per resource type, under a generation number. Invalidating a resource
+type increments its generation, so that all cached responses of that type (single resources and
+lists) become unreachable and eventually expire or get evicted. This works the same for a local
+and for a shared backend.
+"""
+
+import dataclasses
+import hashlib
+import json
+import threading
+
+from cache.backend import CacheBackend, InMemoryCache, RedisCache
+from config import CACHE_CONFIG
+
+
+@dataclasses.dataclass
+class CachedResponse:
+    body: bytes
+    headers: dict[str, str]
+    media_type: str = "application/json"
+    status_code: int = 200
+
+    def encode(self) -> bytes:
+        metadata = json.dumps(
+            {
+                "headers": self.headers,
+                "media_type": self.media_type,
+                "status_code": self.status_code,
+            }
+        )
+        return metadata.encode("utf-8") + b"\n" + self.body
+
+    @classmethod
+    def decode(cls, encoded: bytes) -> "CachedResponse":
+        metadata, body = encoded.split(b"\n", 1)
+        return cls(body=body, **json.loads(metadata))
+
+
+class ResponseCache:
+    def __init__(self, backend: CacheBackend | None, ttl_seconds: int = 300):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def key(self, resource_type: str, request_key: str) -> str:
+        """
+        The cache key of a request, under the current generation of the resource type.
+
+        The key should be computed before fetching the response, and the same key should be used
+        to store it: if the resource type is invalidated during the fetch, the (possibly stale)
+        response is then stored under the old generation, where it will never be read.
+        """
+        generation = self.backend.get_counter(f"generation:{resource_type}") if self.backend else 0
+        hashed = hashlib.sha256(request_key.encode("utf-8")).hexdigest()
+        return f"response:{resource_type}:{generation}:{hashed}"
+
+    def get(self, key: str) -> CachedResponse | None:
+        if self.backend is None:
+            return None
+        encoded = self.backend.get(key)
+        with self._lock:
+            if encoded is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return CachedResponse.decode(encoded)
+
+    def set(self, key: str, response: CachedResponse):
+        if self.backend is not None:
+            self.backend.set(key, response.encode(), self.ttl_seconds)
+
+    def invalidate(self, resource_type: str):
+        """Invalidate all cached responses of this resource type"""
+        if self.backend is not None:
+            self.backend.increment(f"generation:{resource_type}")
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def statistics(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "backend": type(self.backend).__name__ if self.backend is not None else None,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def create_response_cache(config: dict) -> ResponseCache:
+    backend_name = config.get("backend", "memory")
+    backend: CacheBackend | None
+    if backend_name == "memory":
+        backend = InMemoryCache(max_size=config.get("max_size", 10000))
+    elif backend_name == "redis":
+        backend = RedisCache(url=config["url"])
+    elif backend_name == "none":
+        backend = None
+    else:
+        raise ValueError(f"Unknown cache backend {backend_name}. Expected memory, redis or none.")
+    return ResponseCache(backend, ttl_seconds=config.get("ttl_seconds", 300))
+
+
+response_cache = create_response_cache(CACHE_CONFIG)
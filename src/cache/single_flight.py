@@ -0,0 +1,55 @@
+"""
+Coalescing of identical concurrent requests.
+
+If many clients request the same resource at the same time (for instance directly after it expired
+from the cache), only the first request (the leader) fetches it from the database. The other
+requests wait for the leader and share its result.
+"""
+
+import threading
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call(Generic[T]):
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: T | None = None
+        self.exception: BaseException | None = None
+
+
+class SingleFlight(Generic[T]):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, _Call[T]] = {}
+
+    def do(self, key: str, function: Callable[[], T]) -> T:
+        """
+        Execute the function, unless a call with the same key is already in flight. In that case,
+        wait for it and return its result (or raise its exception).
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+        if not is_leader:
+            call.done.wait()
+            if call.exception is not None:
+                raise call.exception
+            return call.result  # type: ignore[return-value]
+        try:
+            call.result = function()
+            return call.result
+        except BaseException as e:
+            call.exception = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
@@ -6,3 +6,6 @@ with open(pathlib.Path(__file__).parent / "config.toml", "rb") as fh:
 
 DB_CONFIG = CONFIG.get("database", {})
 KEYCLOAK_CONFIG = CONFIG.get("keycloak", {})
+CACHE_CONFIG = CONFIG.get("cache", {})
+SEARCH_CONFIG = CONFIG.get("search", {})
+OAI_PMH_CONFIG = CONFIG.get("oai_pmh", {})
@@ -0,0 +1,66 @@
+"""
+Batch job recomputing the clusters of near-duplicate resources, for instance after the
+synchronization of a platform. The clusters are also updated on each created or updated resource,
+but they are not split when a resource is changed or deleted.
+"""
+
+import argparse
+import logging
+import sys
+
+from sqlalchemy import select
+from sqlmodel import Session
+
+import routers
+from database import near_duplicates
+from database.setup import sqlmodel_engine
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Recompute the clusters of near-duplicates.")
+    parser.add_argument(
+        "-r",
+        "--resource",
+        action="append",
+        help="The plural name of a resource type, such as 'datasets'. Can be repeated. Defaults "
+        "to all resource types with a name and description.",
+    )
+    return parser.parse_args()
+
+
+def _texts(session: Session, resource_class):
+    """The (identifier, text) of all resources, fetching the rows in batches"""
+    query = select(
+        resource_class.identifier, resource_class.name, resource_class.description
+    ).execution_options(yield_per=10000)
+    for row in session.execute(query):
+        yield row.identifier, near_duplicates.duplicate_text(row)
+
+
+def main():
+    args = _parse_args()
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s.%(msecs)03d %(levelname)s %(module)s - %(funcName)s: %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    resource_routers = [
+        router
+        for router in routers.resource_routers
+        if router.searchable and (not args.resource or router.resource_name_plural in args.resource)
+    ]
+    if args.resource and len(resource_routers) != len(args.resource):
+        names = [router.resource_name_plural for router in routers.resource_routers]
+        sys.exit(f"Unknown resource type. Expected some of {', '.join(names)}.")
+    engine = sqlmodel_engine(rebuild_db="never")
+    for router in resource_routers:
+        logging.info(f"Computing the near-duplicate {router.resource_name_plural}")
+        with Session(engine) as session:
+            texts = _texts(session, router.resource_class)
+            near_duplicates.rebuild(session, router.resource_name, texts)
+            session.commit()
+    logging.info("Done")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,7 @@ from typing import Optional
 from sqlmodel import Session
 
 import routers
+from cache import response_cache
 from connectors.abstract.resource_connector import ResourceConnector, RESOURCE
 from connectors.record_error import RecordError
 from connectors.resource_with_relations import ResourceWithRelations
@@ -188,6 +189,9 @@ def main():
     with open(state_path, "w") as f:
         session.commit()
         json.dump(state, f, indent=4)
+    # The router already invalidates the cache on each created resource. This is only effective
+    # for the REST API if the cache backend is shared between processes.
+    response_cache.invalidate(router.resource_name)
     logging.info("Done")
 
 
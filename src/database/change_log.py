@@ -0,0 +1,114 @@
+"""
+An append-only log of the created, updated and deleted resources, so that a mirror or a search
+indexer can synchronize incrementally, reading only the changes since its previous
+synchronization.
+
+A change is written in the same transaction as the change itself (an outbox), so that the log
+contains exactly the committed changes. A deleted resource remains in the log as a tombstone. The
+date_modified of a change is the date_modified of the resource, or the time of deletion.
+
+The changes are numbered by a sequence, which is used as cursor. The number is taken by
+incrementing the single row of the change_sequence table, as the last statement before the
+transaction commits. The row stays locked until the commit, so that the changes are numbered in
+the order in which they are committed: a reader never skips a change that was committed after it
+read a later one.
+"""
+
+import datetime
+import enum
+from typing import Iterable
+
+from sqlalchemy import BigInteger, Column, Index, func, insert, update
+from sqlalchemy.dialects import mysql, sqlite
+from sqlmodel import Field, SQLModel, Session, select
+
+from database.model.field_length import NORMAL, SHORT
+
+
+class Operation(str, enum.Enum):
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+
+
+class Change(SQLModel, table=True):  # type: ignore [call-arg]
+    __tablename__ = "change_log"
+    __table_args__ = (Index("ix_change_log_resource", "resource_type", "resource_identifier"),)
+
+    # The number of the change in the sequence, not autoincremented
+    identifier: int = Field(sa_column=Column(BigInteger, primary_key=True, autoincrement=False))
+    resource_type: str = Field(max_length=SHORT)
+    resource_identifier: int = Field()
+    operation: str = Field(max_length=SHORT, description="create, update or delete")
+    date_modified: datetime.datetime = Field()
+    platform: str | None = Field(max_length=NORMAL, default=None)
+    platform_identifier: str | None = Field(max_length=NORMAL, default=None)
+
+
+class ChangeSequence(SQLModel, table=True):  # type: ignore [call-arg]
+    """The number of the last change, in a single row"""
+
+    __tablename__ = "change_sequence"
+
+    identifier: int = Field(default=1, primary_key=True)
+    value: int = Field(sa_column=Column(BigInteger, nullable=False))
+
+
+def record(session: Session, resource_type: str, resource, operation: Operation):
+    """
+    Log a change of a resource. This locks the sequence until the transaction ends, so it should
+    be the last statement before the caller commits.
+    """
+    aiod_entry = getattr(resource, "aiod_entry", None)
+    if operation is not Operation.DELETE and aiod_entry is not None:
+        date_modified = aiod_entry.date_modified
+    else:
+        date_modified = datetime.datetime.utcnow()
+    session.execute(
+        insert(Change).values(
+            identifier=_next_sequence(session),
+            resource_type=resource_type,
+            resource_identifier=resource.identifier,
+            operation=operation.value,
+            date_modified=date_modified,
+            platform=getattr(resource, "platform", None),
+            platform_identifier=getattr(resource, "platform_identifier", None),
+        )
+    )
+
+
+def _next_sequence(session: Session) -> int:
+    """
+    Increment the sequence, locking its row until the transaction ends, and return the new value.
+    The sequence is created on the first change, continuing after the changes already logged.
+    """
+    first = select(func.coalesce(func.max(Change.identifier), 0) + 1).scalar_subquery()
+    dialect = session.get_bind().dialect.name
+    if dialect == "mysql":
+        statement = (
+            mysql.insert(ChangeSequence)
+            .values(identifier=1, value=first)
+            .on_duplicate_key_update(value=ChangeSequence.value + 1)
+        )
+    elif dialect == "sqlite":
+        statement = (
+            sqlite.insert(ChangeSequence)
+            .values(identifier=1, value=first)
+            .on_conflict_do_update(
+                index_elements=["identifier"], set_={"value": ChangeSequence.value + 1}
+            )
+        )
+    else:
+        statement = update(ChangeSequence).values(value=ChangeSequence.value + 1)
+    session.execute(statement)
+    return session.scalar(select(ChangeSequence.value).where(ChangeSequence.identifier == 1))
+
+
+def changes(
+    session: Session, since: int, limit: int, resource_types: Iterable[str] | None = None
+) -> list[Change]:
+    """The changes after the change with identifier since, in the order in which they occurred"""
+    query = select(Change).where(Change.identifier > since).order_by(Change.identifier)
+    if resource_types is not None:
+        query = query.where(Change.resource_type.in_(list(resource_types)))
+    return session.scalars(query.limit(limit)).all()
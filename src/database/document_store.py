@@ -0,0 +1,87 @@
+"""
+Denormalised store of serialized resources.
+
+Serializing a resource touches many tables (the link tables of its relationships, the
+aiod_entry, the distributions, etc.). The document store holds the serialized json of each
+resource, one row per resource type, identifier and schema, so that a page of resources can be
+assembled by concatenating the stored documents.
+
+Only the aiod schema is stored. It refers to related resources by identifier, so that a document
+only changes when the resource itself changes. The other schemas embed the names of related
+resources, such as the creators, and would become outdated when those are renamed.
+
+The document of a resource is deleted in the same transaction that creates or updates the
+resource, and rendered by the first read. Each document holds the date_modified of the resource it
+was rendered from, so that a document that is outdated (for instance because the resource was
+changed by another process) is rendered again on read.
+"""
+
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy import Column, LargeBinary, delete
+from sqlalchemy.dialects import mysql
+from sqlmodel import Field, SQLModel, Session, select
+
+from database.model.field_length import SHORT
+
+
+class ResourceDocument(SQLModel, table=True):  # type: ignore [call-arg]
+    __tablename__ = "resource_document"
+
+    resource_type: str = Field(max_length=SHORT, primary_key=True)
+    identifier: int = Field(primary_key=True)
+    schema_name: str = Field(max_length=SHORT, primary_key=True)
+    date_modified: datetime | None = Field(default=None)
+    content: bytes = Field(
+        sa_column=Column(LargeBinary().with_variant(mysql.LONGBLOB(), "mysql"), nullable=False)
+    )
+
+
+def get_documents(
+    session: Session, resource_type: str, schema: str, identifiers: Iterable[int]
+) -> dict[int, ResourceDocument]:
+    query = select(ResourceDocument).where(
+        ResourceDocument.resource_type == resource_type,
+        ResourceDocument.schema_name == schema,
+        ResourceDocument.identifier.in_(list(identifiers)),
+    )
+    return {document.identifier: document for document in session.scalars(query)}
+
+
+def store_documents(session: Session, documents: Iterable[ResourceDocument]):
+    """
+    Insert or replace the documents, loading the existing documents in a single query. The caller
+    is responsible for committing.
+    """
+    documents = list(documents)
+    existing = set()
+    for resource_type in {document.resource_type for document in documents}:
+        identifiers = [d.identifier for d in documents if d.resource_type == resource_type]
+        query = select(ResourceDocument).where(
+            ResourceDocument.resource_type == resource_type,
+            ResourceDocument.identifier.in_(identifiers),
+        )
+        existing |= {_key(document) for document in session.scalars(query)}
+    for document in documents:
+        if _key(document) in existing:
+            session.merge(document)  # Found in the identity map, without querying
+        else:
+            session.add(document)
+
+
+def _key(document: ResourceDocument) -> tuple[str, int, str]:
+    return document.resource_type, document.identifier, document.schema_name
+
+
+def delete_documents(
+    session: Session, resource_type: str, identifiers: Iterable[int] | None = None
+):
+    """
+    Delete the documents of given identifiers in all schemas, or all documents of this
+    resource type if identifiers is None. The caller is responsible for committing.
+    """
+    statement = delete(ResourceDocument).where(ResourceDocument.resource_type == resource_type)
+    if identifiers is not None:
+        statement = statement.where(ResourceDocument.identifier.in_(list(identifiers)))
+    session.execute(statement)
@@ -0,0 +1,172 @@
+"""
+Queries on the geographic coordinates of the locations of resources: within a bounding box,
+within a radius, and the nearest resources to a point.
+
+The geo table has an indexed grid cell (see database/model/geo_grid.py), so that the candidate
+locations can be selected without a GIS server. The candidates within a radius are then checked
+on their great-circle distance in the same query, so that only the matching locations are read.
+
+The grid cell is set when a location is written. The locations written before the grid cell was
+introduced are backfilled when the application starts, see backfill_grid_cells.
+"""
+
+import math
+from typing import Type
+
+import numpy as np
+from sqlalchemy import bindparam, func, inspect, or_, text, update
+from sqlalchemy.engine import Connection
+from sqlmodel import SQLModel, Session, select
+
+from database.model import geo_grid
+from database.model.ai_resource.location import GeoORM, LocationORM
+
+# The radius of the first search for the nearest resources, multiplied until enough are found
+_INITIAL_RADIUS_KM = 100.0
+_RADIUS_FACTOR = 4.0
+_HALF_CIRCUMFERENCE_KM = np.pi * geo_grid.EARTH_RADIUS_KM
+_RADIANS_PER_DEGREE = math.pi / 180
+
+# The number of locations of which the grid cell is backfilled per statement
+_BACKFILL_BATCH_SIZE = 10_000
+
+
+def location_column(resource_class: Type[SQLModel]):
+    """The column referring to the location of this resource class, or None"""
+    for relationship in inspect(resource_class).relationships:
+        if relationship.mapper.class_ is LocationORM and len(relationship.local_columns) == 1:
+            (column,) = relationship.local_columns
+            return getattr(resource_class, column.key)
+    return None
+
+
+def in_bounding_box(
+    min_latitude: float, min_longitude: float, max_latitude: float, max_longitude: float
+):
+    """
+    Select the identifiers of the locations in a bounding box. If min_longitude is larger than
+    max_longitude, the box crosses the antimeridian.
+    """
+    return (
+        select(LocationORM.identifier)
+        .join(GeoORM, LocationORM.geo_identifier == GeoORM.identifier)
+        .where(*_in_box(min_latitude, min_longitude, max_latitude, max_longitude))
+    )
+
+
+def within_radius(latitude: float, longitude: float, radius_km: float):
+    """
+    Select the identifiers of the locations within a radius of a point. The candidates are
+    selected on their grid cell, and checked on their great-circle distance, in the same query.
+    """
+    box = geo_grid.bounding_box(latitude, longitude, radius_km)
+    return in_bounding_box(*box).where(_haversine(latitude, longitude) <= _max_haversine(radius_km))
+
+
+def nearest(
+    session: Session, resource_class: Type[SQLModel], latitude: float, longitude: float, k: int
+) -> list[tuple[int, float]]:
+    """
+    The (identifier, distance in km) of the k resources nearest to a point, the nearest first.
+    The radius of the search grows until k resources are found, so that a query in a dense area
+    only reads the nearby locations. The resources are ordered and limited by the database.
+    """
+    column = location_column(resource_class)
+    haversine = _haversine(latitude, longitude)
+    radius_km = _INITIAL_RADIUS_KM
+    while True:
+        box = geo_grid.bounding_box(latitude, longitude, radius_km)
+        query = (
+            select(resource_class.identifier, GeoORM.latitude, GeoORM.longitude)
+            .join(LocationORM, column == LocationORM.identifier)
+            .join(GeoORM, LocationORM.geo_identifier == GeoORM.identifier)
+            .where(*_in_box(*box), haversine <= _max_haversine(radius_km))
+            .order_by(haversine, resource_class.identifier)
+            .limit(k)
+        )
+        rows = session.execute(query).all()
+        if len(rows) >= k or radius_km >= _HALF_CIRCUMFERENCE_KM:
+            break
+        radius_km *= _RADIUS_FACTOR
+    if not rows:
+        return []
+    identifiers, latitudes, longitudes = zip(*rows)
+    distances = geo_grid.distances_km(
+        latitude, longitude, np.array(latitudes, dtype=float), np.array(longitudes, dtype=float)
+    )
+    return list(zip(identifiers, distances.tolist()))
+
+
+def _in_box(min_latitude: float, min_longitude: float, max_latitude: float, max_longitude: float):
+    """The WHERE clauses on the geo table of the locations in a bounding box"""
+    cells = geo_grid.cell_ranges(min_latitude, min_longitude, max_latitude, max_longitude)
+    if min_longitude <= max_longitude:
+        longitude = GeoORM.longitude.between(min_longitude, max_longitude)
+    else:
+        longitude = or_(GeoORM.longitude >= min_longitude, GeoORM.longitude <= max_longitude)
+    return [
+        or_(*[GeoORM.grid_cell.between(first, last) for first, last in cells]),
+        GeoORM.latitude.between(min_latitude, max_latitude),
+        longitude,
+    ]
+
+
+def _haversine(latitude: float, longitude: float):
+    """
+    The haversine of the central angle between a point and the coordinates of the geo table, as a
+    SQL expression. It increases with the great-circle distance, so that it can be compared and
+    ordered on without the arcsine.
+    """
+    latitude_rad = math.radians(latitude)
+    geo_latitude_rad = GeoORM.latitude * _RADIANS_PER_DEGREE
+    sin_latitude = func.sin((geo_latitude_rad - latitude_rad) / 2)
+    sin_longitude = func.sin((GeoORM.longitude - longitude) * _RADIANS_PER_DEGREE / 2)
+    return (
+        sin_latitude * sin_latitude
+        + math.cos(latitude_rad) * func.cos(geo_latitude_rad) * sin_longitude * sin_longitude
+    )
+
+
+def _max_haversine(radius_km: float) -> float:
+    """The haversine of the central angle of a radius"""
+    angle = min(radius_km / geo_grid.EARTH_RADIUS_KM, math.pi)
+    return math.sin(angle / 2) ** 2
+
+
+def backfill_grid_cells(connection: Connection) -> int:
+    """
+    Add the grid_cell column to a geo table that was created without it, and set the grid cell of
+    the locations that have coordinates but no grid cell. Returns the number of locations updated.
+    The caller is responsible for committing.
+    """
+    table = GeoORM.__table__
+    columns = {column["name"] for column in inspect(connection).get_columns(table.name)}
+    if "grid_cell" not in columns:
+        connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN grid_cell BIGINT"))
+        for index in table.indexes:
+            if "grid_cell" in index.columns:
+                index.create(connection)
+    query = (
+        select(GeoORM.identifier, GeoORM.latitude, GeoORM.longitude)
+        .where(
+            GeoORM.grid_cell.is_(None),
+            GeoORM.latitude.is_not(None),
+            GeoORM.longitude.is_not(None),
+        )
+        .order_by(GeoORM.identifier)
+        .limit(_BACKFILL_BATCH_SIZE)
+    )
+    statement = (
+        update(table)
+        .where(table.c.identifier == bindparam("geo_identifier"))
+        .values(grid_cell=bindparam("cell"))
+    )
+    updated = 0
+    while rows := connection.execute(query).all():
+        cells = [
+            {"geo_identifier": identifier, "cell": geo_grid.cell(latitude, longitude)}
+            for identifier, latitude, longitude in rows
+        ]
+        connection.execute(statement, cells)
+        updated += len(cells)
+    return updated
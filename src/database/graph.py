@@ -0,0 +1,102 @@
+"""
+Traversal of the graphs formed by self-referential relationships, such as has_part and
+is_part_of, using recursive common table expressions. A traversal is a single query, however
+deep the graph, instead of a request per hop.
+
+The edges of a graph are given as a selectable with the columns parent and child. The recursive
+part carries the depth of each row, and stops at max_depth, which also ends the recursion on
+cyclic graphs. The number of rows returned by a traversal is limited to MAX_ROWS.
+"""
+
+from sqlalchemy import String, cast, func, literal, select
+from sqlalchemy.sql import Selectable
+from sqlmodel import Session
+
+MAX_DEPTH = 10
+
+# The maximum number of rows returned by a traversal
+MAX_ROWS = 100_000
+
+# The length of the column holding the path of a traversal. MySQL derives the type of the column
+# of a recursive CTE from its non-recursive part, so the initial path is cast to this length.
+_PATH_LENGTH = 1000
+
+
+def descendants(
+    session: Session,
+    edges: Selectable,
+    start: int,
+    max_depth: int,
+    reverse: bool = False,
+    limit: int | None = None,
+) -> list[tuple[int, int]]:
+    """
+    The (node, depth) of the nodes reachable from the start node within max_depth hops, ordered
+    by depth and node, at most limit (and at most MAX_ROWS) nodes. If reverse is True, the edges
+    are followed from child to parent, giving the ancestors of the start node.
+    """
+    edges_cte = edges.cte("edges")
+    source, target = (
+        (edges_cte.c.child, edges_cte.c.parent)
+        if reverse
+        else (edges_cte.c.parent, edges_cte.c.child)
+    )
+    initial = select(target.label("node"), literal(1).label("depth")).where(source == start)
+    traversal = initial.cte("traversal", recursive=True)
+    traversal = traversal.union(
+        select(target, traversal.c.depth + 1)
+        .join(traversal, source == traversal.c.node)
+        .where(traversal.c.depth < max_depth)
+    )
+    depth = func.min(traversal.c.depth)
+    query = (
+        select(traversal.c.node, depth)
+        .where(traversal.c.node != start)
+        .group_by(traversal.c.node)
+        .order_by(depth, traversal.c.node)
+        .limit(MAX_ROWS if limit is None else min(limit, MAX_ROWS))
+    )
+    return [(node, depth) for node, depth in session.execute(query)]
+
+
+def shortest_path(
+    session: Session, edges: Selectable, start: int, end: int, max_depth: int
+) -> list[int] | None:
+    """
+    The nodes of a shortest path from start to end, including both, following the edges from
+    parent to child. None if there is no path within max_depth hops.
+    """
+    if start == end:
+        return [start]
+    edges_cte = edges.cte("edges")
+    child = cast(edges_cte.c.child, String(_PATH_LENGTH))
+    initial = select(
+        edges_cte.c.child.label("node"),
+        literal(1).label("depth"),
+        cast(f"/{start}/", String(_PATH_LENGTH)).concat(child).concat("/").label("path"),
+    ).where(edges_cte.c.parent == start)
+    traversal = initial.cte("traversal", recursive=True)
+    traversal = traversal.union_all(
+        select(
+            edges_cte.c.child,
+            traversal.c.depth + 1,
+            traversal.c.path.concat(child).concat("/"),
+        )
+        .join(traversal, edges_cte.c.parent == traversal.c.node)
+        .where(
+            traversal.c.depth < max_depth,
+            traversal.c.node != end,
+            # Do not visit a node twice on the same path
+            traversal.c.path.notlike(literal("%/").concat(child).concat("/%")),
+        )
+    )
+    query = (
+        select(traversal.c.path)
+        .where(traversal.c.node == end)
+        .order_by(traversal.c.depth, traversal.c.path)
+        .limit(1)
+    )
+    path = session.scalar(query)
+    if path is None:
+        return None
+    return [int(node) for node in path.strip("/").split("/")]
@@ -33,6 +33,7 @@ class AIAssetBase(AIResourceBase, metaclass=abc.ABCMeta):
         description="The datetime (utc) on which this AIAsset was first published on an external "
         "platform. ",
         default=None,
+        index=True,
         schema_extra={"example": "2022-01-01T15:15:00.000"},
     )
     is_accessible_for_free: bool = Field(
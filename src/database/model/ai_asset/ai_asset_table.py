@@ -5,5 +5,6 @@ class AIAssetTable(SQLModel, table=True):  # type: ignore [call-arg]
     __tablename__ = "ai_asset"
     identifier: int = Field(default=None, primary_key=True)
     type: str = Field(
-        description="The name of the table of the asset. E.g. 'organisation' or 'member'"
+        index=True,
+        description="The name of the table of the asset. E.g. 'organisation' or 'member'",
     )
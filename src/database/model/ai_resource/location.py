@@ -1,7 +1,10 @@
 from typing import Optional
 
+from sqlalchemy import BigInteger, Column, event
 from sqlmodel import SQLModel, Field, Relationship
 
+from database.model import geo_grid
+
 from database.model.field_length import NORMAL, SHORT
 from database.model.relationships import ResourceRelationshipSingle
 from database.model.serializers import CastDeserializer
@@ -27,6 +30,18 @@ class GeoBase(SQLModel):
 class GeoORM(GeoBase, table=True):  # type: ignore [call-arg]
     __tablename__ = "geo"
     identifier: int | None = Field(primary_key=True)
+    grid_cell: int | None = Field(
+        default=None,
+        sa_column=Column(BigInteger, index=True),
+        description="The cell of a grid over the globe, used as spatial index. Computed from the "
+        "latitude and longitude.",
+    )
+
+
+@event.listens_for(GeoORM, "before_insert")
+@event.listens_for(GeoORM, "before_update")
+def _set_grid_cell(mapper, connection, geo: GeoORM):
+    geo.grid_cell = geo_grid.cell(geo.latitude, geo.longitude)
 
 
 class Geo(GeoBase):
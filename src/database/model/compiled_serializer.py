@@ -0,0 +1,92 @@
+"""
+Fast serialization of ORM objects into json-compatible dictionaries.
+
+Serializing using `ResourceRead.from_orm` calls the GetterDict for every attribute of every
+object, after which Pydantic validates the complete Read model (and FastAPI validates it again
+against the response_model). For list endpoints, this dominates the response time.
+
+A compiled serializer walks the fields of the Read class (and of its nested classes) only once,
+deciding per field how it should be obtained (directly, or using the Serializer of the
+RelationshipConfig) and how it should be converted to json. Serializing an object then only
+executes these steps, without any validation. The result is identical to
+`jsonable_encoder(ResourceRead.from_orm(obj), exclude_none=True)`.
+"""
+
+import datetime
+import enum
+import functools
+from typing import Any, Callable, Type
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from pydantic.fields import ModelField, SHAPE_LIST, SHAPE_SINGLETON
+
+_MISSING = object()
+
+
+def compile_serializer(model_class: Type[BaseModel]) -> Callable[[Any], dict]:
+    """
+    Return a function serializing an (ORM) object into a json-compatible dictionary, as if it
+    was converted into the model_class using from_orm, and then encoded using jsonable_encoder
+    with exclude_none.
+    """
+    return _compile(model_class)
+
+
+@functools.cache
+def _compile(model_class: Type[BaseModel]) -> Callable[[Any], dict]:
+    serializers = getattr(model_class.__config__.getter_dict, "serializers", {})
+    steps = [
+        (name, field.alias, serializers.get(name), _converter(field), field)
+        for name, field in model_class.__fields__.items()
+    ]
+
+    def serialize(obj: Any) -> dict:
+        result = {}
+        for name, key, serializer, convert, field in steps:
+            value = getattr(obj, name, _MISSING)
+            if value is _MISSING:
+                value = field.get_default()
+            elif serializer is not None and value is not None:
+                if isinstance(value, list):
+                    value = [serializer.serialize(v) for v in value]
+                else:
+                    value = serializer.serialize(value)
+            if value is not None:
+                result[key] = convert(value)
+        return result
+
+    return serialize
+
+
+def _converter(field: ModelField) -> Callable[[Any], Any]:
+    convert = _type_converter(field.type_)
+    if field.shape == SHAPE_SINGLETON:
+        return convert
+    if field.shape == SHAPE_LIST:
+        return lambda values: [convert(v) for v in values]
+    return _encode
+
+
+def _type_converter(type_: Any) -> Callable[[Any], Any]:
+    if isinstance(type_, type):
+        if issubclass(type_, BaseModel):
+            nested = _compile(type_)
+            return lambda value: nested(value) if value is not None else None
+        if issubclass(type_, enum.Enum):
+            return lambda value: type_(value).value
+        if issubclass(type_, (datetime.datetime, datetime.date, datetime.time)):
+            return lambda value: value.isoformat()
+        if issubclass(type_, bool):
+            return bool
+        if issubclass(type_, str):
+            return lambda value: value if isinstance(value, str) else str(value)
+        if issubclass(type_, int):
+            return lambda value: value if type(value) is int else int(value)
+        if issubclass(type_, float):
+            return float
+    return _encode
+
+
+def _encode(value: Any) -> Any:
+    return jsonable_encoder(value, exclude_none=True)
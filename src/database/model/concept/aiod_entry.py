@@ -32,7 +32,7 @@ class AIoDEntryORM(AIoDEntryBase, table=True):  # type: ignore [call-arg]
     status: Status = Relationship()
 
     # date_modified is updated in the resource_router
-    date_modified: datetime | None = Field(default_factory=datetime.utcnow)
+    date_modified: datetime | None = Field(default_factory=datetime.utcnow, index=True)
     date_created: datetime | None = Field(default_factory=datetime.utcnow)
 
     class RelationshipConfig:
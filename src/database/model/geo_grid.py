@@ -0,0 +1,84 @@
+"""
+A grid over the globe, used as spatial index of geographic coordinates without a GIS server.
+
+The grid consists of cells of CELL_DEGREES by CELL_DEGREES, numbered row by row from the south
+pole and the antimeridian. The cells of a bounding box form one range of cell numbers per row of
+the grid, so that the points in a bounding box can be selected using an index on the cell number.
+"""
+
+import math
+
+import numpy as np
+
+CELL_DEGREES = 1.0
+EARTH_RADIUS_KM = 6371.0088
+
+_ROWS = math.ceil(180 / CELL_DEGREES)
+_COLUMNS = math.ceil(360 / CELL_DEGREES)
+_KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def cell(latitude: float | None, longitude: float | None) -> int | None:
+    """The cell of a point, or None if a coordinate is missing"""
+    if latitude is None or longitude is None:
+        return None
+    return _row(latitude) * _COLUMNS + _column(longitude)
+
+
+def cell_ranges(
+    min_latitude: float, min_longitude: float, max_latitude: float, max_longitude: float
+) -> list[tuple[int, int]]:
+    """
+    The (first, last) cell of each row of the grid in a bounding box. If min_longitude is larger
+    than max_longitude, the box crosses the antimeridian.
+    """
+    if min_longitude <= max_longitude:
+        columns = [(_column(min_longitude), _column(max_longitude))]
+    else:
+        columns = [(_column(min_longitude), _COLUMNS - 1), (0, _column(max_longitude))]
+    return [
+        (row * _COLUMNS + first, row * _COLUMNS + last)
+        for row in range(_row(min_latitude), _row(max_latitude) + 1)
+        for first, last in columns
+    ]
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> tuple:
+    """
+    The (min_latitude, min_longitude, max_latitude, max_longitude) of a box containing the circle
+    around a point.
+    """
+    delta_latitude = radius_km / _KM_PER_DEGREE
+    min_latitude = max(latitude - delta_latitude, -90.0)
+    max_latitude = min(latitude + delta_latitude, 90.0)
+    widest = max(abs(min_latitude), abs(max_latitude))
+    if widest >= 90 or radius_km >= math.pi * EARTH_RADIUS_KM / 2:
+        return min_latitude, -180.0, max_latitude, 180.0
+    delta_longitude = delta_latitude / math.cos(math.radians(widest))
+    if delta_longitude >= 180:
+        return min_latitude, -180.0, max_latitude, 180.0
+    min_longitude = (longitude - delta_longitude + 180) % 360 - 180
+    max_longitude = (longitude + delta_longitude + 180) % 360 - 180
+    return min_latitude, min_longitude, max_latitude, max_longitude
+
+
+def distances_km(
+    latitude: float, longitude: float, latitudes: np.ndarray, longitudes: np.ndarray
+) -> np.ndarray:
+    """The great-circle distances from a point to the other points (haversine formula)"""
+    latitude_1, latitudes_2 = np.radians(latitude), np.radians(latitudes)
+    half_delta_latitude = (latitudes_2 - latitude_1) / 2
+    half_delta_longitude = np.radians(longitudes - longitude) / 2
+    a = (
+        np.sin(half_delta_latitude) ** 2
+        + np.cos(latitude_1) * np.cos(latitudes_2) * np.sin(half_delta_longitude) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def _row(latitude: float) -> int:
+    return min(max(int((latitude + 90) // CELL_DEGREES), 0), _ROWS - 1)
+
+
+def _column(longitude: float) -> int:
+    return min(max(int((longitude + 180) // CELL_DEGREES), 0), _COLUMNS - 1)
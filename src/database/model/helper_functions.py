@@ -1,7 +1,7 @@
 from collections import ChainMap
 from typing import Type, TYPE_CHECKING
 
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Index, Integer, ForeignKey
 from sqlmodel import SQLModel, Field
 
 if TYPE_CHECKING:
@@ -26,6 +26,13 @@ def link_factory(table_from: str, table_to: str, table_prefix=None):
 
     class LinkTable(SQLModel, table=True):  # type: ignore [call-arg]
         __tablename__ = f"{prefix}{table_from}_{table_to}_link"
+        # Index for lookups from the linked side, such as all datasets with a given keyword or all
+        # resources citing a publication. It includes the from_identifier, so that these lookups
+        # can be paginated using the index only. The name is shortened, because the default name
+        # can exceed the MySQL limit of 64 characters.
+        __table_args__ = (
+            Index(f"ix_{__tablename__}_linked", "linked_identifier", "from_identifier"),
+        )
         from_identifier: int = Field(
             sa_column=Column(
                 Integer,
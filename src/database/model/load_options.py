@@ -0,0 +1,72 @@
+"""
+Eager loading of the relationships of a resource.
+
+Serializing a resource touches every relationship defined in its RelationshipConfig. Without
+explicit loader options, each of these relationships is lazily loaded, resulting in one or more
+SELECT statements per row. The functions in this module build loader options based on the
+RelationshipConfig, so that a list of resources can be retrieved using a small, constant number
+of queries.
+"""
+
+from typing import Iterable, Type
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+from sqlmodel import SQLModel
+
+from database.model.concept.concept import AIoDConcept
+from database.model.helper_functions import get_relationships
+
+MAX_NESTING_DEPTH = 3
+
+
+def load_options(
+    resource_class: Type[SQLModel], attributes: Iterable[str] | None = None
+) -> list[LoaderOption]:
+    """
+    Return the loader options needed to serialize the resource_class.
+
+    Many-to-one relationships are loaded using a JOIN, one-to-many and many-to-many relationships
+    using a separate SELECT ... IN query per relationship. Embedded objects (relationships without
+    a serializer, such as the aiod_entry or a distribution) are loaded including their own
+    relationships. Related resources (such as a creator) are not loaded further, because only
+    their identifier is serialized.
+
+    Params
+    ------
+    resource_class: the ORM class
+    attributes: only load these relationships. If None, all relationships of the
+        RelationshipConfig are loaded.
+    """
+    return _load_options(resource_class, attributes=attributes, depth=0)
+
+
+def _load_options(
+    resource_class: Type[SQLModel], attributes: Iterable[str] | None, depth: int
+) -> list[LoaderOption]:
+    mapper_relationships = inspect(resource_class).relationships
+    relationships = get_relationships(resource_class)
+    if attributes is not None:
+        attributes = set(attributes)
+        relationships = {k: v for k, v in relationships.items() if k in attributes}
+
+    options = []
+    for attribute_name, config in relationships.items():
+        if attribute_name not in mapper_relationships:
+            continue
+        relationship = mapper_relationships[attribute_name]
+        attribute = getattr(resource_class, attribute_name)
+        option = selectinload(attribute) if relationship.uselist else joinedload(attribute)
+        related_class = relationship.mapper.class_
+        if config.serializer is None and depth < MAX_NESTING_DEPTH and _is_embedded(related_class):
+            nested_options = _load_options(related_class, attributes=None, depth=depth + 1)
+            if nested_options:
+                option = option.options(*nested_options)
+        options.append(option)
+    return options
+
+
+def _is_embedded(related_class: Type[SQLModel]) -> bool:
+    """An embedded object is serialized as part of its parent, contrary to a resource."""
+    return not issubclass(related_class, AIoDConcept)
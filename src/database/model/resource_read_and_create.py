@@ -5,7 +5,7 @@ not be able to modify this date yourself in a POST request, but you should retri
 request.
 """
 
-from typing import Type, Tuple, TYPE_CHECKING
+from typing import Type, Tuple, TYPE_CHECKING, Iterable
 
 from pydantic import create_model
 from sqlmodel import SQLModel, Field
@@ -98,6 +98,27 @@ def resource_read(resource_class: Type["AIoDConcept"]) -> Type[SQLModel]:
     return resource_class_read
 
 
+def resource_read_projection(
+    resource_class_read: Type[SQLModel], field_names: Iterable[str]
+) -> Type[SQLModel]:
+    """
+    Create a Pydantic class containing a subset of the fields of a Read class. This projection
+    can be used to serialize only the fields that are requested by the user (a "sparse
+    fieldset"). The serialization of the Read class (the getter_dict) is reused.
+    """
+    field_names = set(field_names)
+    field_definitions = {
+        name: (field.annotation, field.field_info)
+        for name, field in resource_class_read.__fields__.items()
+        if name in field_names
+    }
+    return create_model(
+        resource_class_read.__name__ + "Projection",
+        __config__=resource_class_read.__config__,
+        **field_definitions,
+    )
+
+
 def _update_model_serialization(resource_class: Type[SQLModel], resource_class_read):
     """
     For every Serializer defined on the RelationshipConfig of the resource, use this Serializer in
@@ -9,6 +9,7 @@ from starlette.status import HTTP_404_NOT_FOUND
 
 from database.model.helper_functions import get_relationships
 from database.model.named_relation import NamedRelation
+from database.vocabularies import record_inserts
 
 
 MODEL = TypeVar("MODEL", bound=SQLModel)
@@ -88,6 +89,7 @@ class FindByNameDeserializer(DeSerializer[NamedRelation]):
                 session.add(new_object)
                 session.flush()
                 identifier = new_object.identifier
+                record_inserts(session, self.clazz, [name])
             return identifier
 
         query = select(self.clazz).where(self.clazz.name.in_(name))  # type: ignore[attr-defined]
@@ -97,6 +99,7 @@ class FindByNameDeserializer(DeSerializer[NamedRelation]):
         if any(names_not_found):
             session.add_all(new_objects)
             session.flush()
+            record_inserts(session, self.clazz, names_not_found)
         return sorted(existing + new_objects, key=lambda o: o.identifier)
 
 
@@ -129,6 +132,8 @@ def create_getter_dict(attribute_serializers: Dict[str, Serializer]):
     attribute_names = set(attribute_serializers.keys())
 
     class GetterDictSerializer(GetterDict):
+        serializers = attribute_serializers
+
         def get(self, key: Any, default: Any = None) -> Any:
             if key in attribute_names:
                 attribute = getattr(self._obj, key)
@@ -0,0 +1,257 @@
+"""
+Candidate near-duplicate resources, such as the same dataset harvested from different platforms.
+
+The MinHash signature of the name and description of each resource is stored, together with the
+LSH bucket of each band of the signature. Resources whose signatures are similar are assigned the
+same cluster: the cluster is identified by the identifier of one of its resources.
+
+The signatures and clusters are updated in the same transaction that creates or updates a
+resource. A resource that is updated or deleted does not split its cluster: the clusters are
+recomputed from scratch by rebuild(), which should run periodically as a batch job (see
+connectors/near_duplicates.py).
+"""
+
+from typing import Any, Iterator, Type
+
+import numpy as np
+from sqlalchemy import BigInteger, Column, Index, LargeBinary, and_, delete, func, insert, or_
+from sqlalchemy import update as sql_update
+from sqlmodel import Field, SQLModel, Session, select
+
+from database.model.field_length import SHORT
+from search import minhash
+
+_INSERT_BATCH_SIZE = 1000
+
+
+class MinHashSignature(SQLModel, table=True):  # type: ignore [call-arg]
+    __tablename__ = "minhash_signature"
+    __table_args__ = (Index("ix_minhash_signature_cluster", "resource_type", "cluster"),)
+
+    resource_type: str = Field(max_length=SHORT, primary_key=True)
+    identifier: int = Field(primary_key=True)
+    cluster: int = Field()
+    signature: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+
+
+class MinHashBucket(SQLModel, table=True):  # type: ignore [call-arg]
+    __tablename__ = "minhash_bucket"
+    __table_args__ = (Index("ix_minhash_bucket_identifier", "resource_type", "identifier"),)
+
+    resource_type: str = Field(max_length=SHORT, primary_key=True)
+    band: int = Field(primary_key=True)
+    bucket: int = Field(sa_column=Column(BigInteger, primary_key=True, autoincrement=False))
+    identifier: int = Field(primary_key=True)
+
+
+def duplicate_text(resource: Any) -> str:
+    """The text of a resource that is compared to find near-duplicates"""
+    return f"{resource.name} {resource.description or ''}"
+
+
+def update(session: Session, resource_type: str, identifier: int, text: str):
+    """
+    Store the signature of a created or updated resource, and merge it with the clusters of its
+    near-duplicates. The caller is responsible for committing.
+    """
+    remove(session, resource_type, identifier)
+    if not minhash.normalise(text):
+        return
+    (signature,) = minhash.signatures([text])
+    (keys,) = minhash.band_keys(signature[np.newaxis])
+    in_bucket = or_(
+        *[
+            and_(MinHashBucket.band == band, MinHashBucket.bucket == int(key))
+            for band, key in enumerate(keys)
+        ]
+    )
+    candidate_identifiers = select(MinHashBucket.identifier).where(
+        MinHashBucket.resource_type == resource_type, in_bucket
+    )
+    query = select(MinHashSignature).where(
+        MinHashSignature.resource_type == resource_type,
+        MinHashSignature.identifier.in_(candidate_identifiers),
+    )
+    candidates = session.scalars(query).all()
+    similar_clusters = {
+        candidate.cluster
+        for candidate in candidates
+        if minhash.similarity(signature, _signature(candidate)) >= minhash.SIMILARITY_THRESHOLD
+    }
+    cluster = min(similar_clusters | {identifier})
+    if similar_clusters - {cluster}:
+        session.execute(
+            sql_update(MinHashSignature)
+            .where(
+                MinHashSignature.resource_type == resource_type,
+                MinHashSignature.cluster.in_(list(similar_clusters - {cluster})),
+            )
+            .values(cluster=cluster)
+        )
+    _insert(session, resource_type, [identifier], [cluster], signature[np.newaxis])
+
+
+def remove(session: Session, resource_type: str, identifier: int):
+    """Remove the signature of a resource. The caller is responsible for committing."""
+    for table in (MinHashSignature, MinHashBucket):
+        session.execute(
+            delete(table).where(
+                table.resource_type == resource_type, table.identifier == identifier
+            )
+        )
+
+
+def rebuild(
+    session: Session, resource_type: str, resources: Iterator[tuple[int, str]], batch_size=10000
+):
+    """
+    Recompute the signatures and the clusters of all (identifier, text) pairs of this resource
+    type. The caller is responsible for committing.
+    """
+    identifiers, signatures = [], []
+    batch: list[tuple[int, str]] = []
+    for item in resources:
+        batch.append(item)
+        if len(batch) == batch_size:
+            _add_signatures(batch, identifiers, signatures)
+            batch = []
+    _add_signatures(batch, identifiers, signatures)
+    identifiers_array = np.array(identifiers, dtype=np.int64)
+    signatures_array = (
+        np.concatenate(signatures)
+        if signatures
+        else np.empty((0, minhash.NUM_PERMUTATIONS), dtype=np.uint32)
+    )
+    cluster_ids = _clusters(identifiers_array, signatures_array)
+
+    for table in (MinHashSignature, MinHashBucket):
+        session.execute(delete(table).where(table.resource_type == resource_type))
+    for start in range(0, len(identifiers_array), _INSERT_BATCH_SIZE):
+        end = start + _INSERT_BATCH_SIZE
+        _insert(
+            session,
+            resource_type,
+            identifiers_array[start:end].tolist(),
+            cluster_ids[start:end].tolist(),
+            signatures_array[start:end],
+        )
+
+
+def clusters(
+    session: Session,
+    resource_type: str,
+    resource_class: Type[SQLModel],
+    cross_platform: bool = False,
+    offset: int = 0,
+    limit: int = 100,
+) -> list[list[Any]]:
+    """
+    The clusters of more than one resource, as lists of resources. If cross_platform is True,
+    only the clusters containing resources of different platforms are returned.
+    """
+    having = func.count() > 1
+    if cross_platform:
+        platform = func.coalesce(resource_class.platform, "")
+        having = func.count(func.distinct(platform)) > 1
+    query = (
+        select(MinHashSignature.cluster)
+        .join(resource_class, resource_class.identifier == MinHashSignature.identifier)
+        .where(MinHashSignature.resource_type == resource_type)
+        .group_by(MinHashSignature.cluster)
+        .having(having)
+        .order_by(MinHashSignature.cluster)
+        .offset(offset)
+        .limit(limit)
+    )
+    cluster_ids = session.scalars(query).all()
+    members = session.execute(
+        select(MinHashSignature.cluster, resource_class)
+        .join(resource_class, resource_class.identifier == MinHashSignature.identifier)
+        .where(
+            MinHashSignature.resource_type == resource_type,
+            MinHashSignature.cluster.in_(cluster_ids),
+        )
+        .order_by(MinHashSignature.cluster, resource_class.identifier)
+    )
+    result: dict[int, list[Any]] = {cluster_id: [] for cluster_id in cluster_ids}
+    for cluster_id, resource in members:
+        result[cluster_id].append(resource)
+    return list(result.values())
+
+
+def _signature(row: MinHashSignature) -> np.ndarray:
+    return np.frombuffer(row.signature, dtype="<u4")
+
+
+def _add_signatures(batch: list[tuple[int, str]], identifiers: list, signatures: list):
+    batch = [(identifier, text) for identifier, text in batch if minhash.normalise(text)]
+    if batch:
+        identifiers.extend(identifier for identifier, _ in batch)
+        signatures.append(minhash.signatures([text for _, text in batch]))
+
+
+def _clusters(identifiers: np.ndarray, signatures: np.ndarray) -> np.ndarray:
+    """
+    The cluster of each signature, by union-find over the resources sharing an LSH bucket. Within
+    a bucket, each resource is compared to the first resource of the bucket only.
+    """
+    parents = np.arange(len(identifiers))
+
+    def find(i: int) -> int:
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+
+    keys = minhash.band_keys(signatures)
+    for band in range(minhash.BANDS):
+        order = np.argsort(keys[:, band], kind="stable")
+        sorted_keys = keys[order, band]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        sizes = np.diff(np.r_[starts, len(order)])
+        for start, size in zip(starts[sizes > 1], sizes[sizes > 1]):
+            end = start + size
+            members = order[start:end]
+            similar = minhash.similarity(signatures[members[0]], signatures[members[1:]])
+            first = find(members[0])
+            for member in members[1:][similar >= minhash.SIMILARITY_THRESHOLD]:
+                root = find(member)
+                if root != first:
+                    parents[root] = first
+    roots = np.array([find(i) for i in range(len(identifiers))], dtype=np.int64)
+    # Identify each cluster by the lowest identifier of its resources
+    cluster_ids = np.full(len(identifiers), np.iinfo(np.int64).max)
+    np.minimum.at(cluster_ids, roots, identifiers)
+    return cluster_ids[roots]
+
+
+def _insert(
+    session: Session,
+    resource_type: str,
+    identifiers: list[int],
+    cluster_ids: list[int],
+    signatures: np.ndarray,
+):
+    if not identifiers:
+        return
+    session.execute(
+        insert(MinHashSignature),
+        [
+            {
+                "resource_type": resource_type,
+                "identifier": identifier,
+                "cluster": cluster,
+                "signature": signature.astype("<u4").tobytes(),
+            }
+            for identifier, cluster, signature in zip(identifiers, cluster_ids, signatures)
+        ],
+    )
+    keys = minhash.band_keys(signatures)
+    session.execute(
+        insert(MinHashBucket),
+        [
+            {"resource_type": resource_type, "band": band, "bucket": int(key), "identifier": i}
+            for i, row in zip(identifiers, keys)
+            for band, key in enumerate(row)
+        ],
+    )
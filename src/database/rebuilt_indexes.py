@@ -0,0 +1,124 @@
+"""
+In-memory indexes that are built from the database, one per resource type (or per table).
+
+An index is built when it is first used, and built again when it is older than max_age_seconds
+(or when it reports that it is outdated), so that the changes made by other processes (the other
+workers and the connectors) become visible. A rebuild runs in a background thread, without
+holding the lock of the index: meanwhile, requests keep reading the current index, and writes are
+not blocked. The changes applied while a new index is being built are recorded, and applied to the
+new index before it replaces the current one.
+
+Each index has its own lock, so that building or reading the index of one resource type does not
+block the others.
+"""
+
+import dataclasses
+import logging
+import threading
+import time
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class NotBuiltYet(Exception):
+    """The index is being built in the background, and cannot be read yet"""
+
+
+@dataclasses.dataclass
+class _Slot(Generic[T]):
+    lock: threading.Lock = dataclasses.field(default_factory=threading.Lock)
+    build_lock: threading.Lock = dataclasses.field(default_factory=threading.Lock)
+    index: T | None = None
+    built_at: float = 0.0
+    pending: list[Callable[[T], None]] | None = None  # The changes applied during a build
+
+
+class RebuiltIndexes(Generic[T]):
+    def __init__(
+        self, max_age_seconds: float, is_outdated: Callable[[T], bool] = lambda index: False
+    ):
+        self.max_age_seconds = max_age_seconds
+        self._is_outdated = is_outdated
+        self._slots: dict[str, _Slot[T]] = {}
+        self._lock = threading.Lock()
+
+    def read(
+        self, key: str, build: Callable[[], T], read: Callable[[T], R], wait: bool = True
+    ) -> R:
+        """
+        Read from the index, using the build function to build it if it does not exist yet. If
+        wait is False, the first build runs in the background as well, and NotBuiltYet is raised
+        until it is done.
+        """
+        slot = self._slot(key)
+        with slot.lock:
+            if slot.index is not None:
+                if self._should_rebuild(slot):
+                    self._start_build(key, slot, build)
+                return read(slot.index)
+            if not wait:
+                self._start_build(key, slot, build)
+                raise NotBuiltYet(f"The index of {key} is being built. Please try again later.")
+        with slot.build_lock:
+            if slot.index is None:  # Otherwise, built by another thread while waiting
+                self._build(slot, build)
+        with slot.lock:
+            return read(slot.index)
+
+    def update(self, key: str, change: Callable[[T], None]):
+        """Apply the change to the index, if it has been built or is being built"""
+        slot = self._slot(key)
+        with slot.lock:
+            if slot.index is not None:
+                change(slot.index)
+            if slot.pending is not None:
+                slot.pending.append(change)
+
+    def clear(self):
+        with self._lock:
+            self._slots.clear()
+
+    def _slot(self, key: str) -> _Slot[T]:
+        with self._lock:
+            if key not in self._slots:
+                self._slots[key] = _Slot()
+            return self._slots[key]
+
+    def _should_rebuild(self, slot: _Slot[T]) -> bool:
+        age = time.monotonic() - slot.built_at
+        return age > self.max_age_seconds or self._is_outdated(slot.index)
+
+    def _start_build(self, key: str, slot: _Slot[T], build: Callable[[], T]):
+        """Build the index in a background thread, unless it is being built already"""
+        if slot.build_lock.acquire(blocking=False):
+            thread = threading.Thread(
+                target=self._build_in_background, args=(key, slot, build), daemon=True
+            )
+            thread.start()
+
+    def _build_in_background(self, key: str, slot: _Slot[T], build: Callable[[], T]):
+        try:
+            self._build(slot, build)
+        except Exception:
+            logging.exception(f"Could not build the index of {key}.")
+            with slot.lock:
+                slot.built_at = time.monotonic()  # Try again after max_age_seconds
+        finally:
+            slot.build_lock.release()
+
+    def _build(self, slot: _Slot[T], build: Callable[[], T]):
+        """Build the index without holding the lock, and replace the current index"""
+        with slot.lock:
+            slot.pending = []
+        try:
+            index = build()
+        except BaseException:
+            with slot.lock:
+                slot.pending = None
+            raise
+        with slot.lock:
+            for change in slot.pending:
+                change(index)
+            slot.index, slot.built_at, slot.pending = index, time.monotonic(), None
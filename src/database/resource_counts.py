@@ -0,0 +1,180 @@
+"""
+Counters of the number of resources, per resource type, platform and status.
+
+Counting the rows of a resource table requires a scan of the table (or of an index). The counters
+are updated in the same transaction that creates, updates or deletes a resource, so that a count
+can be read from a handful of rows. Resources without a platform or without a status are counted
+using an empty string.
+
+The counters of a resource type are computed from the resource table at startup, and before the
+first write, if there are no counters for that type yet. A resource type without resources gets a
+counter of zero. Once the counters of a type have been found, a process does not check for them
+again. Reading the counts never writes: a resource type without counters (for instance because the
+resources were added to the database directly) is counted from its resource table instead.
+
+The counters are maintained using the upserts of MySQL and SQLite. On other databases, there are
+no counters, and the resources are always counted from their resource table.
+"""
+
+from typing import Type
+
+from sqlalchemy import func, literal
+from sqlalchemy.dialects import mysql, sqlite
+from sqlmodel import Field, SQLModel, Session, select
+
+from database.model.concept.aiod_entry import AIoDEntryORM
+from database.model.concept.status import Status
+from database.model.field_length import NORMAL, SHORT
+
+NONE = ""
+
+_DIALECTS = ("mysql", "sqlite")
+
+# The resource types of which this process has found the counters in the database
+_initialized: set[str] = set()
+
+
+class ResourceCount(SQLModel, table=True):  # type: ignore [call-arg]
+    __tablename__ = "resource_count"
+
+    resource_type: str = Field(max_length=SHORT, primary_key=True)
+    platform: str = Field(max_length=NORMAL, primary_key=True, default=NONE)
+    status: str = Field(max_length=NORMAL, primary_key=True, default=NONE)
+    total: int = Field(default=0)
+
+
+def count_key(resource) -> tuple[str, str]:
+    """The platform and the status of a resource, as used in the counters"""
+    platform = getattr(resource, "platform", None)
+    aiod_entry = getattr(resource, "aiod_entry", None)
+    status = aiod_entry.status if aiod_entry is not None else None
+    return (
+        platform if platform is not None else NONE,
+        status.name if status is not None else NONE,
+    )
+
+
+def increment(session: Session, resource_type: str, key: tuple[str, str], amount: int = 1):
+    """Add the amount to the counter. The caller is responsible for committing."""
+    dialect = session.get_bind().dialect.name
+    if dialect not in _DIALECTS:
+        return
+    platform, status = key
+    values = {"resource_type": resource_type, "platform": platform, "status": status}
+    if dialect == "mysql":
+        statement = (
+            mysql.insert(ResourceCount)
+            .values(**values, total=amount)
+            .on_duplicate_key_update(total=ResourceCount.total + amount)
+        )
+    elif dialect == "sqlite":
+        statement = (
+            sqlite.insert(ResourceCount)
+            .values(**values, total=amount)
+            .on_conflict_do_update(
+                index_elements=list(values), set_={"total": ResourceCount.total + amount}
+            )
+        )
+    session.execute(statement)
+
+
+def count(
+    session: Session,
+    resource_classes: dict[str, Type[SQLModel]],
+    platform: str | None = None,
+    status: str | None = None,
+) -> dict[str, int]:
+    """
+    The number of resources per resource type, optionally filtered on platform and status,
+    including the resource types without resources. The resource types without counters are
+    counted from their resource table.
+    """
+    resource_types = list(resource_classes)
+    initialized = set(
+        session.scalars(
+            select(ResourceCount.resource_type)
+            .where(ResourceCount.resource_type.in_(resource_types))
+            .distinct()
+        )
+    )
+    query = (
+        select(ResourceCount.resource_type, func.sum(ResourceCount.total))
+        .where(ResourceCount.resource_type.in_(list(initialized)))
+        .group_by(ResourceCount.resource_type)
+    )
+    if platform is not None:
+        query = query.where(ResourceCount.platform == platform)
+    if status is not None:
+        query = query.where(ResourceCount.status == status)
+    counts = dict.fromkeys(resource_types, 0)
+    counts |= {resource_type: int(total) for resource_type, total in session.execute(query)}
+    for resource_type in set(resource_types) - initialized:
+        counts[resource_type] = sum(
+            total
+            for row_platform, row_status, total in _counted(
+                session, resource_classes[resource_type]
+            )
+            if platform in (None, row_platform) and status in (None, row_status)
+        )
+    return counts
+
+
+def initialize(session: Session, resource_type: str, resource_class: Type[SQLModel]):
+    """
+    Compute the counters of this resource type from the resource table, if there are no counters
+    for this type yet. Counters that are inserted concurrently by another process are kept. The
+    caller is responsible for committing.
+    """
+    dialect = session.get_bind().dialect.name
+    if resource_type in _initialized or dialect not in _DIALECTS:
+        return
+    query = select(ResourceCount.resource_type).where(ResourceCount.resource_type == resource_type)
+    if session.execute(query.limit(1)).first() is not None:
+        _initialized.add(resource_type)
+        return
+    rows = [
+        {"resource_type": resource_type, "platform": platform, "status": status, "total": total}
+        for platform, status, total in _counted(session, resource_class)
+    ] or [{"resource_type": resource_type, "platform": NONE, "status": NONE, "total": 0}]
+    if dialect == "mysql":
+        statement = (
+            mysql.insert(ResourceCount)
+            .values(rows)
+            .on_duplicate_key_update(total=ResourceCount.total)
+        )
+    elif dialect == "sqlite":
+        statement = sqlite.insert(ResourceCount).values(rows).on_conflict_do_nothing()
+    session.execute(statement)
+
+
+def forget_initialized():
+    """Check for the counters again, for instance after the tables have been emptied"""
+    _initialized.clear()
+
+
+def _counted(session: Session, resource_class: Type[SQLModel]) -> list[tuple[str, str, int]]:
+    """The number of resources in the resource table, per platform and status"""
+    return [
+        (
+            platform if platform is not None else NONE,
+            status if status is not None else NONE,
+            total,
+        )
+        for platform, status, total in session.execute(_count_query(resource_class))
+    ]
+
+
+def _count_query(resource_class: Type[SQLModel]):
+    """Count the resources grouped by platform and status"""
+    platform = resource_class.platform if hasattr(resource_class, "platform") else None
+    status = Status.name if hasattr(resource_class, "aiod_entry") else None
+    query = select(
+        platform if platform is not None else literal(NONE),
+        status if status is not None else literal(NONE),
+        func.count(),
+    ).select_from(resource_class)
+    if status is not None:
+        query = query.outerjoin(
+            AIoDEntryORM, resource_class.aiod_entry_identifier == AIoDEntryORM.identifier
+        ).outerjoin(Status, AIoDEntryORM.status_identifier == Status.identifier)
+    return query.group_by(*[column for column in (platform, status) if column is not None])
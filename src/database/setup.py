@@ -11,6 +11,7 @@ from sqlmodel import create_engine, Session, SQLModel, select
 import routers
 from config import DB_CONFIG
 from connectors.resource_with_relations import ResourceWithRelations
+from database.geo_search import backfill_grid_cells
 from database.model.concept.concept import AIoDConcept
 from database.model.platform.platform_names import PlatformName
 
@@ -40,6 +41,7 @@ def connect_to_database(
 
     with engine.connect() as connection:
         AIoDConcept.metadata.create_all(connection, checkfirst=True)
+        backfill_grid_cells(connection)
         connection.commit()
     return engine
 
@@ -0,0 +1,125 @@
+"""
+In-memory vocabularies of named values (such as keywords and licenses), for suggesting existing
+names while the user is typing.
+
+A vocabulary holds its names sorted on their case-folded form, so that the names starting with a
+prefix form a contiguous range that is found by binary search. The usage count of a name is the
+number of references to it, from all tables. The matching names are ranked by usage count.
+
+A vocabulary is loaded from the database on first use, and loaded again in the background when
+it is older than max_age_seconds, so that the usage counts stay up to date (see RebuiltIndexes).
+Names inserted by the FindByNameDeserializer are added to the loaded vocabularies when the
+transaction is committed.
+"""
+
+import bisect
+import heapq
+from typing import Callable, Iterable, Type
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import SQLModel, Session, select
+
+from config import SEARCH_CONFIG
+from database.rebuilt_indexes import RebuiltIndexes
+
+_PENDING = "vocabulary_inserts"
+
+
+class Vocabulary:
+    """The names of a single vocabulary, with their usage count. Not thread-safe."""
+
+    def __init__(self, usage: dict[str, int]):
+        self.usage = dict(usage)
+        entries = sorted((name.casefold(), name) for name in self.usage)
+        self._keys = [key for key, _ in entries]
+        self._names = [name for _, name in entries]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, name: str, usage: int = 1):
+        """Add a name, or increase its usage count if it exists already"""
+        if name in self.usage:
+            self.usage[name] += usage
+            return
+        self.usage[name] = usage
+        position = bisect.bisect_left(self._keys, name.casefold())
+        self._keys.insert(position, name.casefold())
+        self._names.insert(position, name)
+
+    def suggest(self, prefix: str, limit: int) -> list[tuple[str, int]]:
+        """The names starting with the prefix (ignoring case), the most used first"""
+        key = prefix.casefold()
+        start = bisect.bisect_left(self._keys, key)
+        end = bisect.bisect_left(self._keys, key + chr(0x10FFFF), lo=start)
+        best = heapq.nsmallest(
+            limit,
+            range(start, end),
+            key=lambda i: (-self.usage[self._names[i]], self._keys[i], self._names[i]),
+        )
+        return [(self._names[i], self.usage[self._names[i]]) for i in best]
+
+
+class Vocabularies:
+    """The loaded vocabularies, by table name"""
+
+    def __init__(self, max_age_seconds: float = 300):
+        self._vocabularies: RebuiltIndexes[Vocabulary] = RebuiltIndexes(max_age_seconds)
+
+    def suggest(
+        self, table_name: str, load: Callable[[], Vocabulary], prefix: str, limit: int
+    ) -> list[tuple[str, int]]:
+        """Suggest names, using the load function to (re)load the vocabulary if necessary"""
+        return self._vocabularies.read(
+            table_name, load, lambda vocabulary: vocabulary.suggest(prefix, limit)
+        )
+
+    def add(self, table_name: str, names: Iterable[str]):
+        """Add the names to the vocabulary, if it has been loaded"""
+        names = list(names)
+
+        def add_names(vocabulary: Vocabulary):
+            for name in names:
+                vocabulary.add(name)
+
+        self._vocabularies.update(table_name, add_names)
+
+    def clear(self):
+        self._vocabularies.clear()
+
+
+vocabularies = Vocabularies(max_age_seconds=SEARCH_CONFIG.get("vocabulary_max_age_seconds", 300))
+
+
+def load_vocabulary(session: Session, clazz: Type[SQLModel]) -> Vocabulary:
+    """Load all names of the vocabulary, counting the references to them from any table"""
+    table = clazz.__table__  # type: ignore[attr-defined]
+    references: dict[int, int] = {}
+    for other_table in SQLModel.metadata.tables.values():
+        for foreign_key in other_table.foreign_keys:
+            if foreign_key.column is not table.c.identifier:
+                continue
+            column = foreign_key.parent
+            query = select(column, func.count()).where(column.is_not(None)).group_by(column)
+            for identifier, count in session.execute(query):
+                references[identifier] = references.get(identifier, 0) + count
+    names = session.execute(select(table.c.identifier, table.c.name))
+    return Vocabulary({name: references.get(identifier, 0) for identifier, name in names})
+
+
+def record_inserts(session: Session, clazz: Type[SQLModel], names: Iterable[str]):
+    """Record names inserted in this session, to add them to the vocabulary on commit"""
+    pending = session.info.setdefault(_PENDING, [])
+    pending.append((clazz.__tablename__, list(names)))
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _add_inserted_names(session: OrmSession):
+    for table_name, names in session.info.pop(_PENDING, []):
+        vocabularies.add(table_name, names)
+
+
+@event.listens_for(OrmSession, "after_soft_rollback")
+def _discard_inserted_names(session: OrmSession, previous_transaction):
+    session.info.pop(_PENDING, None)
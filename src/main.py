@@ -89,6 +89,9 @@ def create_app() -> FastAPI:
         if not any(existing_platforms):
             session.add_all([Platform(name=name) for name in PlatformName])
             session.commit()
+        for router in routers.resource_routers:
+            router.initialize_counts(session)
+        session.commit()
 
     add_routes(app, engine, url_prefix=args.url_prefix)
     return app
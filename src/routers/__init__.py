@@ -1,20 +1,37 @@
+from database.model.agent.agent_table import AgentTable
+from database.model.ai_asset.ai_asset_table import AIAssetTable
+from database.model.ai_resource.resource_table import AIResourceTable
+
+from .cache_router import CacheRouter
 from .case_study_router import CaseStudyRouter
+from .changes_router import ChangesRouter
 from .computational_asset_router import ComputationalAssetRouter
+from .counts_router import CountsRouter
 from .dataset_router import DatasetRouter
 from .educational_resource_router import EducationalResourceRouter
 from .event_router import EventRouter
 from .experiment_router import ExperimentRouter
+from .facet_router import FacetRouter
 from .ml_model_router import MLModelRouter
+from .near_duplicates_router import NearDuplicatesRouter
+from .nearest_router import NearestRouter
 from .news_router import NewsRouter
+from .oai_pmh_router import OaiPmhRouter
 from .organisation_router import OrganisationRouter
 from .person_router import PersonRouter
 from .platform_router import PlatformRouter
 from .project_router import ProjectRouter
 from .publication_router import PublicationRouter
 from .resource_router import ResourceRouter  # noqa:F401
+from .reverse_relationship_router import ReverseRelationshipRouter
+from .search_router import SearchRouter
 from .service_router import ServiceRouter
+from .shared_table_router import SharedTableRouter
+from .similarity_router import SimilarityRouter
 from .team_router import TeamRouter
+from .traversal_router import TraversalRouter
 from .upload_router_huggingface import UploadRouterHuggingface
+from .vocabulary_router import VocabularyRouter
 
 resource_routers = [
     PlatformRouter(),
@@ -34,4 +51,21 @@ resource_routers = [
     TeamRouter(),
 ]  # type: list[ResourceRouter]
 
-other_routers = [UploadRouterHuggingface()]
+other_routers = [
+    UploadRouterHuggingface(resource_routers),
+    CacheRouter(),
+    CountsRouter(resource_routers),
+    ChangesRouter(resource_routers),
+    OaiPmhRouter(resource_routers),
+    SearchRouter(resource_routers),
+    FacetRouter(resource_routers),
+    VocabularyRouter(),
+    SimilarityRouter(resource_routers),
+    NearDuplicatesRouter(resource_routers),
+    NearestRouter(resource_routers),
+    ReverseRelationshipRouter(resource_routers),
+    TraversalRouter(resource_routers),
+    SharedTableRouter(AIResourceTable, "ai_resources", resource_routers),
+    SharedTableRouter(AgentTable, "agents", resource_routers),
+    SharedTableRouter(AIAssetTable, "ai_assets", resource_routers),
+]
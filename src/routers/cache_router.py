@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from sqlalchemy.engine import Engine
+
+from cache import response_cache
+
+
+class CacheRouter:
+    def create(self, engine: Engine, url_prefix: str) -> APIRouter:
+        router = APIRouter()
+
+        @router.get(url_prefix + "/cache/v1/statistics", tags=["cache"])
+        def cache_statistics() -> dict:
+            """The number of cache hits and misses of GET requests, since the start of this
+            worker."""
+            return response_cache.statistics()
+
+        return router
@@ -0,0 +1,77 @@
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from database import change_log
+from routers.content_negotiation import EncodedResponse, negotiate
+from routers.resource_router import MAX_LIMIT, ResourceRouter, _wrap_as_http_exception
+
+
+class ChangesRouter:
+    """
+    A feed of the created, updated and deleted resources of all types, so that a mirror can
+    synchronize incrementally.
+
+    It creates the endpoint:
+    - GET /changes/v1
+
+    A client stores the `next` cursor of a response, and passes it as `since` in its next
+    request, to get the changes that occurred in between.
+    """
+
+    def __init__(self, resource_routers: list[ResourceRouter]):
+        self.types = [router.resource_name for router in resource_routers]
+
+    def create(self, engine: Engine, url_prefix: str) -> APIRouter:
+        router = APIRouter()
+
+        @router.get(f"{url_prefix}/changes/v1", tags=["changes"])
+        def get_changes(
+            request: Request,
+            since: int = Query(
+                0, description="The cursor returned by a previous request. Use 0 to start."
+            ),
+            type: list[str]
+            | None = Query(None, description="Only return the changes of these resource types."),
+            limit: int = 1000,
+        ):
+            """
+            The changes after the cursor, in the order in which they occurred. A deleted resource
+            is returned as a change with operation delete.
+            """
+            if not 0 <= limit <= MAX_LIMIT or since < 0:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"The limit should be between 0 and {MAX_LIMIT}, and since should not "
+                    "be negative.",
+                )
+            unknown = set(type or []) - set(self.types)
+            if unknown:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid type {', '.join(sorted(unknown))}. Expected some of "
+                    f"{', '.join(self.types)}.",
+                )
+            try:
+                with Session(engine) as session:
+                    changes = change_log.changes(session, since, limit, resource_types=type)
+            except Exception as e:
+                raise _wrap_as_http_exception(e)
+            content = {
+                "changes": [
+                    {
+                        "type": change.resource_type,
+                        "identifier": change.resource_identifier,
+                        "operation": change.operation,
+                        "date_modified": change.date_modified.isoformat(),
+                        "platform": change.platform,
+                        "platform_identifier": change.platform_identifier,
+                    }
+                    for change in changes
+                ],
+                "next": changes[-1].identifier if changes else since,
+            }
+            encoding = negotiate(request.headers.get("accept"))
+            return EncodedResponse(content, encoding, headers={"Vary": "Accept"})
+
+        return router
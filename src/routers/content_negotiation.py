@@ -0,0 +1,107 @@
+"""
+Encoding of responses based on the Accept header.
+
+Responses are encoded as json by default, using orjson. Clients can ask for MessagePack or CBOR
+instead, if the optional dependencies msgpack and cbor2 are installed.
+"""
+
+import dataclasses
+from typing import Any, Callable
+
+import orjson
+from starlette.responses import Response
+
+
+@dataclasses.dataclass(frozen=True)
+class Encoding:
+    media_type: str
+    stream_media_type: str
+    encode: Callable[[Any], bytes]
+    stream_delimiter: bytes = b""
+
+    def encode_stream_item(self, content: Any) -> bytes:
+        return self.encode(content) + self.stream_delimiter
+
+
+def _encode_json(content: Any) -> bytes:
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+JSON = Encoding(
+    media_type="application/json",
+    stream_media_type="application/x-ndjson",
+    encode=_encode_json,
+    stream_delimiter=b"\n",
+)
+
+
+def _binary_encodings() -> dict[str, Encoding]:
+    encodings = {}
+    try:
+        import msgpack
+    except ImportError:
+        pass
+    else:
+        msgpack_encoding = Encoding(
+            media_type="application/msgpack",
+            stream_media_type="application/msgpack",  # A stream of concatenated objects
+            encode=msgpack.packb,
+        )
+        for media_type in (
+            "application/msgpack",
+            "application/x-msgpack",
+            "application/vnd.msgpack",
+        ):
+            encodings[media_type] = msgpack_encoding
+    try:
+        import cbor2
+    except ImportError:
+        pass
+    else:
+        encodings["application/cbor"] = Encoding(
+            media_type="application/cbor",
+            stream_media_type="application/cbor-seq",
+            encode=cbor2.dumps,
+        )
+    return encodings
+
+
+ENCODINGS: dict[str, Encoding] = {"application/json": JSON} | _binary_encodings()
+
+
+def negotiate(accept: str | None) -> Encoding:
+    """
+    Return the encoding preferred by the client, based on the Accept header. Json is returned if
+    the client does not accept any of the supported media types.
+    """
+    if not accept:
+        return JSON
+    candidates = []
+    for position, media_range in enumerate(accept.split(",")):
+        media_type, *parameters = [part.strip() for part in media_range.split(";")]
+        quality = 1.0
+        for parameter in parameters:
+            if parameter.startswith("q="):
+                try:
+                    quality = float(parameter[2:])
+                except ValueError:
+                    quality = 0
+        if quality > 0:
+            candidates.append((-quality, position, media_type.lower()))
+    for _, _, media_type in sorted(candidates):
+        if media_type in ENCODINGS:
+            return ENCODINGS[media_type]
+        if media_type in ("*/*", "application/*"):
+            return JSON
+    return JSON
+
+
+class EncodedResponse(Response):
+    """A response of json-compatible content, encoded using the negotiated encoding."""
+
+    def __init__(self, content: Any, encoding: Encoding = JSON, **kwargs):
+        self.encoding = encoding
+        super().__init__(content, media_type=encoding.media_type, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        return self.encoding.encode(content)
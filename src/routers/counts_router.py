@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Query
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from database import resource_counts
+from routers.resource_router import ResourceRouter, _wrap_as_http_exception
+
+
+class CountsRouter:
+    """The number of resources of all types at once, read from the maintained counters"""
+
+    def __init__(self, resource_routers: list[ResourceRouter]):
+        self.routers = {router.resource_name_plural: router for router in resource_routers}
+
+    def create(self, engine: Engine, url_prefix: str) -> APIRouter:
+        router = APIRouter()
+
+        @router.get(url_prefix + "/counts/v1", tags=["counts"])
+        def get_counts(
+            platform: str | None = Query(None, description="Only count resources of this platform"),
+            status: str | None = Query(None, description="Only count resources with this status"),
+        ) -> dict[str, int]:
+            """Retrieve the number of resources of each type."""
+            try:
+                with Session(engine) as session:
+                    counts = resource_counts.count(
+                        session,
+                        {r.resource_name: r.resource_class for r in self.routers.values()},
+                        platform=platform,
+                        status=status,
+                    )
+            except Exception as e:
+                raise _wrap_as_http_exception(e)
+            return {
+                name_plural: counts.get(resource_router.resource_name, 0)
+                for name_plural, resource_router in self.routers.items()
+            }
+
+        return router
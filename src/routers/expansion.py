@@ -0,0 +1,188 @@
+"""
+Inline expansion of related resources.
+
+Relationships to other resources, such as the creator of a dataset, are serialized as identifiers.
+If a client asks to expand such a relationship, the identifiers are replaced by the serialized
+related resources. The related resources are retrieved using a single query per relationship (and
+per level of nesting), independent of the number of resources that are expanded.
+"""
+
+import dataclasses
+import functools
+from typing import Type
+
+from fastapi import HTTPException, status
+from sqlalchemy import inspect
+from sqlmodel import SQLModel, Session, select
+
+from database.model.agent.agent_table import AgentTable
+from database.model.compiled_serializer import compile_serializer
+from database.model.ai_asset.ai_asset_table import AIAssetTable
+from database.model.ai_resource.resource_table import AIResourceTable
+from database.model.helper_functions import get_relationships
+from database.model.serializers import AttributeSerializer
+
+MAX_EXPAND_DEPTH = 3
+SHARED_TABLES = (AIResourceTable, AgentTable, AIAssetTable)
+
+EXPAND_DESCRIPTION = (
+    "A comma-separated list of relationships to expand, such as 'creator,citation'. The "
+    "identifiers of these relationships are replaced by the related resources. Relationships to "
+    "a shared table, such as funder, are expanded into an object containing the type and the "
+    "resource. Only supported for the aiod schema."
+)
+EXPAND_DEPTH_DESCRIPTION = (
+    f"The number of levels to expand, between 1 and {MAX_EXPAND_DEPTH}. On deeper levels, the "
+    f"same relationships are expanded, if the related resources have them."
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class Expansion:
+    names: frozenset[str]
+    depth: int
+
+
+@dataclasses.dataclass(frozen=True)
+class Relation:
+    target: Type[SQLModel]
+    is_list: bool
+
+
+@functools.cache
+def expandable_relations(resource_class: Type[SQLModel]) -> dict[str, Relation]:
+    """The relationships of the resource_class that are serialized as identifier of a resource"""
+    mapper_relationships = inspect(resource_class).relationships
+    relations = {}
+    for attribute_name, config in get_relationships(resource_class).items():
+        serializer = config.serializer
+        if (
+            attribute_name not in mapper_relationships
+            or config.default_factory_orm is not None  # The identity of the resource itself
+            or not isinstance(serializer, AttributeSerializer)
+            or serializer.attribute_name != "identifier"
+        ):
+            continue
+        relationship = mapper_relationships[attribute_name]
+        target = relationship.mapper.class_
+        if target in SHARED_TABLES or target in _routers_by_class():
+            relations[attribute_name] = Relation(target=target, is_list=relationship.uselist)
+    return relations
+
+
+def parse_expand(
+    resource_class: Type[SQLModel], expand: str | None, depth: int, schema: str
+) -> Expansion | None:
+    """Validate the expand parameters, returning the relationships to expand"""
+    if expand is None:
+        return None
+    if schema != "aiod":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Expanding relationships is only supported for the aiod schema.",
+        )
+    if not 1 <= depth <= MAX_EXPAND_DEPTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid expand_depth {depth}. The depth should be between 1 and "
+            f"{MAX_EXPAND_DEPTH}.",
+        )
+    names = frozenset(name.strip() for name in expand.split(",") if name.strip())
+    relations = expandable_relations(resource_class)
+    unknown = names - set(relations)
+    if any(unknown):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot expand {', '.join(sorted(unknown))}. Expected a subset of "
+            f"{', '.join(relations)}.",
+        )
+    return Expansion(names=names, depth=depth)
+
+
+def expand(
+    session: Session, resource_class: Type[SQLModel], resources: list[dict], expansion: Expansion
+):
+    """
+    Replace, in place, the identifiers of the relationships to expand by the serialized related
+    resources. Identifiers of resources that no longer exist are left as-is.
+    """
+    _expand(session, resource_class, resources, expansion.names, expansion.depth)
+
+
+def _expand(
+    session: Session,
+    resource_class: Type[SQLModel],
+    resources: list[dict],
+    names: frozenset[str],
+    depth: int,
+):
+    if depth <= 0 or not resources:
+        return
+    for name, relation in expandable_relations(resource_class).items():
+        if name not in names:
+            continue
+        identifiers = set()
+        for resource in resources:
+            value = resource.get(name)
+            if relation.is_list:
+                identifiers.update(value or [])
+            elif value is not None:
+                identifiers.add(value)
+        if not identifiers:
+            continue
+        resolved = _resolve(session, relation.target, sorted(identifiers), names, depth - 1)
+        for resource in resources:
+            value = resource.get(name)
+            if relation.is_list and value is not None:
+                resource[name] = [resolved.get(identifier, identifier) for identifier in value]
+            elif value is not None:
+                resource[name] = resolved.get(value, value)
+
+
+def _resolve(
+    session: Session,
+    target: Type[SQLModel],
+    identifiers: list[int],
+    names: frozenset[str],
+    depth: int,
+) -> dict[int, dict]:
+    if target in SHARED_TABLES:
+        shared_table_router = _shared_table_routers()[target]
+        resolved = shared_table_router.resolve(session, identifiers)
+        by_type: dict[str, list[dict]] = {}
+        for value in resolved.values():
+            by_type.setdefault(value["type"], []).append(value["resource"])
+        for type_, resources in by_type.items():
+            router, _ = shared_table_router.routers[type_]
+            _expand(session, router.resource_class, resources, names, depth)
+        return resolved
+
+    router = _routers_by_class()[target]
+    query = (
+        select(router.resource_class)
+        .where(router.resource_class.identifier.in_(identifiers))
+        .options(*router._load_options)
+    )
+    serialize = compile_serializer(router.resource_class_read)
+    resolved = {resource.identifier: serialize(resource) for resource in session.scalars(query)}
+    _expand(session, router.resource_class, list(resolved.values()), names, depth)
+    return resolved
+
+
+@functools.cache
+def _routers_by_class() -> dict:
+    import routers
+
+    return {router.resource_class: router for router in routers.resource_routers}
+
+
+@functools.cache
+def _shared_table_routers() -> dict:
+    import routers
+    from routers.shared_table_router import SharedTableRouter
+
+    return {
+        router.table: router
+        for router in routers.other_routers
+        if isinstance(router, SharedTableRouter)
+    }
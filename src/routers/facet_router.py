@@ -0,0 +1,106 @@
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from routers.content_negotiation import EncodedResponse, negotiate
+from routers.resource_router import ResourceRouter, _wrap_as_http_exception
+from search import facet_indexes
+from search.facets import available_facets, build_facet_index
+
+MAX_FACET_LIMIT = 100
+
+
+class FacetRouter:
+    """
+    The number of resources per keyword, license, platform, application area, research area,
+    scientific domain and status, among the resources matching the selected values. This can be
+    used to show the number of results next to each option of a filter.
+
+    It creates the endpoints:
+    - GET /facets/[resource_name_plural]/v1
+
+    The counts are computed from an in-memory index per resource type, which is updated by the
+    ResourceRouters on each write, and rebuilt from the database periodically.
+    """
+
+    def __init__(self, resource_routers: list[ResourceRouter]):
+        self.routers = [router for router in resource_routers if router.searchable]
+
+    def create(self, engine: Engine, url_prefix: str) -> APIRouter:
+        router = APIRouter()
+        for resource_router in self.routers:
+            router.add_api_route(
+                path=f"{url_prefix}/facets/{resource_router.resource_name_plural}/v1",
+                endpoint=self.facets_func(engine, resource_router),
+                name=f"Facets of {resource_router.resource_name_plural}",
+                tags=["search"],
+            )
+        return router
+
+    def facets_func(self, engine: Engine, resource_router: ResourceRouter):
+        available = available_facets(resource_router.resource_class)
+
+        def build():
+            with Session(engine) as session:
+                return build_facet_index(session, resource_router.resource_class)
+
+        def facets(
+            request: Request,
+            keyword: list[str] | None = Query(None),
+            license: list[str] | None = Query(None),
+            platform: list[str] | None = Query(None),
+            application_area: list[str] | None = Query(None),
+            research_area: list[str] | None = Query(None),
+            scientific_domain: list[str] | None = Query(None),
+            status_: list[str] | None = Query(None, alias="status"),
+            facets: str
+            | None = Query(
+                None,
+                description="Comma-separated names of the facets to return. Defaults to all "
+                "facets.",
+            ),
+            limit: int = Query(10, description="The maximum number of values per facet."),
+        ):
+            f"""The number of {resource_router.resource_name_plural} per value of each facet.
+            Within a facet, the selected values are combined using OR; the selected values of
+            different facets are combined using AND."""
+            selected = {
+                "keyword": keyword,
+                "license": license,
+                "platform": platform,
+                "application_area": application_area,
+                "research_area": research_area,
+                "scientific_domain": scientific_domain,
+                "status": status_,
+            }
+            filters = {facet: names for facet, names in selected.items() if names}
+            requested = facets.split(",") if facets is not None else available
+            unknown = [facet for facet in [*filters, *requested] if facet not in available]
+            if unknown:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"The {resource_router.resource_name_plural} have no facet "
+                    f"{unknown[0]}. Expected one of {', '.join(available)}.",
+                )
+            if not 0 <= limit <= MAX_FACET_LIMIT:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"The limit should be between 0 and {MAX_FACET_LIMIT}.",
+                )
+            try:
+                total, counts = facet_indexes.counts(
+                    resource_router.resource_name, build, filters, requested, limit
+                )
+            except Exception as e:
+                raise _wrap_as_http_exception(e)
+            content = {
+                "total": total,
+                "facets": {
+                    facet: [{"name": name, "count": count} for name, count in values]
+                    for facet, values in counts.items()
+                },
+            }
+            encoding = negotiate(request.headers.get("accept"))
+            return EncodedResponse(content, encoding, headers={"Vary": "Accept"})
+
+        return facets
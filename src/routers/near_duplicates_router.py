@@ -0,0 +1,78 @@
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from database import near_duplicates
+from routers.content_negotiation import EncodedResponse, negotiate
+from routers.resource_router import MAX_LIMIT, ResourceRouter, _wrap_as_http_exception
+
+
+class NearDuplicatesRouter:
+    """
+    Clusters of resources that are probably the same, based on the similarity of their name and
+    description. For instance, the same dataset published on multiple platforms.
+
+    It creates the endpoints:
+    - GET /near_duplicates/[resource_name_plural]/v1
+    """
+
+    def __init__(self, resource_routers: list[ResourceRouter]):
+        self.routers = [router for router in resource_routers if router.searchable]
+
+    def create(self, engine: Engine, url_prefix: str) -> APIRouter:
+        router = APIRouter()
+        for resource_router in self.routers:
+            router.add_api_route(
+                path=f"{url_prefix}/near_duplicates/{resource_router.resource_name_plural}/v1",
+                endpoint=self.near_duplicates_func(engine, resource_router),
+                name=f"Near-duplicate {resource_router.resource_name_plural}",
+                tags=["search"],
+            )
+        return router
+
+    @staticmethod
+    def near_duplicates_func(engine: Engine, resource_router: ResourceRouter):
+        def get_near_duplicates(
+            request: Request,
+            cross_platform: bool = Query(
+                False, description="Only return clusters spanning multiple platforms."
+            ),
+            offset: int = 0,
+            limit: int = 10,
+        ):
+            f"""Clusters of {resource_router.resource_name_plural} that are probably
+            duplicates, ordered by the lowest identifier in the cluster."""
+            if not 0 <= limit <= MAX_LIMIT or offset < 0:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"The limit should be between 0 and {MAX_LIMIT}, and the offset should "
+                    "not be negative.",
+                )
+            try:
+                with Session(engine) as session:
+                    clusters = near_duplicates.clusters(
+                        session,
+                        resource_router.resource_name,
+                        resource_router.resource_class,
+                        cross_platform=cross_platform,
+                        offset=offset,
+                        limit=limit,
+                    )
+                    content = [
+                        [
+                            {
+                                "identifier": resource.identifier,
+                                "platform": resource.platform,
+                                "platform_identifier": resource.platform_identifier,
+                                "name": resource.name,
+                            }
+                            for resource in cluster
+                        ]
+                        for cluster in clusters
+                    ]
+            except Exception as e:
+                raise _wrap_as_http_exception(e)
+            encoding = negotiate(request.headers.get("accept"))
+            return EncodedResponse(content, encoding, headers={"Vary": "Accept"})
+
+        return get_near_duplicates
@@ -0,0 +1,74 @@
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from database import geo_search
+from routers.content_negotiation import EncodedResponse, negotiate
+from routers.resource_router import MAX_LIMIT, ResourceRouter, _wrap_as_http_exception
+from routers.search_router import serialized_resources
+
+
+class NearestRouter:
+    """
+    The resources located nearest to a point, for the resources that have a location.
+
+    It creates the endpoints:
+    - GET /nearest/[resource_name_plural]/v1
+    """
+
+    def __init__(self, resource_routers: list[ResourceRouter]):
+        self.routers = [
+            router
+            for router in resource_routers
+            if geo_search.location_column(router.resource_class) is not None
+        ]
+
+    def create(self, engine: Engine, url_prefix: str) -> APIRouter:
+        router = APIRouter()
+        for resource_router in self.routers:
+            router.add_api_route(
+                path=f"{url_prefix}/nearest/{resource_router.resource_name_plural}/v1",
+                endpoint=self.nearest_func(engine, resource_router),
+                name=f"Nearest {resource_router.resource_name_plural}",
+                tags=[resource_router.resource_name_plural],
+            )
+        return router
+
+    @staticmethod
+    def nearest_func(engine: Engine, resource_router: ResourceRouter):
+        def nearest(
+            request: Request,
+            latitude: float = Query(description="The latitude in degrees (WGS84)."),
+            longitude: float = Query(description="The longitude in degrees (WGS84)."),
+            k: int = Query(10, description="The number of resources."),
+        ):
+            f"""The {resource_router.resource_name_plural} located nearest to a point, the
+            nearest first, with their great-circle distance in kilometers."""
+            if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="The latitude should be between -90 and 90, and the longitude between "
+                    "-180 and 180.",
+                )
+            if not 0 <= k <= MAX_LIMIT:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"k should be between 0 and {MAX_LIMIT}.",
+                )
+            try:
+                with Session(engine) as session:
+                    found = geo_search.nearest(
+                        session, resource_router.resource_class, latitude, longitude, k
+                    )
+                    distances = dict(found)
+                    resources = serialized_resources(session, resource_router, list(distances))
+                content = [
+                    {"distance_km": distances[resource["identifier"]], "resource": resource}
+                    for resource in resources
+                ]
+            except Exception as e:
+                raise _wrap_as_http_exception(e)
+            encoding = negotiate(request.headers.get("accept"))
+            return EncodedResponse(content, encoding, headers={"Vary": "Accept"})
+
+        return nearest
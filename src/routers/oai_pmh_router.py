@@ -0,0 +1,585 @@
+import base64
+import binascii
+import datetime
+import json
+from typing import Iterator
+from xml.sax.saxutils import escape, quoteattr
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import exists, func
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, select
+from starlette.responses import Response, StreamingResponse
+
+from config import OAI_PMH_CONFIG
+from database.change_log import Change, Operation
+from database.model.concept.aiod_entry import AIoDEntryORM
+from routers.resource_router import (
+    Pagination,
+    ResourceRouter,
+    _decode_cursor,
+    _wrap_as_http_exception,
+)
+
+OAI_NAMESPACE = "http://www.openarchives.org/OAI/2.0/"
+XSI_NAMESPACE = "http://www.w3.org/2001/XMLSchema-instance"
+OAI_DC_NAMESPACE = "http://www.openarchives.org/OAI/2.0/oai_dc/"
+DC_NAMESPACE = "http://purl.org/dc/elements/1.1/"
+# The records in the json schemas (schema.org, dcat-ap) are wrapped in an element of this namespace
+JSON_NAMESPACE = "https://aiod.eu/oai-pmh/json/"
+
+OAI_DC = "oai_dc"
+JSON_SCHEMAS = {
+    "schema.org": "https://schema.org/version/latest/schemaorg-current-https.jsonld",
+    "dcat-ap": "https://www.w3.org/ns/dcat.jsonld",
+}
+DATESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+DATE_FORMAT = "%Y-%m-%d"
+# The type in a resumption token of the deleted records, which are listed after the resources
+DELETED = "deleted"
+
+_ARGUMENTS = {
+    "Identify": (set(), set()),
+    "ListMetadataFormats": (set(), {"identifier"}),
+    "ListSets": (set(), set()),
+    "GetRecord": ({"identifier", "metadataPrefix"}, set()),
+    "ListIdentifiers": ({"metadataPrefix"}, {"from", "until", "set"}),
+    "ListRecords": ({"metadataPrefix"}, {"from", "until", "set"}),
+}
+_DC_TYPES = {"dataset": "Dataset", "publication": "Text"}
+
+
+class OaiPmhError(Exception):
+    """An error reported in an OAI-PMH response, such as badArgument or idDoesNotExist"""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class OaiPmhRouter:
+    """
+    An OAI-PMH 2.0 provider, so that the datasets and publications can be harvested by
+    aggregators. Each resource type is a set, such as "datasets".
+
+    It creates the endpoints:
+    - GET /oai/v1?verb=...
+    - POST /oai/v1, with the arguments form-encoded in the body
+
+    The records are ordered by the date_modified of their aiod_entry, which is used as datestamp
+    for selective harvesting, and selected using keyset pagination. A list is returned in pages
+    of page_size records, each with a resumptionToken pointing to the next page, and the records
+    of a page are streamed while they are serialized.
+
+    Besides oai_dc, the metadata is available in the schema.org and DCAT-AP schemas of the
+    resource routers, wrapped as json in an XML element.
+
+    The deleted resources are reported as deleted records, using the tombstones of the change log
+    (see database/change_log.py), which are kept persistently. They are listed after the
+    resources, ordered by the change log, with the time of deletion as datestamp.
+    """
+
+    resource_names = ("dataset", "publication")
+
+    def __init__(self, resource_routers: list[ResourceRouter]):
+        self.routers = [
+            router for router in resource_routers if router.resource_name in self.resource_names
+        ]
+        self.routers_by_name = {router.resource_name: router for router in self.routers}
+        self.repository_identifier = OAI_PMH_CONFIG.get("repository_identifier", "aiod.eu")
+        self.page_size = OAI_PMH_CONFIG.get("page_size", 100)
+
+    def create(self, engine: Engine, url_prefix: str) -> APIRouter:
+        router = APIRouter()
+
+        @router.get(f"{url_prefix}/oai/v1", tags=["oai-pmh"])
+        def oai_pmh(request: Request):
+            """
+            An OAI-PMH 2.0 endpoint. See https://www.openarchives.org/OAI/openarchivesprotocol.html
+            for the verbs and their arguments.
+            """
+            return self.handle(engine, _base_url(request), request.query_params.multi_items())
+
+        @router.post(f"{url_prefix}/oai/v1", tags=["oai-pmh"])
+        def oai_pmh_post(request: Request, items: list = Depends(_form_items)):
+            """
+            An OAI-PMH 2.0 endpoint, with the arguments encoded as application/x-www-form-urlencoded
+            in the body of the request.
+            """
+            return self.handle(engine, _base_url(request), items)
+
+        return router
+
+    def handle(self, engine: Engine, base_url: str, items: list[tuple[str, str]]) -> Response:
+        arguments = dict(items)
+        verb = arguments.get("verb")
+        try:
+            if len(arguments) != len(items):
+                raise OaiPmhError("badArgument", "The request contains a repeated argument.")
+            if verb not in _ARGUMENTS:
+                raise OaiPmhError("badVerb", f"Illegal OAI verb {verb}.")
+            del arguments["verb"]
+            _validate_arguments(verb, arguments)
+            if verb in ("ListIdentifiers", "ListRecords"):
+                records = self.list_records(
+                    engine, arguments, headers_only=verb == "ListIdentifiers"
+                )
+                return StreamingResponse(
+                    _envelope(base_url, verb, arguments, records),
+                    media_type="text/xml",
+                )
+            with Session(engine) as session:
+                if verb == "Identify":
+                    body = self.identify(session, base_url)
+                elif verb == "ListMetadataFormats":
+                    body = self.list_metadata_formats(session, arguments.get("identifier"))
+                elif verb == "ListSets":
+                    body = self.list_sets()
+                else:
+                    body = self.get_record(session, arguments)
+        except OaiPmhError as e:
+            error = f"<error code={quoteattr(e.code)}>{escape(e.message)}</error>"
+            # The arguments are not echoed in the request element of an error response
+            content = "".join(_envelope(base_url, None, {}, iter([error])))
+            return Response(content, media_type="text/xml")
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise _wrap_as_http_exception(e)
+        content = "".join(_envelope(base_url, verb, arguments, iter([body])))
+        return Response(content, media_type="text/xml")
+
+    def identify(self, session: Session, base_url: str) -> str:
+        earliest = [
+            session.scalar(
+                router._join_aiod_entry(
+                    select(func.min(AIoDEntryORM.date_modified)).select_from(router.resource_class)
+                )
+            )
+            for router in self.routers
+        ]
+        earliest.append(
+            session.scalar(
+                select(func.min(Change.date_modified)).where(
+                    Change.resource_type.in_(list(self.routers_by_name)),
+                    Change.operation == Operation.DELETE.value,
+                )
+            )
+        )
+        earliest_datestamp = min(
+            (date for date in earliest if date is not None),
+            default=datetime.datetime(1970, 1, 1),
+        )
+        return (
+            "<Identify>"
+            f"<repositoryName>{escape(OAI_PMH_CONFIG.get('repository_name', 'AIoD'))}"
+            "</repositoryName>"
+            f"<baseURL>{escape(base_url)}</baseURL>"
+            "<protocolVersion>2.0</protocolVersion>"
+            f"<adminEmail>{escape(OAI_PMH_CONFIG.get('admin_email', ''))}</adminEmail>"
+            f"<earliestDatestamp>{earliest_datestamp.strftime(DATESTAMP_FORMAT)}"
+            "</earliestDatestamp>"
+            "<deletedRecord>persistent</deletedRecord>"
+            "<granularity>YYYY-MM-DDThh:mm:ssZ</granularity>"
+            "</Identify>"
+        )
+
+    def list_metadata_formats(self, session: Session, identifier: str | None) -> str:
+        routers = self.routers
+        if identifier is not None:
+            router, resource_identifier = self._parse_identifier(identifier)
+            self._retrieve(session, router, resource_identifier)
+            routers = [router]
+        formats = [
+            (OAI_DC, "http://www.openarchives.org/OAI/2.0/oai_dc.xsd", OAI_DC_NAMESPACE),
+        ] + [
+            (prefix, schema, JSON_NAMESPACE)
+            for prefix, schema in JSON_SCHEMAS.items()
+            if any(prefix in router.schema_converters for router in routers)
+        ]
+        return (
+            "<ListMetadataFormats>"
+            + "".join(
+                "<metadataFormat>"
+                f"<metadataPrefix>{escape(prefix)}</metadataPrefix>"
+                f"<schema>{escape(schema)}</schema>"
+                f"<metadataNamespace>{escape(namespace)}</metadataNamespace>"
+                "</metadataFormat>"
+                for prefix, schema, namespace in formats
+            )
+            + "</ListMetadataFormats>"
+        )
+
+    def list_sets(self) -> str:
+        return (
+            "<ListSets>"
+            + "".join(
+                f"<set><setSpec>{router.resource_name_plural}</setSpec>"
+                f"<setName>{router.resource_name_plural.capitalize()}</setName></set>"
+                for router in self.routers
+            )
+            + "</ListSets>"
+        )
+
+    def get_record(self, session: Session, arguments: dict[str, str]) -> str:
+        router, resource_identifier = self._parse_identifier(arguments["identifier"])
+        prefix = arguments["metadataPrefix"]
+        self._raise_error_if_unsupported(router, prefix)
+        resource = self._retrieve(session, router, resource_identifier)
+        return f"<GetRecord>{self._record(session, router, resource, prefix)}</GetRecord>"
+
+    def list_records(
+        self, engine: Engine, arguments: dict[str, str], headers_only: bool
+    ) -> Iterator[str]:
+        """
+        Select a page of records, and return an iterator over the XML of the records, followed by
+        the resumption token. The arguments are validated before the response starts streaming.
+        """
+        token = arguments.get("resumptionToken")
+        if token is not None:
+            arguments = _decode_token(token)
+        prefix = arguments["metadataPrefix"]
+        date_from = _parse_date(arguments.get("from"), end=False)
+        date_until = _parse_date(arguments.get("until"), end=True)
+        if (
+            "from" in arguments
+            and "until" in arguments
+            and len(arguments["from"]) != len(arguments["until"])
+        ):
+            raise OaiPmhError("badArgument", "The from and until have different granularities.")
+        routers = self.routers
+        if "set" in arguments:
+            routers = [r for r in self.routers if r.resource_name_plural == arguments["set"]]
+        routers = [router for router in routers if _supports(router, prefix)]
+        if not routers:
+            if not any(_supports(router, prefix) for router in self.routers):
+                raise OaiPmhError(
+                    "cannotDisseminateFormat", f"The metadataPrefix {prefix} is not supported."
+                )
+            raise OaiPmhError("noRecordsMatch", "No records match the set.")
+        start = 0
+        if "type" in arguments:
+            names = [router.resource_name for router in routers] + [DELETED]
+            if arguments["type"] not in names:
+                raise OaiPmhError("badResumptionToken", "The resumptionToken is invalid.")
+            start = names.index(arguments["type"])
+
+        session = Session(engine)
+        try:
+            page: list[tuple[ResourceRouter, object]] = []
+            next_cursor = arguments.get("next")
+            for router in routers[start:]:
+                query = router._join_aiod_entry(select(router.resource_class)).where(
+                    AIoDEntryORM.date_modified.is_not(None)
+                )
+                if date_from is not None:
+                    query = query.where(AIoDEntryORM.date_modified >= date_from)
+                if date_until is not None:
+                    query = query.where(AIoDEntryORM.date_modified < date_until)
+                limit = self.page_size + 1 - len(page)
+                pagination = Pagination(limit=limit, next=next_cursor, sort="date_modified")
+                query = router._paginate(query, pagination, aiod_entry_joined=True)
+                resources = session.scalars(query.options(*router._load_options)).all()
+                page.extend((router, resource) for resource in resources)
+                next_cursor = None
+                if len(page) > self.page_size:
+                    break
+            if len(page) <= self.page_size:
+                limit = self.page_size + 1 - len(page)
+                page.extend(
+                    _tombstones(session, routers, date_from, date_until, next_cursor, limit)
+                )
+        except BaseException:
+            session.close()
+            raise
+        if not page:
+            session.close()
+            raise OaiPmhError("noRecordsMatch", "No records match the arguments.")
+        return self._stream_page(session, page, arguments, prefix, headers_only, token)
+
+    def _stream_page(
+        self,
+        session: Session,
+        page: list,
+        arguments: dict,
+        prefix: str,
+        headers_only: bool,
+        token: str | None,
+    ) -> Iterator[str]:
+        with session:
+            cursor = arguments.get("cursor", 0)
+            for router, resource in page[: self.page_size]:
+                if headers_only:
+                    yield self._header(router, resource)
+                else:
+                    yield self._record(session, router, resource, prefix)
+            if len(page) > self.page_size:
+                router, last = page[self.page_size - 1]
+                if isinstance(last, Change):
+                    position = {
+                        "type": DELETED,
+                        "next": ResourceRouter._cursor(last.identifier, None, "identifier"),
+                    }
+                else:
+                    position = {
+                        "type": router.resource_name,
+                        "next": ResourceRouter._cursor(
+                            last.identifier, last.aiod_entry.date_modified, "date_modified"
+                        ),
+                    }
+                next_arguments = (
+                    {
+                        key: value
+                        for key, value in arguments.items()
+                        if key in ("metadataPrefix", "from", "until", "set")
+                    }
+                    | position
+                    | {"cursor": cursor + self.page_size}
+                )
+                yield (
+                    f'<resumptionToken cursor="{cursor}">{_encode_token(next_arguments)}'
+                    "</resumptionToken>"
+                )
+            elif token is not None:
+                # The last page of a list that was resumed has an empty resumption token
+                yield f'<resumptionToken cursor="{cursor}"/>'
+
+    def _record(self, session: Session, router: ResourceRouter, resource, prefix: str) -> str:
+        if isinstance(resource, Change):  # A deleted record has no metadata
+            return f"<record>{self._header(router, resource)}</record>"
+        if prefix == OAI_DC:
+            metadata = _oai_dc(router, resource)
+        else:
+            serialize = router._serializer(session, prefix, router.resource_class_read)
+            serialized = json.dumps(serialize(resource), ensure_ascii=False)
+            metadata = (
+                f'<json xmlns="{JSON_NAMESPACE}" schema={quoteattr(prefix)}>'
+                f"{escape(serialized)}</json>"
+            )
+        return f"<record>{self._header(router, resource)}<metadata>{metadata}</metadata></record>"
+
+    def _header(self, router: ResourceRouter, resource) -> str:
+        if isinstance(resource, Change):
+            resource_identifier = resource.resource_identifier
+            date_modified = resource.date_modified
+            status = ' status="deleted"'
+        else:
+            resource_identifier = resource.identifier
+            date_modified = resource.aiod_entry.date_modified
+            status = ""
+        identifier = (
+            f"oai:{self.repository_identifier}:{router.resource_name}/{resource_identifier}"
+        )
+        datestamp = date_modified.strftime(DATESTAMP_FORMAT)
+        return (
+            f"<header{status}><identifier>{escape(identifier)}</identifier>"
+            f"<datestamp>{datestamp}</datestamp>"
+            f"<setSpec>{router.resource_name_plural}</setSpec></header>"
+        )
+
+    def _parse_identifier(self, identifier: str) -> tuple[ResourceRouter, int]:
+        prefix = f"oai:{self.repository_identifier}:"
+        resource_name, _, resource_identifier = identifier.removeprefix(prefix).partition("/")
+        if (
+            not identifier.startswith(prefix)
+            or resource_name not in self.routers_by_name
+            or not resource_identifier.isdigit()
+        ):
+            raise OaiPmhError("idDoesNotExist", f"The identifier {identifier} does not exist.")
+        return self.routers_by_name[resource_name], int(resource_identifier)
+
+    @staticmethod
+    def _retrieve(session: Session, router: ResourceRouter, identifier: int):
+        """The resource, or the tombstone of the resource if it has been deleted"""
+        resource = session.scalars(
+            select(router.resource_class)
+            .where(router.resource_class.identifier == identifier)
+            .options(*router._load_options)
+        ).first()
+        if resource is not None and resource.aiod_entry is not None:
+            return resource
+        tombstone = session.scalars(
+            _tombstones_query([router.resource_name]).where(
+                Change.resource_identifier == identifier
+            )
+        ).first()
+        if tombstone is None:
+            raise OaiPmhError(
+                "idDoesNotExist", f"The {router.resource_name} {identifier} does not exist."
+            )
+        return tombstone
+
+    @staticmethod
+    def _raise_error_if_unsupported(router: ResourceRouter, prefix: str):
+        if not _supports(router, prefix):
+            raise OaiPmhError(
+                "cannotDisseminateFormat",
+                f"The metadataPrefix {prefix} is not supported for {router.resource_name_plural}.",
+            )
+
+
+def _tombstones(
+    session: Session,
+    routers: list[ResourceRouter],
+    date_from: datetime.datetime | None,
+    date_until: datetime.datetime | None,
+    next_cursor: str | None,
+    limit: int,
+) -> list[tuple[ResourceRouter, Change]]:
+    """The (router, tombstone) of a page of the deleted resources, ordered by the change log"""
+    routers_by_name = {router.resource_name: router for router in routers}
+    query = _tombstones_query(list(routers_by_name))
+    if date_from is not None:
+        query = query.where(Change.date_modified >= date_from)
+    if date_until is not None:
+        query = query.where(Change.date_modified < date_until)
+    if next_cursor is not None:
+        (after,) = _decode_cursor(next_cursor, "identifier")
+        query = query.where(Change.identifier > after)
+    changes = session.scalars(query.order_by(Change.identifier).limit(limit)).all()
+    return [(routers_by_name[change.resource_type], change) for change in changes]
+
+
+def _tombstones_query(resource_types: list[str]):
+    """
+    Select the deletions that are the last change of a resource. A resource of which the
+    identifier was reused after it was deleted is not reported as deleted.
+    """
+    later = aliased(Change)
+    return select(Change).where(
+        Change.resource_type.in_(resource_types),
+        Change.operation == Operation.DELETE.value,
+        ~exists().where(
+            later.resource_type == Change.resource_type,
+            later.resource_identifier == Change.resource_identifier,
+            later.identifier > Change.identifier,
+        ),
+    )
+
+
+def _base_url(request: Request) -> str:
+    return str(request.url.replace(query=""))
+
+
+async def _form_items(request: Request) -> list[tuple[str, str]]:
+    """The arguments of a POST request, which are form-encoded in its body"""
+    form = await request.form()
+    return [(key, value) for key, value in form.multi_items() if isinstance(value, str)]
+
+
+def _supports(router: ResourceRouter, prefix: str) -> bool:
+    return prefix == OAI_DC or (prefix in JSON_SCHEMAS and prefix in router.schema_converters)
+
+
+def _validate_arguments(verb: str, arguments: dict[str, str]):
+    required, optional = _ARGUMENTS[verb]
+    if verb in ("ListIdentifiers", "ListRecords", "ListSets") and "resumptionToken" in arguments:
+        # The resumptionToken is an exclusive argument
+        if len(arguments) > 1:
+            raise OaiPmhError("badArgument", "The resumptionToken is an exclusive argument.")
+        if verb == "ListSets":
+            raise OaiPmhError("badResumptionToken", "The resumptionToken is invalid.")
+        return
+    missing = required - set(arguments)
+    illegal = set(arguments) - required - optional
+    if missing or illegal:
+        raise OaiPmhError(
+            "badArgument",
+            f"Missing arguments: {', '.join(sorted(missing)) or 'none'}. Illegal arguments: "
+            f"{', '.join(sorted(illegal)) or 'none'}.",
+        )
+
+
+def _parse_date(value: str | None, end: bool) -> datetime.datetime | None:
+    """
+    Parse a from or until argument. The until is inclusive, so its end (the start of the next
+    second or day) is returned.
+    """
+    if value is None:
+        return None
+    for date_format, granularity in (
+        (DATE_FORMAT, datetime.timedelta(days=1)),
+        (DATESTAMP_FORMAT, datetime.timedelta(seconds=1)),
+    ):
+        try:
+            parsed = datetime.datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+        return parsed + granularity if end else parsed
+    raise OaiPmhError("badArgument", f"Invalid date {value}.")
+
+
+def _encode_token(arguments: dict) -> str:
+    serialized = json.dumps(arguments).encode("utf-8")
+    return base64.urlsafe_b64encode(serialized).decode("ascii")
+
+
+def _decode_token(token: str) -> dict:
+    try:
+        arguments = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+        if not isinstance(arguments.get("metadataPrefix"), str) or not isinstance(
+            arguments.get("cursor"), int
+        ):
+            raise ValueError("Invalid resumption token")
+        sort = "identifier" if arguments.get("type") == DELETED else "date_modified"
+        _decode_cursor(arguments["next"], sort)
+        return arguments
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError, AttributeError):
+        pass
+    except HTTPException:
+        pass
+    raise OaiPmhError("badResumptionToken", "The resumptionToken is invalid or expired.")
+
+
+def _oai_dc(router: ResourceRouter, resource) -> str:
+    """The Dublin Core metadata of a resource"""
+    elements = [("title", resource.name)]
+    # Sorted, so that the metadata of a record does not change as long as the resource does not
+    elements += [
+        ("creator", name) for name in sorted(c.name for c in resource.creator if c.name is not None)
+    ]
+    elements += [("subject", keyword) for keyword in sorted(k.name for k in resource.keyword)]
+    elements += [("description", resource.description)]
+    if resource.date_published is not None:
+        elements.append(("date", resource.date_published.strftime(DATE_FORMAT)))
+    elements.append(("type", _DC_TYPES.get(router.resource_name)))
+    elements.append(("identifier", resource.same_as))
+    if resource.license is not None:
+        elements.append(("rights", resource.license.name))
+    elements.append(("publisher", resource.platform))
+    return (
+        f'<oai_dc:dc xmlns:oai_dc="{OAI_DC_NAMESPACE}" xmlns:dc="{DC_NAMESPACE}" '
+        f'xsi:schemaLocation="{OAI_DC_NAMESPACE} http://www.openarchives.org/OAI/2.0/oai_dc.xsd">'
+        + "".join(
+            f"<dc:{name}>{escape(str(value))}</dc:{name}>"
+            for name, value in elements
+            if value is not None
+        )
+        + "</oai_dc:dc>"
+    )
+
+
+def _envelope(
+    base_url: str, verb: str | None, arguments: dict, body: Iterator[str]
+) -> Iterator[str]:
+    """The OAI-PMH response around the body"""
+    response_date = datetime.datetime.utcnow().strftime(DATESTAMP_FORMAT)
+    attributes = "".join(
+        f" {name}={quoteattr(value)}"
+        for name, value in ([("verb", verb)] if verb else []) + sorted(arguments.items())
+    )
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f'<OAI-PMH xmlns="{OAI_NAMESPACE}" xmlns:xsi="{XSI_NAMESPACE}" '
+        f'xsi:schemaLocation="{OAI_NAMESPACE} http://www.openarchives.org/OAI/2.0/OAI-PMH.xsd">'
+        f"<responseDate>{response_date}</responseDate>"
+        f"<request{attributes}>{escape(base_url)}</request>"
+    )
+    if verb in ("ListIdentifiers", "ListRecords"):
+        yield f"<{verb}>"
+    yield from body
+    if verb in ("ListIdentifiers", "ListRecords"):
+        yield f"</{verb}>"
+    yield "</OAI-PMH>"
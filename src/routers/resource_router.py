@@ -1,35 +1,132 @@
 import abc
+import base64
+import binascii
 import datetime
+import email.utils
+import hashlib
+import json
+import logging
 import traceback
-from functools import partial
-from typing import Literal, Union, Any
+from functools import partial, cached_property
+from typing import Callable, Iterator, Literal, Union, Any
 from typing import TypeVar, Type
+from urllib.parse import urlencode
 from wsgiref.handlers import format_date_time
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.encoders import jsonable_encoder
-from pydantic import BaseModel
-from sqlalchemy import and_, delete
+from pydantic import BaseModel, Field, create_model
+from sqlalchemy import and_, delete, or_
+from sqlalchemy import inspect
 from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
 from sqlmodel import SQLModel, Session, select
-from starlette.responses import JSONResponse
+from starlette.datastructures import Headers
+from starlette.responses import Response, StreamingResponse
 
 from authentication import get_current_user
+from cache import CachedResponse, SingleFlight, response_cache
 from config import KEYCLOAK_CONFIG
 from converters.schema_converters.schema_converter import SchemaConverter
+from database import change_log, geo_search, near_duplicates, resource_counts
+from database.document_store import (
+    ResourceDocument,
+    delete_documents,
+    get_documents,
+    store_documents,
+)
+from database.model.ai_asset.license import License
 from database.model.ai_resource.resource import AIResource
+from database.model.compiled_serializer import compile_serializer
+from database.model.concept.aiod_entry import AIoDEntryORM
+from database.model.concept.status import Status
+from database.model.load_options import load_options
 from database.model.platform.platform import Platform
 from database.model.platform.platform_names import PlatformName
+from database.model.helper_functions import get_relationships
 from database.model.resource_read_and_create import (
     resource_create,
     resource_read,
+    resource_read_projection,
 )
 from database.model.serializers import deserialize_resource_relationships
+from routers.content_negotiation import JSON, EncodedResponse, Encoding, negotiate
+from routers.expansion import (
+    EXPAND_DEPTH_DESCRIPTION,
+    EXPAND_DESCRIPTION,
+    Expansion,
+    expand as expand_relations,
+    parse_expand,
+)
+from search import (
+    facet_indexes,
+    facet_values,
+    search_document,
+    search_index,
+    similarity_indexes,
+)
+
+
+MAX_LIMIT = 1000
+EXPORT_BATCH_SIZE = 500
+CONDITIONAL_HEADERS = ("if-none-match", "if-modified-since")
+
+
+class BatchGet(BaseModel):
+    identifiers: list[int] = Field(
+        description=f"The AIoD identifiers of the resources to return, at most {MAX_LIMIT}.",
+        example=[1, 2, 3],
+    )
 
 
 class Pagination(BaseModel):
+    """
+    Offset-based or cursor-based (keyset) pagination.
+
+    The `next` cursor is returned in the Link header of a list response. Using it instead of an
+    offset results in a query that does not get slower for deeper pages.
+    """
+
     offset: int = 0
     limit: int = 100
+    next: str | None = None
+    sort: Literal["identifier", "date_modified"] = "identifier"
+
+
+class Filters(BaseModel):
+    """
+    Filters on a list of resources. A resource is returned only if it matches all given filters.
+    The filters are only available for resources that have the filtered attribute.
+    """
+
+    modified_since: datetime.datetime | datetime.date | None = None
+    date_published_from: datetime.datetime | datetime.date | None = None
+    date_published_before: datetime.datetime | datetime.date | None = None
+    status: str | None = None
+    keyword: str | None = None
+    license: str | None = None
+    application_area: str | None = None
+    bbox: str | None = Field(
+        default=None,
+        description="Only return resources located in this bounding box, given as "
+        "'min_longitude,min_latitude,max_longitude,max_latitude' in degrees.",
+        example="2.5,49.5,6.4,51.5",
+    )
+    near: str | None = Field(
+        default=None,
+        description="Only return resources located within radius_km of this point, given as "
+        "'latitude,longitude' in degrees.",
+        example="50.85,4.35",
+    )
+    radius_km: float | None = Field(default=None, description="The radius of the near filter.")
+
+
+FIELDS_DESCRIPTION = (
+    "A comma-separated list of fields to return, such as 'name,platform,aiod_entry'. The "
+    "identifier is always returned. Only supported for the aiod schema."
+)
 
 
 RESOURCE = TypeVar("RESOURCE", bound=AIResource)
@@ -43,8 +140,11 @@ class ResourceRouter(abc.ABC):
 
     It creates the basic endpoints for each resource:
     - GET /[resource]s/
+    - GET /[resource]s/export
     - GET /[resource]s/{identifier}
+    - POST /[resource]s/batch_get
     - GET /platforms/{platform_name}/[resource]s/
+    - GET /platforms/{platform_name}/[resource]s/export
     - GET /platforms/{platform_name}/[resource]s/{identifier}
     - POST /[resource]s
     - PUT /[resource]s/{identifier}
@@ -54,6 +154,8 @@ class ResourceRouter(abc.ABC):
     def __init__(self):
         self.resource_class_create = resource_create(self.resource_class)
         self.resource_class_read = resource_read(self.resource_class)
+        self._projections: dict[frozenset[str], Type[SQLModel]] = {}
+        self._single_flight: SingleFlight[CachedResponse] = SingleFlight()
 
     @property
     @abc.abstractmethod
@@ -137,6 +239,25 @@ class ResourceRouter(abc.ABC):
             name=self.resource_name,
             **default_kwargs,
         )
+        router.add_api_route(
+            path=f"{url_prefix}/{self.resource_name_plural}/{version}/export",
+            endpoint=self.export_resources_func(engine),
+            response_class=StreamingResponse,
+            name=f"Export {self.resource_name_plural}",
+            **default_kwargs,
+        )
+        router.add_api_route(
+            path=f"{url_prefix}/{self.resource_name_plural}/{version}/batch_get",
+            methods={"POST"},
+            endpoint=self.get_resources_by_identifiers_func(engine),
+            response_model=create_model(  # type: ignore
+                f"{self.resource_class_read.__name__}Batch",
+                resources=(list[response_model], ...),  # type: ignore
+                not_found=(list[int], ...),
+            ),
+            name=f"Batch get {self.resource_name_plural}",
+            **default_kwargs,
+        )
         router.add_api_route(
             path=url_prefix + f"/{self.resource_name_plural}/{version}/{{identifier}}",
             endpoint=self.get_resource_func(engine),
@@ -165,6 +286,14 @@ class ResourceRouter(abc.ABC):
             name=f"List {self.resource_name_plural}",
             **default_kwargs,
         )
+        router.add_api_route(
+            path=f"{url_prefix}/platforms/{{platform}}/{self.resource_name_plural}/{version}"
+            f"/export",
+            endpoint=self.export_platform_resources_func(engine),
+            response_class=StreamingResponse,
+            name=f"Export {self.resource_name_plural}",
+            **default_kwargs,
+        )
         router.add_api_route(
             path=f"{url_prefix}/platforms/{{platform}}/{self.resource_name_plural}/{version}"
             f"/{{identifier}}",
@@ -176,47 +305,534 @@ class ResourceRouter(abc.ABC):
         return router
 
     def get_resources(
-        self, engine: Engine, schema: str, pagination: Pagination, platform: str | None = None
+        self,
+        engine: Engine,
+        schema: str,
+        pagination: Pagination,
+        platform: str | None = None,
+        request: Request | None = None,
+        fields: str | None = None,
+        expand: str | None = None,
+        expand_depth: int = 1,
+        filters: Filters | None = None,
     ):
         """Fetch all resources of this platform in given schema, using pagination"""
         _raise_error_on_invalid_schema(self._possible_schemas, schema)
+        _raise_error_on_invalid_pagination(pagination)
+        read_class, options = self._read_class_and_options(schema, fields)
+        expansion = parse_expand(self.resource_class, expand, expand_depth, schema)
+        where_clause = and_(
+            self.resource_class.platform == platform if platform is not None else True,
+            *self._filter_clauses(filters if filters is not None else Filters()),
+        )
+        fetch = partial(
+            self._fetch_resources,
+            engine=engine,
+            schema=schema,
+            pagination=pagination,
+            where_clause=where_clause,
+            request=request,
+            fields=fields,
+            read_class=read_class,
+            options=options,
+            expansion=expansion,
+        )
+        return self._respond(
+            request, fetch, cacheable=self._depends_only_on_resource(schema, expansion)
+        )
+
+    def _fetch_resources(
+        self,
+        engine: Engine,
+        schema: str,
+        pagination: Pagination,
+        where_clause,
+        request: Request | None,
+        fields: str | None,
+        read_class: Type,
+        options: list,
+        expansion: Expansion | None,
+    ):
+        encoding = _encoding(request)
         try:
             with Session(engine) as session:
-                convert_schema = (
-                    partial(self.schema_converters[schema].convert, session)
-                    if schema != "aiod"
-                    else self.resource_class_read.from_orm
+                serialize = self._serializer(session, schema, read_class)
+                headers = _vary_headers(request)
+                validated = self._supports_conditional_requests and self._depends_only_on_resource(
+                    schema, expansion
+                )
+                if validated:
+                    metadata_query = self._paginate(
+                        self._metadata_query().where(where_clause),
+                        pagination,
+                        aiod_entry_joined=True,
+                    )
+                    metadata = session.execute(metadata_query).all()
+                    headers |= self._validation_headers(metadata, schema, fields, encoding)
+                    if request is not None and _is_not_modified(request, headers):
+                        return self._not_modified_response(headers)
+                    if request is not None and fields is None:
+                        if len(metadata) == pagination.limit > 0:
+                            headers["Link"] = self._next_link(request, *metadata[-1], pagination)
+                        documents = self._documents(session, metadata)
+                        return self._documents_response(documents, headers, encoding, many=True)
+
+                query = self._paginate(
+                    select(self.resource_class).where(where_clause), pagination
+                ).options(*options)
+                resources = session.scalars(query).all()
+                if request is not None and len(resources) == pagination.limit > 0:
+                    last = resources[-1]
+                    aiod_entry = getattr(last, "aiod_entry", None)
+                    date_modified = aiod_entry.date_modified if aiod_entry else None
+                    headers["Link"] = self._next_link(
+                        request, last.identifier, date_modified, pagination
+                    )
+                response = self._wrap_with_headers(
+                    self._expand(session, [serialize(r) for r in resources], expansion),
+                    headers=headers,
+                    always_wrap=fields is not None or request is not None,
+                    encoding=encoding,
+                )
+                if request is not None and self._validated_by_content(schema, expansion):
+                    return self._with_content_etag(request, response)
+                return response
+        except Exception as e:
+            raise _wrap_as_http_exception(e)
+
+    def _filter_clauses(self, filters: Filters) -> list:
+        """
+        The WHERE clauses of the filters. Filters on related objects are expressed as IN
+        subqueries, so that they can use the indexes of the related tables and do not interfere
+        with the joins used for pagination.
+        """
+        clauses = []
+        if filters.modified_since is not None or filters.status is not None:
+            self._raise_error_if_not_filterable("aiod_entry", "modified_since or status")
+            entries = select(AIoDEntryORM.identifier)
+            if filters.modified_since is not None:
+                modified_since = _as_datetime(filters.modified_since)
+                entries = entries.where(AIoDEntryORM.date_modified >= modified_since)
+            if filters.status is not None:
+                entries = entries.join(
+                    Status, AIoDEntryORM.status_identifier == Status.identifier
+                ).where(Status.name == filters.status)
+            clauses.append(self.resource_class.aiod_entry_identifier.in_(entries))
+        if filters.date_published_from is not None:
+            self._raise_error_if_not_filterable("date_published", "date_published_from")
+            date_published_from = _as_datetime(filters.date_published_from)
+            clauses.append(self.resource_class.date_published >= date_published_from)
+        if filters.date_published_before is not None:
+            self._raise_error_if_not_filterable("date_published", "date_published_before")
+            date_published_before = _as_datetime(filters.date_published_before)
+            clauses.append(self.resource_class.date_published < date_published_before)
+        if filters.license is not None:
+            self._raise_error_if_not_filterable("license", "license")
+            licenses = select(License.identifier).where(License.name == filters.license)
+            clauses.append(self.resource_class.license_identifier.in_(licenses))
+        for name in ("keyword", "application_area"):
+            value = getattr(filters, name)
+            if value is not None:
+                self._raise_error_if_not_filterable(name, name)
+                clauses.append(self.resource_class.identifier.in_(self._linked_to(name, value)))
+        if filters.bbox is not None or filters.near is not None:
+            clauses.append(self._geo_clause(filters))
+        return clauses
+
+    def _geo_clause(self, filters: Filters):
+        """The WHERE clause of the bbox and near filters, on the location of the resources"""
+        column = geo_search.location_column(self.resource_class)
+        if column is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"The {self.resource_name_plural} cannot be filtered on bbox or near.",
+            )
+        clauses = []
+        if filters.bbox is not None:
+            min_longitude, min_latitude, max_longitude, max_latitude = _parse_coordinates(
+                "bbox", filters.bbox, 4
+            )
+            locations = geo_search.in_bounding_box(
+                min_latitude, min_longitude, max_latitude, max_longitude
+            )
+            clauses.append(column.in_(locations))
+        if filters.near is not None:
+            latitude, longitude = _parse_coordinates("near", filters.near, 2)
+            if filters.radius_km is None or filters.radius_km < 0:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="The near filter requires a non-negative radius_km.",
+                )
+            locations = geo_search.within_radius(latitude, longitude, filters.radius_km)
+            clauses.append(column.in_(locations))
+        return and_(*clauses)
+
+    def _linked_to(self, relationship_name: str, name: str):
+        """Select the identifiers of the resources linked to the named object, such as a keyword"""
+        relationship = inspect(self.resource_class).relationships[relationship_name]
+        link, named = relationship.secondary, relationship.mapper.class_
+        return (
+            select(link.c.from_identifier)
+            .join(named, link.c.linked_identifier == named.identifier)
+            .where(named.name == name)
+        )
+
+    def _raise_error_if_not_filterable(self, attribute_name: str, filter_name: str):
+        if not hasattr(self.resource_class, attribute_name):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"The {self.resource_name_plural} cannot be filtered on {filter_name}.",
+            )
+
+    def _read_class_and_options(self, schema: str, fields: str | None) -> tuple[Type, list]:
+        """
+        Return the class used to serialize the resources, and the loader options needed for this
+        serialization. If fields are requested, the unrequested columns are deferred, the
+        unrequested relationships are not loaded, and a projection of the Read class is returned.
+        """
+        if fields is None:
+            return self.resource_class_read, self._load_options
+        if schema != "aiod":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Selecting fields is only supported for the aiod schema.",
+            )
+        field_names = frozenset(f.strip() for f in fields.split(",") if f.strip()) | {"identifier"}
+        unknown = field_names - set(self.resource_class_read.__fields__)
+        if any(unknown):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown field(s) {', '.join(sorted(unknown))}. Expected a subset of "
+                f"{', '.join(self.resource_class_read.__fields__)}.",
+            )
+        if field_names not in self._projections:
+            self._projections[field_names] = resource_read_projection(
+                self.resource_class_read, field_names
+            )
+        columns = {c.key for c in inspect(self.resource_class).column_attrs}
+        relationships = set(get_relationships(self.resource_class))
+        options = [
+            load_only(*(getattr(self.resource_class, name) for name in field_names & columns)),
+            *load_options(self.resource_class, attributes=field_names & relationships),
+        ]
+        return self._projections[field_names], options
+
+    def _paginate(self, query, pagination: Pagination, aiod_entry_joined: bool = False):
+        """
+        Order the query and select a single page. If a cursor is given, the page is selected using
+        a WHERE clause on the sort columns (keyset pagination) instead of an OFFSET.
+        """
+        if pagination.sort == "date_modified":
+            if not hasattr(self.resource_class, "aiod_entry"):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"The {self.resource_name_plural} cannot be sorted on date_modified.",
                 )
-                where_clause = (
-                    (self.resource_class.platform == platform) if platform is not None else True
+            date_modified = AIoDEntryORM.date_modified
+            if not aiod_entry_joined:
+                query = self._join_aiod_entry(query)
+            query = query.order_by(date_modified, self.resource_class.identifier)
+        else:
+            query = query.order_by(self.resource_class.identifier)
+
+        if pagination.next is None:
+            return query.offset(pagination.offset).limit(pagination.limit)
+
+        *values, identifier = _decode_cursor(pagination.next, pagination.sort)
+        if pagination.sort == "date_modified":
+            (last_date_modified,) = values
+            if last_date_modified is None:
+                # NULL is sorted first, both in MySQL and SQLite
+                query = query.where(
+                    or_(
+                        and_(date_modified.is_(None), self.resource_class.identifier > identifier),
+                        date_modified.is_not(None),
+                    )
+                )
+            else:
+                query = query.where(
+                    or_(
+                        date_modified > last_date_modified,
+                        and_(
+                            date_modified == last_date_modified,
+                            self.resource_class.identifier > identifier,
+                        ),
+                    )
                 )
+        else:
+            query = query.where(self.resource_class.identifier > identifier)
+        return query.limit(pagination.limit)
+
+    def _join_aiod_entry(self, query):
+        return query.outerjoin(
+            AIoDEntryORM, self.resource_class.aiod_entry_identifier == AIoDEntryORM.identifier
+        )
+
+    def _metadata_query(self):
+        """Select only the identifier and date_modified, used to validate a cached response"""
+        return self._join_aiod_entry(
+            select(self.resource_class.identifier, AIoDEntryORM.date_modified)
+        )
+
+    @property
+    def _supports_conditional_requests(self) -> bool:
+        """Only resources with a date_modified can be validated using ETags"""
+        return hasattr(self.resource_class, "aiod_entry")
+
+    def _validation_headers(
+        self,
+        metadata: list[tuple[int, datetime.datetime | None]],
+        schema: str,
+        fields: str | None,
+        encoding: Encoding = JSON,
+    ) -> dict[str, str]:
+        """
+        Create the ETag and Last-Modified headers for a representation of resources. The strong
+        ETag is a hash of the identifiers and date_modified of the resources, and of the
+        requested representation (schema, fields and media type). This relies on every write
+        setting the date_modified, which create_resource and update_resource do.
+        """
+        representation = f"{self.resource_name}:{schema}:{fields}:{encoding.media_type}"
+        hash_ = hashlib.sha256(representation.encode("utf-8"))
+        for identifier, date_modified in metadata:
+            date_str = date_modified.isoformat() if date_modified is not None else ""
+            hash_.update(f";{identifier}:{date_str}".encode("utf-8"))
+        headers = {"ETag": f'"{hash_.hexdigest()}"'}
+        dates = [date_modified for _, date_modified in metadata if date_modified is not None]
+        if any(dates):
+            last_modified = max(dates).replace(tzinfo=datetime.timezone.utc)
+            headers["Last-Modified"] = format_date_time(last_modified.timestamp())
+        return headers
+
+    @staticmethod
+    def _depends_only_on_resource(schema: str, expansion: Expansion | None) -> bool:
+        """
+        Whether a representation only changes when the resource itself changes, so that it can be
+        validated using the date_modified of the resource, cached, and stored as a document. The
+        other schemas embed the names of related resources (such as the creators), and expanded
+        responses embed the related resources, which can change independently.
+        """
+        return schema == "aiod" and expansion is None
+
+    def _validated_by_content(self, schema: str, expansion: Expansion | None) -> bool:
+        """The other schemas are validated using an ETag computed from the response body"""
+        return self._supports_conditional_requests and schema != "aiod" and expansion is None
+
+    def _with_content_etag(self, request: Request, response: Response) -> Response:
+        """
+        Add a strong ETag computed from the body, for a representation that cannot be validated
+        using the date_modified of the resources. Such a representation has no Last-Modified.
+        """
+        etag = f'"{hashlib.sha256(response.body).hexdigest()}"'
+        response.headers["ETag"] = etag
+        if _is_not_modified(request, {"ETag": etag}):
+            headers = {
+                name: value
+                for name, value in response.headers.items()
+                if name not in ("content-length", "content-type")
+            }
+            return self._not_modified_response(headers)
+        return response
+
+    def _not_modified_response(self, headers: dict[str, str]) -> Response:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers=headers | self._deprecation_headers(),
+        )
+
+    def _next_link(
+        self,
+        request: Request,
+        identifier: int,
+        date_modified: datetime.datetime | None,
+        pagination: Pagination,
+    ) -> str:
+        """The Link header pointing to the page after the resource with given identifier"""
+        cursor = self._cursor(identifier, date_modified, pagination.sort)
+        url = request.url.remove_query_params("offset").include_query_params(next=cursor)
+        return f'<{url}>; rel="next"'
+
+    @staticmethod
+    def _cursor(identifier: int, date_modified: datetime.datetime | None, sort: str) -> str:
+        """Create an opaque cursor pointing to the position directly after this resource."""
+        if sort == "date_modified":
+            values = [
+                date_modified.isoformat() if date_modified is not None else None,
+                identifier,
+            ]
+        else:
+            values = [identifier]
+        serialized = json.dumps({"sort": sort, "values": values}).encode("utf-8")
+        return base64.urlsafe_b64encode(serialized).decode("ascii")
+
+    def export_resources(
+        self, engine: Engine, schema: str, platform: str | None = None, encoding: Encoding = JSON
+    ) -> Iterator[bytes]:
+        """
+        Stream all resources (of this platform) in given schema, as newline-delimited json (or
+        as a sequence of MessagePack or CBOR objects, depending on the encoding).
+
+        The resources are retrieved in batches using keyset pagination, and the session is
+        cleared after each batch, so that the memory usage does not depend on the number of
+        resources.
+        """
+        with Session(engine) as session:
+            serialize = self._serializer(session, schema, self.resource_class_read)
+            where_clause = (
+                (self.resource_class.platform == platform) if platform is not None else True
+            )
+            last_identifier = None
+            while True:
                 query = (
                     select(self.resource_class)
                     .where(where_clause)
-                    .offset(pagination.offset)
-                    .limit(pagination.limit)
+                    .order_by(self.resource_class.identifier)
+                    .options(*self._load_options)
+                    .limit(EXPORT_BATCH_SIZE)
                 )
+                if last_identifier is not None:
+                    query = query.where(self.resource_class.identifier > last_identifier)
+                resources = session.scalars(query).all()
+                for resource in resources:
+                    yield encoding.encode_stream_item(serialize(resource))
+                if len(resources) < EXPORT_BATCH_SIZE:
+                    return
+                last_identifier = resources[-1].identifier
+                session.expunge_all()
 
-                return self._wrap_with_headers(
-                    [convert_schema(resource) for resource in session.scalars(query).all()]
+    def get_resource(
+        self,
+        engine: Engine,
+        identifier: str,
+        schema: str,
+        platform: str | None = None,
+        fields: str | None = None,
+        request: Request | None = None,
+        expand: str | None = None,
+        expand_depth: int = 1,
+    ):
+        """
+        Get the resource identified by AIoD identifier (if platform is None) or by platform AND
+        platform-identifier (if platform is not None), return in given schema.
+        """
+        _raise_error_on_invalid_schema(self._possible_schemas, schema)
+        read_class, options = self._read_class_and_options(schema, fields)
+        expansion = parse_expand(self.resource_class, expand, expand_depth, schema)
+        fetch = partial(
+            self._fetch_resource,
+            engine=engine,
+            identifier=identifier,
+            schema=schema,
+            platform=platform,
+            fields=fields,
+            request=request,
+            read_class=read_class,
+            options=options,
+            expansion=expansion,
+        )
+        return self._respond(
+            request, fetch, cacheable=self._depends_only_on_resource(schema, expansion)
+        )
+
+    def _fetch_resource(
+        self,
+        engine: Engine,
+        identifier: str,
+        schema: str,
+        platform: str | None,
+        fields: str | None,
+        request: Request | None,
+        read_class: Type,
+        options: list,
+        expansion: Expansion | None,
+    ):
+        encoding = _encoding(request)
+        try:
+            with Session(engine) as session:
+                headers = _vary_headers(request)
+                validated = self._supports_conditional_requests and self._depends_only_on_resource(
+                    schema, expansion
+                )
+                if validated:
+                    metadata_query = self._metadata_query().where(
+                        self._where_identifier(identifier, platform)
+                    )
+                    metadata = session.execute(metadata_query).first()
+                    if metadata is not None:
+                        headers |= self._validation_headers([metadata], schema, fields, encoding)
+                        if request is not None and _is_not_modified(request, headers):
+                            return self._not_modified_response(headers)
+                        if request is not None and fields is None:
+                            documents = self._documents(session, [metadata])
+                            if documents:
+                                return self._documents_response(documents, headers, encoding)
+
+                resource = self._retrieve_resource(
+                    session, identifier, platform=platform, options=options
                 )
+                serialized = self._serializer(session, schema, read_class)(resource)
+                if expansion is not None:
+                    (serialized,) = self._expand(session, [serialized], expansion)
+                response = self._wrap_with_headers(
+                    serialized,
+                    headers=headers,
+                    always_wrap=fields is not None or request is not None,
+                    encoding=encoding,
+                )
+                if request is not None and self._validated_by_content(schema, expansion):
+                    return self._with_content_etag(request, response)
+                return response
         except Exception as e:
             raise _wrap_as_http_exception(e)
 
-    def get_resource(
-        self, engine: Engine, identifier: str, schema: str, platform: str | None = None
+    def get_resources_by_identifiers(
+        self,
+        engine: Engine,
+        identifiers: list[int],
+        schema: str,
+        fields: str | None = None,
+        expand: str | None = None,
+        expand_depth: int = 1,
+        request: Request | None = None,
     ):
         """
-        Get the resource identified by AIoD identifier (if platform is None) or by platform AND
-        platform-identifier (if platform is not None), return in given schema.
+        Get the resources identified by the AIoD identifiers, in the order of the identifiers,
+        using a single query. The identifiers that do not exist are returned separately.
         """
         _raise_error_on_invalid_schema(self._possible_schemas, schema)
+        if len(identifiers) > MAX_LIMIT:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Too many identifiers ({len(identifiers)}). At most {MAX_LIMIT} resources "
+                f"can be retrieved at once.",
+            )
+        read_class, options = self._read_class_and_options(schema, fields)
+        expansion = parse_expand(self.resource_class, expand, expand_depth, schema)
+        unique_identifiers = list(dict.fromkeys(identifiers))
         try:
             with Session(engine) as session:
-                resource = self._retrieve_resource(session, identifier, platform=platform)
-                if schema != "aiod":
-                    return self.schema_converters[schema].convert(session, resource)
-                return self._wrap_with_headers(self.resource_class_read.from_orm(resource))
+                serialize = self._serializer(session, schema, read_class)
+                query = (
+                    select(self.resource_class)
+                    .where(self.resource_class.identifier.in_(unique_identifiers))
+                    .options(*options)
+                )
+                found = {resource.identifier: resource for resource in session.scalars(query)}
+                resources = [
+                    serialize(found[identifier])
+                    for identifier in unique_identifiers
+                    if identifier in found
+                ]
+                content = {
+                    "resources": self._expand(session, resources, expansion),
+                    "not_found": [i for i in unique_identifiers if i not in found],
+                }
+                return self._wrap_with_headers(
+                    content,
+                    headers=_vary_headers(request),
+                    always_wrap=True,
+                    encoding=_encoding(request),
+                )
         except Exception as e:
             raise _wrap_as_http_exception(e)
 
@@ -228,17 +844,101 @@ class ResourceRouter(abc.ABC):
         """
 
         def get_resources(
+            request: Request,
             pagination: Pagination = Depends(Pagination),
             schema: Literal[tuple(self._possible_schemas)] = "aiod",  # type:ignore
+            fields: str | None = Query(default=None, description=FIELDS_DESCRIPTION),
+            expand: str | None = Query(default=None, description=EXPAND_DESCRIPTION),
+            expand_depth: int = Query(default=1, description=EXPAND_DEPTH_DESCRIPTION),
+            filters: Filters = Depends(Filters),
         ):
             f"""Retrieve all meta-data of the {self.resource_name_plural}."""
             resources = self.get_resources(
-                engine=engine, pagination=pagination, schema=schema, platform=None
+                engine=engine,
+                pagination=pagination,
+                schema=schema,
+                platform=None,
+                request=request,
+                fields=fields,
+                expand=expand,
+                expand_depth=expand_depth,
+                filters=filters,
             )
             return resources
 
         return get_resources
 
+    def export_resources_func(self, engine: Engine):
+        """
+        Return a function that can be used to stream all resources.
+        This function returns a function (instead of being that function directly) because the
+        docstring and the variables are dynamic, and used in Swagger.
+        """
+
+        def export_resources(
+            request: Request,
+            schema: Literal[tuple(self._possible_schemas)] = "aiod",  # type:ignore
+        ):
+            f"""Stream all meta-data of the {self.resource_name_plural} as newline-delimited
+            json."""
+            encoding = _encoding(request)
+            return self._streaming_response(
+                self.export_resources(engine, schema=schema, encoding=encoding), encoding
+            )
+
+        return export_resources
+
+    def export_platform_resources_func(self, engine: Engine):
+        """
+        Return a function that can be used to stream all resources of a platform.
+        This function returns a function (instead of being that function directly) because the
+        docstring and the variables are dynamic, and used in Swagger.
+        """
+
+        def export_resources(
+            platform: str,
+            request: Request,
+            schema: Literal[tuple(self._possible_schemas)] = "aiod",  # type:ignore
+        ):
+            f"""Stream all meta-data of the {self.resource_name_plural} of given platform as
+            newline-delimited json."""
+            encoding = _encoding(request)
+            return self._streaming_response(
+                self.export_resources(engine, schema=schema, platform=platform, encoding=encoding),
+                encoding,
+            )
+
+        return export_resources
+
+    def get_resources_by_identifiers_func(self, engine: Engine):
+        """
+        Return a function that can be used to retrieve multiple resources by identifier.
+        This function returns a function (instead of being that function directly) because the
+        docstring and the variables are dynamic, and used in Swagger.
+        """
+
+        def get_resources_by_identifiers(
+            batch: BatchGet,
+            request: Request,
+            schema: Literal[tuple(self._possible_schemas)] = "aiod",  # type:ignore
+            fields: str | None = Query(default=None, description=FIELDS_DESCRIPTION),
+            expand: str | None = Query(default=None, description=EXPAND_DESCRIPTION),
+            expand_depth: int = Query(default=1, description=EXPAND_DEPTH_DESCRIPTION),
+        ):
+            f"""Retrieve all meta-data of multiple {self.resource_name_plural}, identified by
+            their AIoD identifiers, in a single request."""
+            return self.get_resources_by_identifiers(
+                engine=engine,
+                identifiers=batch.identifiers,
+                schema=schema,
+                fields=fields,
+                expand=expand,
+                expand_depth=expand_depth,
+                request=request,
+            )
+
+        return get_resources_by_identifiers
+
     def get_resource_count_func(self, engine: Engine):
         """
         Gets the total number of resources from the database.
@@ -246,11 +946,20 @@ class ResourceRouter(abc.ABC):
         docstring and the variables are dynamic, and used in Swagger.
         """
 
-        def get_resource_count():
+        def get_resource_count(
+            platform: str | None = Query(None, description="Only count resources of this platform"),
+            status: str | None = Query(None, description="Only count resources with this status"),
+        ):
             f"""Retrieve the number of {self.resource_name_plural}."""
             try:
                 with Session(engine) as session:
-                    return session.query(self.resource_class).count()
+                    counts = resource_counts.count(
+                        session,
+                        {self.resource_name: self.resource_class},
+                        platform=platform,
+                        status=status,
+                    )
+                    return counts.get(self.resource_name, 0)
             except Exception as e:
                 raise _wrap_as_http_exception(e)
 
@@ -265,12 +974,25 @@ class ResourceRouter(abc.ABC):
 
         def get_resources(
             platform: str,
+            request: Request,
             pagination: Pagination = Depends(Pagination),
             schema: Literal[tuple(self._possible_schemas)] = "aiod",  # type:ignore
+            fields: str | None = Query(default=None, description=FIELDS_DESCRIPTION),
+            expand: str | None = Query(default=None, description=EXPAND_DESCRIPTION),
+            expand_depth: int = Query(default=1, description=EXPAND_DEPTH_DESCRIPTION),
+            filters: Filters = Depends(Filters),
         ):
             f"""Retrieve all meta-data of the {self.resource_name_plural} of given platform."""
             resources = self.get_resources(
-                engine=engine, pagination=pagination, schema=schema, platform=platform
+                engine=engine,
+                pagination=pagination,
+                schema=schema,
+                platform=platform,
+                request=request,
+                fields=fields,
+                expand=expand,
+                expand_depth=expand_depth,
+                filters=filters,
             )
             return resources
 
@@ -284,15 +1006,26 @@ class ResourceRouter(abc.ABC):
         """
 
         def get_resource(
-            identifier: str, schema: Literal[tuple(self._possible_schemas)] = "aiod"  # type:ignore
+            identifier: str,
+            request: Request,
+            schema: Literal[tuple(self._possible_schemas)] = "aiod",  # type:ignore
+            fields: str | None = Query(default=None, description=FIELDS_DESCRIPTION),
+            expand: str | None = Query(default=None, description=EXPAND_DESCRIPTION),
+            expand_depth: int = Query(default=1, description=EXPAND_DEPTH_DESCRIPTION),
         ):
             f"""
             Retrieve all meta-data for a {self.resource_name} identified by the AIoD identifier.
             """
-            resource = self.get_resource(
-                engine=engine, identifier=identifier, schema=schema, platform=None
+            return self.get_resource(
+                engine=engine,
+                identifier=identifier,
+                schema=schema,
+                platform=None,
+                fields=fields,
+                request=request,
+                expand=expand,
+                expand_depth=expand_depth,
             )
-            return self._wrap_with_headers(resource)
 
         return get_resource
 
@@ -306,12 +1039,23 @@ class ResourceRouter(abc.ABC):
         def get_resource(
             identifier: str,
             platform: str,
+            request: Request,
             schema: Literal[tuple(self._possible_schemas)] = "aiod",  # type:ignore
+            fields: str | None = Query(default=None, description=FIELDS_DESCRIPTION),
+            expand: str | None = Query(default=None, description=EXPAND_DESCRIPTION),
+            expand_depth: int = Query(default=1, description=EXPAND_DEPTH_DESCRIPTION),
         ):
             f"""Retrieve all meta-data for a {self.resource_name} identified by the
             platform-specific-identifier."""
             return self.get_resource(
-                engine=engine, identifier=identifier, schema=schema, platform=platform
+                engine=engine,
+                identifier=identifier,
+                schema=schema,
+                platform=platform,
+                fields=fields,
+                request=request,
+                expand=expand,
+                expand_depth=expand_depth,
             )
 
         return get_resource
@@ -346,17 +1090,64 @@ class ResourceRouter(abc.ABC):
 
         return register_resource
 
+    def initialize_counts(self, session: Session):
+        """
+        Compute the counters of this resource type, if this has not been done before. The caller
+        is responsible for committing.
+        """
+        resource_counts.initialize(session, self.resource_name, self.resource_class)
+
     def create_resource(self, session: Session, resource_create_instance: SQLModel):
         # Store a resource in the database
+        self.initialize_counts(session)
         resource = self.resource_class.from_orm(resource_create_instance)
 
         deserialize_resource_relationships(
             session, self.resource_class, resource, resource_create_instance
         )
         session.add(resource)
+        session.flush()
+        resource_counts.increment(session, self.resource_name, resource_counts.count_key(resource))
+        self._invalidate_documents(session, resource.identifier)
+        self._update_near_duplicates(session, resource)
+        change_log.record(session, self.resource_name, resource, change_log.Operation.CREATE)
         session.commit()
+        response_cache.invalidate(self.resource_name)
+        self._update_search_index(resource)
         return resource
 
+    def update_resource(
+        self,
+        session: Session,
+        resource,
+        change: Callable[[Any], None],
+        date_modified: datetime.datetime | None = None,
+    ):
+        """
+        Apply the change to a resource of this router, and commit it with the same bookkeeping as
+        every other write: the date_modified is set (by default to now), and the counters, the
+        stored document, the near-duplicate signature, the change log, the response cache and the
+        search indexes are updated. Every path that modifies a resource should use this, so that
+        the ETags and the documents, which are validated using the date_modified, stay correct.
+        """
+        self.initialize_counts(session)
+        old_count_key = resource_counts.count_key(resource)
+        old_text = near_duplicates.duplicate_text(resource) if self.searchable else None
+        change(resource)
+        if getattr(resource, "aiod_entry", None) is not None:
+            resource.aiod_entry.date_modified = date_modified or datetime.datetime.utcnow()
+        session.merge(resource)
+        new_count_key = resource_counts.count_key(resource)
+        if new_count_key != old_count_key:
+            resource_counts.increment(session, self.resource_name, old_count_key, amount=-1)
+            resource_counts.increment(session, self.resource_name, new_count_key)
+        self._invalidate_documents(session, resource.identifier)
+        self._update_near_duplicates(session, resource, old_text)
+        change_log.record(session, self.resource_name, resource, change_log.Operation.UPDATE)
+        session.commit()
+        response_cache.invalidate(self.resource_name)
+        self._update_search_index(resource)
+
     def put_resource_func(self, engine: Engine):
         """
         Return a function that can be used to update a resource.
@@ -371,6 +1162,7 @@ class ResourceRouter(abc.ABC):
             user: dict = Depends(get_current_user),
         ):
             f"""Update an existing {self.resource_name}."""
+            date_modified = datetime.datetime.utcnow()  # The time of the request
             if "groups" in user and KEYCLOAK_CONFIG.get("role") not in user["groups"]:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
@@ -380,20 +1172,24 @@ class ResourceRouter(abc.ABC):
             try:
                 with Session(engine) as session:
                     resource = self._retrieve_resource(session, identifier)
-                    if hasattr(resource, "aiod_entry"):
-                        datetime_created = resource.aiod_entry.date_created
-                    for attribute_name in resource.schema()["properties"]:
-                        if hasattr(resource_create_instance, attribute_name):
-                            new_value = getattr(resource_create_instance, attribute_name)
-                            setattr(resource, attribute_name, new_value)
-                    deserialize_resource_relationships(
-                        session, self.resource_class, resource, resource_create_instance
-                    )
-                    if hasattr(resource, "aiod_entry"):
-                        resource.aiod_entry.date_created = datetime_created
+
+                    def change(resource):
+                        if hasattr(resource, "aiod_entry"):
+                            datetime_created = resource.aiod_entry.date_created
+                        for attribute_name in resource.schema()["properties"]:
+                            if hasattr(resource_create_instance, attribute_name):
+                                new_value = getattr(resource_create_instance, attribute_name)
+                                setattr(resource, attribute_name, new_value)
+                        deserialize_resource_relationships(
+                            session, self.resource_class, resource, resource_create_instance
+                        )
+                        if hasattr(resource, "aiod_entry"):
+                            resource.aiod_entry.date_created = datetime_created
+
                     try:
-                        session.merge(resource)
-                        session.commit()
+                        self.update_resource(session, resource, change, date_modified)
+                    except HTTPException:
+                        raise
                     except Exception as e:
                         self._raise_clean_http_exception(e, session, resource_create_instance)
                 return self._wrap_with_headers(None)
@@ -418,12 +1214,27 @@ class ResourceRouter(abc.ABC):
 
             try:
                 with Session(engine) as session:
-                    self._retrieve_resource(session, identifier)  # Raise error if it does not exist
+                    self.initialize_counts(session)
+                    # Raise error if it does not exist
+                    resource = self._retrieve_resource(session, identifier)
+                    count_key = resource_counts.count_key(resource)
+                    aiod_identifier = resource.identifier
                     statement = delete(self.resource_class).where(
                         self.resource_class.identifier == identifier
                     )
                     session.execute(statement)
+                    resource_counts.increment(session, self.resource_name, count_key, amount=-1)
+                    # Resources that are related to this resource cannot be deleted (foreign key
+                    # constraint), so only the documents of this resource become outdated.
+                    delete_documents(session, self.resource_name, [identifier])
+                    if self.searchable:
+                        near_duplicates.remove(session, self.resource_name, aiod_identifier)
+                    change_log.record(
+                        session, self.resource_name, resource, change_log.Operation.DELETE
+                    )
                     session.commit()
+                    response_cache.invalidate(self.resource_name)
+                    self._remove_from_search_index(aiod_identifier)
                 return self._wrap_with_headers(None)
             except Exception as e:
                 if "foreign key" in str(e).lower():  # Should work regardless of db technology
@@ -436,22 +1247,22 @@ class ResourceRouter(abc.ABC):
 
         return delete_resource
 
-    def _retrieve_resource(self, session, identifier, platform=None):
+    def _where_identifier(self, identifier, platform=None):
         if platform is None:
-            query = select(self.resource_class).where(self.resource_class.identifier == identifier)
-        else:
-            if platform not in {n.name for n in PlatformName}:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"platform '{platform}' not recognized.",
-                )
-            query = select(self.resource_class).where(
-                and_(
-                    self.resource_class.platform_identifier == identifier,
-                    self.resource_class.platform == platform,
-                )
+            return self.resource_class.identifier == identifier
+        if platform not in {n.name for n in PlatformName}:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"platform '{platform}' not recognized.",
             )
-        resource = session.scalars(query).first()
+        return and_(
+            self.resource_class.platform_identifier == identifier,
+            self.resource_class.platform == platform,
+        )
+
+    def _retrieve_resource(self, session, identifier, platform=None, options=()):
+        query = select(self.resource_class).where(self._where_identifier(identifier, platform))
+        resource = session.scalars(query.options(*options)).first()
         if not resource:
             if platform is None:
                 msg = f"{self.resource_name.capitalize()} '{identifier}' not found in the database."
@@ -463,18 +1274,242 @@ class ResourceRouter(abc.ABC):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=msg)
         return resource
 
+    @cached_property
+    def _load_options(self) -> list:
+        """The loader options to eagerly load all relationships that are serialized."""
+        return load_options(self.resource_class)
+
     @property
     def _possible_schemas(self) -> list[str]:
         return ["aiod"] + list(self.schema_converters.keys())
 
-    def _wrap_with_headers(self, resource):
-        if self.deprecated_from is None:
+    def _wrap_with_headers(
+        self,
+        resource,
+        headers: dict[str, str] | None = None,
+        always_wrap: bool = False,
+        encoding: Encoding = JSON,
+    ):
+        """
+        Return the resource as-is, or, if there are headers to return, as an encoded response. Use
+        always_wrap if the resource should not be validated against the response_model, such as
+        for a projection containing only some of the fields. The resource should already be
+        serialized into json-compatible data.
+        """
+        headers = (dict(headers) if headers is not None else {}) | self._deprecation_headers()
+        if not headers and not always_wrap:
             return resource
+        return EncodedResponse(content=resource, encoding=encoding, headers=headers)
+
+    def _serializer(self, session: Session, schema: str, read_class: Type) -> Callable[[Any], Any]:
+        """
+        Return a function serializing an ORM resource into json-compatible data in given schema.
+        The aiod schema is serialized using a compiled serializer, without validating the Read
+        class.
+        """
+        if schema == "aiod":
+            return compile_serializer(read_class)
+        converter = self.schema_converters[schema]
+        return lambda resource: jsonable_encoder(
+            _revalidate(converter.convert(session, resource)), exclude_none=True
+        )
+
+    @property
+    def _stores_documents(self) -> bool:
+        """The documents are validated using the date_modified of the resources"""
+        return self._supports_conditional_requests
+
+    def _documents(
+        self, session: Session, metadata: list[tuple[int, datetime.datetime | None]]
+    ) -> list[bytes]:
+        """
+        Return the serialized aiod json of the resources, in the order of the metadata, from the
+        document store. Documents that are missing or outdated are rendered and stored.
+        """
+        identifiers = [identifier for identifier, _ in metadata]
+        documents = get_documents(session, self.resource_name, "aiod", identifiers)
+        outdated = [
+            identifier
+            for identifier, date_modified in metadata
+            if identifier not in documents or documents[identifier].date_modified != date_modified
+        ]
+        contents = {identifier: document.content for identifier, document in documents.items()}
+        if outdated:
+            rendered = self._render_documents(session, outdated)
+            contents |= {document.identifier: document.content for document in rendered}
+            try:
+                session.commit()
+            except IntegrityError:
+                session.rollback()  # Stored concurrently by another request
+        return [contents[identifier] for identifier in identifiers if identifier in contents]
+
+    def _render_documents(self, session: Session, identifiers: list[int]) -> list[ResourceDocument]:
+        """Render the aiod documents of the resources and store them, without committing."""
+        serialize = self._serializer(session, "aiod", self.resource_class_read)
+        query = (
+            select(self.resource_class)
+            .where(self.resource_class.identifier.in_(identifiers))
+            .options(*self._load_options)
+            .execution_options(populate_existing=True)
+        )
+        documents = [
+            ResourceDocument(
+                resource_type=self.resource_name,
+                identifier=resource.identifier,
+                schema_name="aiod",
+                date_modified=resource.aiod_entry.date_modified if resource.aiod_entry else None,
+                content=JSON.encode(serialize(resource)),
+            )
+            for resource in session.scalars(query)
+        ]
+        store_documents(session, documents)
+        return documents
+
+    def _invalidate_documents(self, session: Session, identifier: int):
+        """
+        Delete the document of a created or updated resource, as part of the transaction that
+        changed the resource. It is rendered again by the first read, so that a write does not
+        pay for serializing the resource.
+        """
+        if self._stores_documents:
+            delete_documents(session, self.resource_name, [identifier])
+
+    @property
+    def searchable(self) -> bool:
+        """Only AIResources have the name and description that are indexed for full-text search"""
+        return issubclass(self.resource_class, AIResource)
+
+    def _update_near_duplicates(self, session: Session, resource, old_text: str | None = None):
+        """
+        Store the MinHash signature of the resource, before committing, so that a committed
+        resource is always found by the near-duplicate lookups. An update that does not change
+        the name or the description (the old_text) keeps the signature.
+        """
+        if self.searchable:
+            text = near_duplicates.duplicate_text(resource)
+            if text != old_text:
+                near_duplicates.update(session, self.resource_name, resource.identifier, text)
+
+    def _update_search_index(self, resource):
+        """
+        Index the resource after it has been committed, for full-text search, the facet counts and
+        the similar resources. A failure of the search index is logged instead of failing the
+        request, because the index can be rebuilt from the database.
+        """
+        if not self.searchable:
+            return
+        try:
+            facet_indexes.update(self.resource_name, resource.identifier, facet_values(resource))
+            document = search_document(resource)
+            similarity_indexes.update(self.resource_name, resource.identifier, document)
+            search_index.add(self.resource_name, [(resource.identifier, document)])
+        except Exception:
+            logging.exception(f"Could not index {self.resource_name} {resource.identifier}")
+
+    def _remove_from_search_index(self, identifier: int):
+        if not self.searchable:
+            return
+        try:
+            facet_indexes.update(self.resource_name, identifier, None)
+            similarity_indexes.update(self.resource_name, identifier, None)
+            search_index.remove(self.resource_name, identifier)
+        except Exception:
+            logging.exception(f"Could not remove {self.resource_name} {identifier} from the index")
+
+    def _documents_response(
+        self,
+        documents: list[bytes],
+        headers: dict[str, str],
+        encoding: Encoding,
+        many: bool = False,
+    ) -> Response:
+        """Assemble the response from the serialized json documents, without parsing them."""
+        headers = headers | self._deprecation_headers()
+        if encoding is not JSON:
+            content = [orjson.loads(document) for document in documents]
+            return EncodedResponse(content if many else content[0], encoding, headers=headers)
+        body = b"[" + b",".join(documents) + b"]" if many else documents[0]
+        return Response(content=body, media_type=JSON.media_type, headers=headers)
+
+    def _expand(self, session: Session, resources: list, expansion: Expansion | None) -> list:
+        """Replace the identifiers of related resources by the serialized resources"""
+        if expansion is not None:
+            expand_relations(session, self.resource_class, resources, expansion)
+        return resources
+
+    def _respond(
+        self, request: Request | None, fetch: Callable[[], Response], cacheable: bool = True
+    ):
+        """
+        Return the cached response, or fetch it. Identical concurrent requests (same url and same
+        conditional headers) share a single fetch, so that a burst of requests for the same
+        resource results in a single database query.
+
+        Responses that depend on other resource types (such as expanded relationships, or the
+        names of the creators in the schema.org schema) are not cacheable, because the cache is
+        only invalidated on changes of this resource type.
+        """
+        if request is None:
+            return fetch()
+        key = _request_key(request)
+        cache_key = response_cache.key(self.resource_name, key)
+        cached = response_cache.get(cache_key) if cacheable else None
+        if cached is None:
+            conditional_headers = [request.headers.get(h, "") for h in CONDITIONAL_HEADERS]
+            flight_key = "\n".join([cache_key, *conditional_headers])
+            fetch_and_store = partial(self._fetch_and_store, cache_key, fetch, cacheable)
+            cached = self._single_flight.do(flight_key, fetch_and_store)
+        return self._cached_response(cached, request)
+
+    def _fetch_and_store(
+        self, cache_key: str, fetch: Callable[[], Response], cacheable: bool
+    ) -> CachedResponse:
+        """
+        Fetch the response, and store it in the cache, including headers such as the ETag. The
+        cache key was computed before the fetch, so that a response fetched while the resource
+        type got invalidated is not stored under the new generation.
+        """
+        response = fetch()
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name not in ("content-length", "content-type")
+        }
+        cached = CachedResponse(
+            body=response.body,
+            headers=headers,
+            media_type=response.media_type or JSON.media_type,
+            status_code=response.status_code,
+        )
+        if cacheable and response.status_code == status.HTTP_200_OK:
+            response_cache.set(cache_key, cached)
+        return cached
+
+    def _cached_response(self, cached: CachedResponse, request: Request) -> Response:
+        """Return the cached response, or a 304 if the client has the same version already."""
+        headers = Headers(cached.headers)
+        if cached.status_code == status.HTTP_304_NOT_MODIFIED or (
+            "ETag" in headers and _is_not_modified(request, headers)
+        ):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cached.headers)
+        return Response(content=cached.body, headers=cached.headers, media_type=cached.media_type)
+
+    def _streaming_response(
+        self, content: Iterator[bytes], encoding: Encoding = JSON
+    ) -> StreamingResponse:
+        return StreamingResponse(
+            content,
+            media_type=encoding.stream_media_type,
+            headers={"Vary": "Accept"} | self._deprecation_headers(),
+        )
+
+    def _deprecation_headers(self) -> dict[str, str]:
+        if self.deprecated_from is None:
+            return {}
         timestamp = datetime.datetime.combine(
             self.deprecated_from, datetime.time.min, tzinfo=datetime.timezone.utc
         ).timestamp()
-        headers = {"Deprecated": format_date_time(timestamp)}
-        return JSONResponse(content=jsonable_encoder(resource, exclude_none=True), headers=headers)
+        return {"Deprecated": format_date_time(timestamp)}
 
     def _raise_clean_http_exception(
         self, e: Exception, session: Session, resource_create: SQLModel
@@ -564,6 +1599,118 @@ def _wrap_as_http_exception(exception: Exception) -> HTTPException:
     )
 
 
+def _is_not_modified(request: Request, headers: dict[str, str]) -> bool:
+    """Evaluate the If-None-Match and If-Modified-Since headers of a conditional GET"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        etags = {etag.strip().removeprefix("W/") for etag in if_none_match.split(",")}
+        return "*" in etags or headers["ETag"] in etags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None and "Last-Modified" in headers:
+        try:
+            since = email.utils.parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=datetime.timezone.utc)
+        return email.utils.parsedate_to_datetime(headers["Last-Modified"]) <= since
+    return False
+
+
+def _revalidate(resource):
+    """
+    Validate a model from its own dictionary, as FastAPI does for a response_model. This way,
+    nested objects only contain the fields of their declared type, not of the ORM subclass.
+    """
+    if not isinstance(resource, BaseModel):
+        return resource
+    return type(resource).parse_obj(resource.dict(by_alias=True, exclude_none=True))
+
+
+def _parse_coordinates(name: str, value: str, count: int) -> list[float]:
+    """Parse comma-separated coordinates in degrees, raising a 400 if they are invalid"""
+    try:
+        coordinates = [float(part) for part in value.split(",")]
+    except ValueError:
+        coordinates = []
+    latitudes = coordinates[::2] if name == "near" else coordinates[1::2]
+    longitudes = coordinates[1::2] if name == "near" else coordinates[::2]
+    if (
+        len(coordinates) != count
+        or not all(-90 <= latitude <= 90 for latitude in latitudes)
+        or not all(-180 <= longitude <= 180 for longitude in longitudes)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"The {name} should consist of {count} comma-separated coordinates in degrees.",
+        )
+    return coordinates
+
+
+def _as_datetime(value: datetime.datetime | datetime.date) -> datetime.datetime:
+    """A date is interpreted as the start of that day"""
+    if isinstance(value, datetime.datetime):
+        return value
+    return datetime.datetime.combine(value, datetime.time())
+
+
+def _request_key(request: Request) -> str:
+    """
+    The key of a GET response: the url, including the query parameters in a fixed order, and the
+    negotiated media type.
+    """
+    query = urlencode(sorted(request.query_params.multi_items()))
+    return f"{request.url.replace(query=query)} {_encoding(request).media_type}"
+
+
+def _encoding(request: Request | None) -> Encoding:
+    return negotiate(request.headers.get("accept")) if request is not None else JSON
+
+
+def _vary_headers(request: Request | None) -> dict[str, str]:
+    """The response depends on the Accept header, if the encoding is negotiated"""
+    return {"Vary": "Accept"} if request is not None else {}
+
+
+def _raise_error_on_invalid_pagination(pagination: Pagination):
+    if not 0 <= pagination.limit <= MAX_LIMIT:
+        raise HTTPException(
+            detail=f"Invalid limit {pagination.limit}. The limit should be between 0 and "
+            f"{MAX_LIMIT}.",
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+    if pagination.offset < 0:
+        raise HTTPException(
+            detail=f"Invalid offset {pagination.offset}. The offset should not be negative.",
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+    if pagination.next is not None and pagination.offset != 0:
+        raise HTTPException(
+            detail="Use either an offset or a cursor (next), not both.",
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+
+
+def _decode_cursor(cursor: str, sort: str) -> list:
+    try:
+        decoded = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        values = decoded["values"]
+        expected_length = 2 if sort == "date_modified" else 1
+        if decoded["sort"] != sort or len(values) != expected_length:
+            raise ValueError("The cursor does not match the sort order.")
+        if not isinstance(values[-1], int):
+            raise ValueError("The cursor should end with an identifier.")
+        if sort == "date_modified" and values[0] is not None:
+            values[0] = datetime.datetime.fromisoformat(values[0])
+        return values
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError, IndexError):
+        raise HTTPException(
+            detail=f"Invalid cursor (next) {cursor}. Please use the link that was returned in a "
+            f"previous response, using the same sort order.",
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+
+
 def _raise_error_on_invalid_schema(possible_schemas, schema):
     if schema not in possible_schemas:
         raise HTTPException(
@@ -0,0 +1,198 @@
+import base64
+import binascii
+import dataclasses
+import json
+
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from sqlalchemy import Table, inspect
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from database.model.agent.agent_table import AgentTable
+from database.model.ai_asset.ai_asset_table import AIAssetTable
+from database.model.ai_resource.resource_table import AIResourceTable
+from database.model.helper_functions import get_relationships
+from routers.content_negotiation import EncodedResponse, negotiate
+from routers.resource_router import MAX_LIMIT, ResourceRouter, _wrap_as_http_exception
+from routers.search_router import serialized_resources
+from routers.shared_table_router import _identity_column
+
+# The name of the reverse of a relationship, such as "cited_by" for "citation". Other
+# relationships are reversed as "[relationship]_of".
+REVERSE_NAMES = {
+    "citation": "cited_by",
+    "contact": "contact_of",
+    "creator": "created",
+    "documents": "documented_by",
+    "funder": "funded",
+    "has_part": "part_of",
+    "is_part_of": "parts",
+    "member": "member_of",
+    "participant": "participated_in",
+    "performer": "performed",
+    "produced": "produced_by",
+    "related_experiment": "related_ml_model",
+    "used": "used_by",
+}
+
+_SHARED_TABLES = (AgentTable, AIAssetTable, AIResourceTable)
+
+
+@dataclasses.dataclass
+class _Link:
+    """A many-to-many relationship of a source resource type, pointing to the target type"""
+
+    source: ResourceRouter
+    link_table: Table
+    target_column: str  # The column of the target referred to by the linked_identifier
+
+
+class ReverseRelationshipRouter:
+    """
+    The resources that refer to a resource, such as the resources citing a publication or the
+    resources created by a person. The routes are generated from the many-to-many relationships in
+    the RelationshipConfig of the resources.
+
+    It creates the endpoints:
+    - GET /[resource_name_plural]/v[version]/{identifier}/[reverse relationship name]
+
+    The link tables are indexed on (linked_identifier, from_identifier), so that each page is
+    read from the index, using keyset pagination.
+    """
+
+    def __init__(self, resource_routers: list[ResourceRouter]):
+        self.links: dict[tuple[ResourceRouter, str], list[_Link]] = {}
+        for source in resource_routers:
+            mapper_relationships = inspect(source.resource_class).relationships
+            for name in get_relationships(source.resource_class):
+                relationship = mapper_relationships.get(name)
+                if relationship is None or relationship.secondary is None:
+                    continue
+                link_table = relationship.secondary
+                (foreign_key,) = link_table.c.linked_identifier.foreign_keys
+                for target in resource_routers:
+                    target_column = _target_column(target, foreign_key.column.table.name)
+                    if target_column is not None:
+                        reverse_name = REVERSE_NAMES.get(name, f"{name}_of")
+                        link = _Link(source, link_table, target_column)
+                        self.links.setdefault((target, reverse_name), []).append(link)
+
+    def create(self, engine: Engine, url_prefix: str) -> APIRouter:
+        router = APIRouter()
+        for (target, reverse_name), links in self.links.items():
+            router.add_api_route(
+                path=f"{url_prefix}/{target.resource_name_plural}/v{target.version}"
+                f"/{{identifier}}/{reverse_name}",
+                endpoint=self.reverse_func(engine, target, reverse_name, links),
+                name=f"{reverse_name} {target.resource_name}",
+                tags=[target.resource_name_plural],
+            )
+        return router
+
+    @staticmethod
+    def reverse_func(engine: Engine, target: ResourceRouter, reverse_name: str, links: list[_Link]):
+        types = [link.source.resource_name for link in links]
+
+        def get_reverse(
+            request: Request,
+            identifier: int,
+            type: str | None = Query(None, description=f"One of {', '.join(types)}."),
+            limit: int = 100,
+            next: str | None = None,
+        ):
+            f"""The resources that have this {target.resource_name} as
+            {reverse_name.replace('_', ' ')}, ordered by type and identifier, using cursor-based
+            pagination."""
+            if not 0 <= limit <= MAX_LIMIT:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid limit {limit}. The limit should be between 0 and {MAX_LIMIT}.",
+                )
+            if type is not None and type not in types:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid type {type}. Expected one of {', '.join(types)}.",
+                )
+            selected = [link for link in links if type is None or link.source.resource_name == type]
+            after = _decode_cursor(next, types) if next is not None else None
+            try:
+                with Session(engine) as session:
+                    resource = target._retrieve_resource(session, identifier)
+                    content = _page(session, resource, selected, types, after, limit)
+            except Exception as e:
+                raise _wrap_as_http_exception(e)
+            headers = {"Vary": "Accept"}
+            if len(content) == limit > 0:
+                cursor = _cursor(content[-1]["type"], content[-1]["resource"]["identifier"])
+                url = request.url.include_query_params(next=cursor)
+                headers["Link"] = f'<{url}>; rel="next"'
+            encoding = negotiate(request.headers.get("accept"))
+            return EncodedResponse(content, encoding, headers=headers)
+
+        return get_reverse
+
+
+def _target_column(target: ResourceRouter, table_name: str) -> str | None:
+    """The column of the target resource that a link to this table refers to, if any"""
+    if table_name == target.resource_class.__tablename__:
+        return "identifier"
+    for table in _SHARED_TABLES:
+        if table.__tablename__ == table_name:
+            return _identity_column(target.resource_class, table)
+    return None
+
+
+def _page(
+    session: Session,
+    resource,
+    links: list[_Link],
+    types: list[str],
+    after: tuple[str, int] | None,
+    limit: int,
+) -> list[dict]:
+    """
+    A page of the resources referring to the resource, ordered by (type, identifier). Each link
+    table is queried on (linked_identifier, from_identifier), so a page only reads its own rows.
+    """
+    content: list[dict] = []
+    for link in links:
+        type_ = link.source.resource_name
+        if after is not None and types.index(type_) < types.index(after[0]):
+            continue
+        remaining = limit - len(content)
+        if remaining <= 0:
+            break
+        table = link.link_table
+        query = (
+            select(table.c.from_identifier)
+            .where(table.c.linked_identifier == getattr(resource, link.target_column))
+            .order_by(table.c.from_identifier)
+            .limit(remaining)
+        )
+        if after is not None and type_ == after[0]:
+            query = query.where(table.c.from_identifier > after[1])
+        identifiers = session.scalars(query).all()
+        content.extend(
+            {"type": type_, "resource": serialized}
+            for serialized in serialized_resources(session, link.source, identifiers)
+        )
+    return content
+
+
+def _cursor(type_: str, identifier: int) -> str:
+    serialized = json.dumps({"type": type_, "identifier": identifier}).encode("utf-8")
+    return base64.urlsafe_b64encode(serialized).decode("ascii")
+
+
+def _decode_cursor(cursor: str, types: list[str]) -> tuple[str, int]:
+    try:
+        decoded = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if decoded["type"] not in types or not isinstance(decoded["identifier"], int):
+            raise ValueError("Invalid cursor")
+        return decoded["type"], decoded["identifier"]
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+        raise HTTPException(
+            detail=f"Invalid cursor (next) {cursor}. Please use the link that was returned in a "
+            f"previous response.",
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
@@ -0,0 +1,156 @@
+from functools import partial
+from typing import Iterator
+
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from database.model.compiled_serializer import compile_serializer
+from database.model.load_options import load_options
+from database.rebuilt_indexes import NotBuiltYet
+from routers.content_negotiation import EncodedResponse, negotiate
+from routers.resource_router import (
+    EXPORT_BATCH_SIZE,
+    MAX_LIMIT,
+    ResourceRouter,
+    _wrap_as_http_exception,
+)
+from search import SearchDocument, search_builds, search_document, search_index
+from search.search_index import is_outdated
+
+RETRY_AFTER_SECONDS = 5
+
+
+class SearchRouter:
+    """
+    Full-text search over the name, description, keywords and alternate names of the resources,
+    ordered by relevance.
+
+    It creates the endpoints:
+    - GET /search/[resource_name_plural]/v1
+
+    The index is updated by the ResourceRouters on each write. If the index of a resource type
+    has not been built yet (for instance, when the in-memory index is used and the worker has just
+    started), it is built from the database in the background on the first search, and the search
+    responds with 503 Service Unavailable until it is done. A local index is rebuilt in the
+    background when it is older than its max_age_seconds, so that the resources written by other
+    processes (the connectors and the other workers) become searchable. Meanwhile, searches use
+    the current index (see search_builds).
+    """
+
+    def __init__(self, resource_routers: list[ResourceRouter]):
+        self.routers = [router for router in resource_routers if router.searchable]
+
+    def create(self, engine: Engine, url_prefix: str) -> APIRouter:
+        router = APIRouter()
+        for resource_router in self.routers:
+            router.add_api_route(
+                path=f"{url_prefix}/search/{resource_router.resource_name_plural}/v1",
+                endpoint=self.search_func(engine, resource_router),
+                name=f"Search {resource_router.resource_name_plural}",
+                tags=["search"],
+            )
+        return router
+
+    def search_func(self, engine: Engine, resource_router: ResourceRouter):
+        def search(
+            request: Request,
+            q: str = Query(description="The search terms. The last term may be incomplete."),
+            limit: int = 10,
+            offset: int = 0,
+        ):
+            f"""Search the {resource_router.resource_name_plural}, returning the best matching
+            first."""
+            if not 0 <= limit <= MAX_LIMIT or offset < 0:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"The limit should be between 0 and {MAX_LIMIT}, and the offset should "
+                    "not be negative.",
+                )
+            try:
+                identifiers = self._search(engine, resource_router, q, limit, offset)
+                with Session(engine) as session:
+                    resources = serialized_resources(session, resource_router, identifiers)
+            except NotBuiltYet as e:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=str(e),
+                    headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+                )
+            except Exception as e:
+                raise _wrap_as_http_exception(e)
+            encoding = negotiate(request.headers.get("accept"))
+            return EncodedResponse(resources, encoding, headers={"Vary": "Accept"})
+
+        return search
+
+    def _search(
+        self, engine: Engine, resource_router: ResourceRouter, q: str, limit: int, offset: int
+    ) -> list[int]:
+        """
+        Search the index, building it in the background if this process has not built it yet.
+        Raises NotBuiltYet while the index is built for the first time.
+        """
+        resource_name = resource_router.resource_name
+        try:
+            # Only checks that the index is built, the search itself runs outside its lock
+            search_builds.read(
+                resource_name,
+                partial(self._build, engine, resource_router),
+                lambda _: None,
+                wait=False,
+            )
+        except NotBuiltYet:
+            if not search_index.is_built(resource_name):
+                raise
+            # Built by another process, and checked in the background
+        return search_index.search(resource_name, q, limit=limit, offset=offset)
+
+    @staticmethod
+    def _build(engine: Engine, resource_router: ResourceRouter) -> str:
+        """Build the index of this resource type from the database, unless another process did"""
+        resource_name = resource_router.resource_name
+        if is_outdated(resource_name):
+            with Session(engine) as session:
+                search_index.replace(resource_name, search_documents(session, resource_router))
+        return resource_name
+
+
+def search_documents(
+    session: Session, resource_router: ResourceRouter
+) -> Iterator[tuple[int, SearchDocument]]:
+    """The (identifier, search document) of all resources of this router, loaded in batches"""
+    resource_class = resource_router.resource_class
+    options = load_options(resource_class, attributes=["keyword", "alternate_name"])
+    last_identifier = None
+    while True:
+        query = (
+            select(resource_class)
+            .order_by(resource_class.identifier)
+            .options(*options)
+            .limit(EXPORT_BATCH_SIZE)
+        )
+        if last_identifier is not None:
+            query = query.where(resource_class.identifier > last_identifier)
+        resources = session.scalars(query).all()
+        for resource in resources:
+            yield resource.identifier, search_document(resource)
+        if len(resources) < EXPORT_BATCH_SIZE:
+            return
+        last_identifier = resources[-1].identifier
+        session.expunge_all()
+
+
+def serialized_resources(
+    session: Session, resource_router: ResourceRouter, identifiers: list[int]
+) -> list[dict]:
+    """The resources in the aiod schema, in the order of the identifiers"""
+    resource_class = resource_router.resource_class
+    query = (
+        select(resource_class)
+        .where(resource_class.identifier.in_(identifiers))
+        .options(*load_options(resource_class))
+    )
+    found = {resource.identifier: resource for resource in session.scalars(query)}
+    serialize = compile_serializer(resource_router.resource_class_read)
+    return [serialize(found[i]) for i in identifiers if i in found]
@@ -0,0 +1,194 @@
+from typing import Type
+
+from fastapi import APIRouter, HTTPException, Request, status
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+from sqlmodel import SQLModel, Session, select
+
+from database.model.compiled_serializer import compile_serializer
+from database.model.helper_functions import get_relationships
+from database.model.relationships import ResourceRelationshipSingleInfo
+from routers.content_negotiation import EncodedResponse, negotiate
+
+from routers.resource_router import (
+    BatchGet,
+    MAX_LIMIT,
+    Pagination,
+    ResourceRouter,
+    _decode_cursor,
+    _raise_error_on_invalid_pagination,
+    _wrap_as_http_exception,
+)
+
+
+class SharedTableRouter:
+    """
+    Routes to retrieve resources by the identifier of a table that is shared between multiple
+    resource types, such as the ai_resource table. Relationships like is_part_of or funder refer to
+    these shared identifiers. The type column of the shared table is used to find the resource
+    type, so that a client does not need to probe each resource type.
+
+    It creates the endpoints:
+    - GET /[shared_table]s/
+    - GET /[shared_table]s/{identifier}
+    - POST /[shared_table]s/batch_get
+    """
+
+    def __init__(
+        self,
+        table: Type[SQLModel],
+        name_plural: str,
+        resource_routers: list[ResourceRouter],
+    ):
+        self.table = table
+        self.name_plural = name_plural
+        self.routers: dict[str, tuple[ResourceRouter, str]] = {}
+        for router in resource_routers:
+            column = _identity_column(router.resource_class, table)
+            if column is not None:
+                self.routers[router.resource_class.__tablename__] = (router, column)
+
+    def create(self, engine: Engine, url_prefix: str) -> APIRouter:
+        router = APIRouter()
+        path = f"{url_prefix}/{self.name_plural}/v1"
+        tags = [self.name_plural]
+
+        @router.get(path, tags=tags)
+        def get_resources(
+            request: Request, type: str | None = None, limit: int = 100, next: str | None = None
+        ):
+            f"""Retrieve the {self.name_plural} of all types, optionally filtered on a single
+            type, using cursor-based pagination."""
+            return self.get_resources(engine, request, type_=type, limit=limit, next_=next)
+
+        @router.post(path + "/batch_get", tags=tags)
+        def get_resources_by_identifiers(request: Request, batch: BatchGet):
+            f"""Retrieve multiple {self.name_plural} by their identifiers, in a single request."""
+            if len(batch.identifiers) > MAX_LIMIT:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Too many identifiers ({len(batch.identifiers)}). At most {MAX_LIMIT} "
+                    f"resources can be retrieved at once.",
+                )
+            identifiers = list(dict.fromkeys(batch.identifiers))
+            try:
+                with Session(engine) as session:
+                    found = self.resolve(session, identifiers)
+            except Exception as e:
+                raise _wrap_as_http_exception(e)
+            content = {
+                "resources": [found[i] for i in identifiers if i in found],
+                "not_found": [i for i in identifiers if i not in found],
+            }
+            encoding = negotiate(request.headers.get("accept"))
+            return EncodedResponse(content, encoding, headers={"Vary": "Accept"})
+
+        @router.get(path + "/{identifier}", tags=tags)
+        def get_resource(request: Request, identifier: int):
+            f"""Retrieve a resource by the identifier of the {self.table.__tablename__} table."""
+            try:
+                with Session(engine) as session:
+                    found = self.resolve(session, [identifier])
+            except Exception as e:
+                raise _wrap_as_http_exception(e)
+            if identifier not in found:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"{self.table.__tablename__} '{identifier}' not found in the database.",
+                )
+            encoding = negotiate(request.headers.get("accept"))
+            return EncodedResponse(found[identifier], encoding, headers={"Vary": "Accept"})
+
+        return router
+
+    def get_resources(
+        self,
+        engine: Engine,
+        request: Request,
+        type_: str | None,
+        limit: int,
+        next_: str | None,
+    ):
+        pagination = Pagination(limit=limit, next=next_)
+        _raise_error_on_invalid_pagination(pagination)
+        if type_ is not None and type_ not in self.routers:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid type {type_}. Expected one of {', '.join(sorted(self.routers))}.",
+            )
+        query = select(self.table).order_by(self.table.identifier).limit(limit)
+        if type_ is not None:
+            query = query.where(self.table.type == type_)
+        else:
+            query = query.where(self.table.type.in_(self.routers))
+        if next_ is not None:
+            (last_identifier,) = _decode_cursor(next_, "identifier")
+            query = query.where(self.table.identifier > last_identifier)
+        try:
+            with Session(engine) as session:
+                rows = session.scalars(query).all()
+                found = self.resolve(session, [row.identifier for row in rows], rows)
+        except Exception as e:
+            raise _wrap_as_http_exception(e)
+        headers = {"Vary": "Accept"}
+        if len(rows) == limit > 0:
+            cursor = ResourceRouter._cursor(rows[-1].identifier, None, "identifier")
+            url = request.url.include_query_params(next=cursor)
+            headers["Link"] = f'<{url}>; rel="next"'
+        content = [found[row.identifier] for row in rows if row.identifier in found]
+        encoding = negotiate(request.headers.get("accept"))
+        return EncodedResponse(content, encoding, headers=headers)
+
+    def resolve(
+        self, session: Session, identifiers: list[int], rows: list[SQLModel] | None = None
+    ) -> dict[int, dict]:
+        """
+        Return the serialized resources by shared identifier, using a single query per resource
+        type. Identifiers that do not exist are left out.
+
+        Params
+        ------
+        rows: the rows of the shared table, if they are already retrieved.
+        """
+        if rows is None:
+            query = select(self.table).where(self.table.identifier.in_(identifiers))
+            rows = session.scalars(query).all()
+        identifiers_by_type: dict[str, list[int]] = {}
+        for row in rows:
+            if row.type in self.routers:
+                identifiers_by_type.setdefault(row.type, []).append(row.identifier)
+
+        found = {}
+        for type_, type_identifiers in identifiers_by_type.items():
+            router, column_name = self.routers[type_]
+            column = getattr(router.resource_class, column_name)
+            query = (
+                select(router.resource_class)
+                .where(column.in_(type_identifiers))
+                .options(*router._load_options)
+            )
+            serialize = compile_serializer(router.resource_class_read)
+            for resource in session.scalars(query):
+                found[getattr(resource, column_name)] = {
+                    "type": type_,
+                    "resource": serialize(resource),
+                }
+        return found
+
+
+def _identity_column(resource_class: Type[SQLModel], table: Type[SQLModel]) -> str | None:
+    """
+    The name of the column of the resource_class containing its identifier in the shared table,
+    if any. This is the column of the relationship for which a row in the shared table is created
+    on insert (such as resource_id for the resource_identifier).
+    """
+    mapper_relationships = inspect(resource_class).relationships
+    for attribute_name, config in get_relationships(resource_class).items():
+        if (
+            isinstance(config, ResourceRelationshipSingleInfo)
+            and config.default_factory_orm is not None
+            and attribute_name in mapper_relationships
+            and mapper_relationships[attribute_name].mapper.class_ is table
+        ):
+            return config.identifier_name
+    return None
@@ -0,0 +1,80 @@
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from database.rebuilt_indexes import NotBuiltYet
+from routers.content_negotiation import EncodedResponse, negotiate
+from routers.resource_router import ResourceRouter, _wrap_as_http_exception
+from routers.search_router import RETRY_AFTER_SECONDS, search_documents, serialized_resources
+from search import similarity_indexes
+from search.similarity import NEIGHBOURS, SimilarityIndex
+
+
+class SimilarityRouter:
+    """
+    The resources most similar to a resource, based on their name, description and keywords.
+
+    It creates the endpoints:
+    - GET /[resource_name_plural]/v[version]/{identifier}/similar
+
+    The similar resources are precomputed for all resources when the index of a resource type is
+    built, and updated by the ResourceRouters on each write. The index is built in the background
+    after the first request: until it is ready, the endpoint responds with 503 Service
+    Unavailable and a Retry-After header.
+    """
+
+    def __init__(self, resource_routers: list[ResourceRouter]):
+        self.routers = [router for router in resource_routers if router.searchable]
+
+    def create(self, engine: Engine, url_prefix: str) -> APIRouter:
+        router = APIRouter()
+        for resource_router in self.routers:
+            router.add_api_route(
+                path=f"{url_prefix}/{resource_router.resource_name_plural}"
+                f"/v{resource_router.version}/{{identifier}}/similar",
+                endpoint=self.similar_func(engine, resource_router),
+                name=f"Similar {resource_router.resource_name_plural}",
+                tags=[resource_router.resource_name_plural],
+            )
+        return router
+
+    @staticmethod
+    def similar_func(engine: Engine, resource_router: ResourceRouter):
+        def build() -> SimilarityIndex:
+            with Session(engine) as session:
+                return SimilarityIndex.build(search_documents(session, resource_router))
+
+        def similar(
+            request: Request,
+            identifier: int,
+            k: int = Query(10, description="The number of similar resources."),
+        ):
+            f"""The {resource_router.resource_name_plural} most similar to this
+            {resource_router.resource_name}, the most similar first."""
+            if not 0 <= k <= NEIGHBOURS:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"k should be between 0 and {NEIGHBOURS}.",
+                )
+            try:
+                identifiers = similarity_indexes.similar(
+                    resource_router.resource_name, build, identifier, k
+                )
+                with Session(engine) as session:
+                    if identifiers is None:
+                        # Raises a 404 if the resource does not exist
+                        resource_router._retrieve_resource(session, identifier)
+                        identifiers = []
+                    resources = serialized_resources(session, resource_router, identifiers)
+            except NotBuiltYet as e:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=str(e),
+                    headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+                )
+            except Exception as e:
+                raise _wrap_as_http_exception(e)
+            encoding = negotiate(request.headers.get("accept"))
+            return EncodedResponse(resources, encoding, headers={"Vary": "Accept"})
+
+        return similar
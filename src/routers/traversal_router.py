@@ -0,0 +1,209 @@
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from sqlalchemy import inspect, union_all
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, select
+
+from database import graph
+from database.model.ai_resource.resource_table import AIResourceTable
+from database.model.helper_functions import get_relationships
+from routers.content_negotiation import EncodedResponse, negotiate
+from routers.resource_router import MAX_LIMIT, ResourceRouter, _wrap_as_http_exception
+from routers.reverse_relationship_router import _target_column
+from routers.shared_table_router import SharedTableRouter, _identity_column
+
+# The relationships forming each graph, as (relationship name, reversed). A reversed relationship
+# points from child to parent, such as is_part_of.
+GRAPHS = {
+    "has_part": (("has_part", False), ("is_part_of", True)),
+    "member": (("member", False),),
+    "citation": (("citation", False),),
+    "related_experiment": (("related_experiment", False),),
+}
+
+RELATION_DESCRIPTION = (
+    f"The relationship to follow: one of {', '.join(GRAPHS)}. The has_part graph also follows "
+    "is_part_of in the opposite direction."
+)
+
+
+class TraversalRouter:
+    """
+    Traversal of the graphs formed by the relationships between resources, such as has_part and
+    is_part_of, organisation members, citations and the experiments related to ML models. A
+    traversal is a single recursive query, instead of a request per hop.
+
+    It creates the endpoints:
+    - GET /[resource_name_plural]/v[version]/{identifier}/descendants
+    - GET /[resource_name_plural]/v[version]/{identifier}/ancestors
+    - GET /[resource_name_plural]/v[version]/{identifier}/path
+
+    The nodes of the graphs are identified by their identifier in the ai_resource table, so that
+    a graph can contain resources of different types.
+    """
+
+    def __init__(self, resource_routers: list[ResourceRouter]):
+        self.routers = [
+            router
+            for router in resource_routers
+            if _identity_column(router.resource_class, AIResourceTable) is not None
+        ]
+        self.routers_by_name = {router.resource_name_plural: router for router in self.routers}
+        self.ai_resources = SharedTableRouter(AIResourceTable, "ai_resources", self.routers)
+
+    def create(self, engine: Engine, url_prefix: str) -> APIRouter:
+        router = APIRouter()
+        for resource_router in self.routers:
+            path = (
+                f"{url_prefix}/{resource_router.resource_name_plural}/v{resource_router.version}"
+                "/{identifier}"
+            )
+            for direction in ("descendants", "ancestors"):
+                router.add_api_route(
+                    path=f"{path}/{direction}",
+                    endpoint=self.traverse_func(engine, resource_router, direction),
+                    name=f"{resource_router.resource_name} {direction}",
+                    tags=[resource_router.resource_name_plural],
+                )
+            router.add_api_route(
+                path=f"{path}/path",
+                endpoint=self.path_func(engine, resource_router),
+                name=f"{resource_router.resource_name} path",
+                tags=[resource_router.resource_name_plural],
+            )
+        return router
+
+    def traverse_func(self, engine: Engine, resource_router: ResourceRouter, direction: str):
+        def traverse(
+            request: Request,
+            identifier: int,
+            relation: str = Query(description=RELATION_DESCRIPTION),
+            max_depth: int = Query(3, description=f"At most {graph.MAX_DEPTH}."),
+            limit: int = 100,
+        ):
+            f"""The resources reachable from this {resource_router.resource_name} by following
+            the relation, with the number of hops, the nearest first."""
+            _raise_error_on_invalid_traversal(relation, max_depth)
+            if not 0 <= limit <= MAX_LIMIT:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid limit {limit}. The limit should be between 0 and {MAX_LIMIT}.",
+                )
+            try:
+                with Session(engine) as session:
+                    start = self._node(session, resource_router, identifier)
+                    nodes = graph.descendants(
+                        session,
+                        self.edges(relation),
+                        start,
+                        max_depth,
+                        reverse=direction == "ancestors",
+                        limit=limit,
+                    )
+                    found = self.ai_resources.resolve(session, [node for node, _ in nodes])
+                content = [found[node] | {"depth": depth} for node, depth in nodes if node in found]
+            except Exception as e:
+                raise _wrap_as_http_exception(e)
+            encoding = negotiate(request.headers.get("accept"))
+            return EncodedResponse(content, encoding, headers={"Vary": "Accept"})
+
+        return traverse
+
+    def path_func(self, engine: Engine, resource_router: ResourceRouter):
+        def path(
+            request: Request,
+            identifier: int,
+            to_type: str = Query(description="The plural name of the type of the end resource."),
+            to: int = Query(description="The identifier of the end resource."),
+            relation: str = Query(description=RELATION_DESCRIPTION),
+            max_depth: int = Query(graph.MAX_DEPTH, description=f"At most {graph.MAX_DEPTH}."),
+        ):
+            f"""The resources on a shortest path from this {resource_router.resource_name} to
+            another resource, following the relation. Empty if there is no such path."""
+            _raise_error_on_invalid_traversal(relation, max_depth)
+            if to_type not in self.routers_by_name:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid to_type {to_type}. Expected one of "
+                    f"{', '.join(self.routers_by_name)}.",
+                )
+            try:
+                with Session(engine) as session:
+                    start = self._node(session, resource_router, identifier)
+                    end = self._node(session, self.routers_by_name[to_type], to)
+                    nodes = graph.shortest_path(
+                        session, self.edges(relation), start, end, max_depth
+                    )
+                    found = self.ai_resources.resolve(session, nodes or [])
+                content = [found[node] for node in nodes or [] if node in found]
+            except Exception as e:
+                raise _wrap_as_http_exception(e)
+            encoding = negotiate(request.headers.get("accept"))
+            return EncodedResponse(content, encoding, headers={"Vary": "Accept"})
+
+        return path
+
+    def edges(self, relation: str):
+        """
+        The (parent, child) edges of a graph, as ai_resource identifiers: the union of the link
+        tables of the relationships of the graph, for all resource types.
+        """
+        edges = []
+        for relationship_name, reverse in GRAPHS[relation]:
+            for source in self.routers:
+                relationship = inspect(source.resource_class).relationships.get(relationship_name)
+                if (
+                    relationship_name not in get_relationships(source.resource_class)
+                    or relationship is None
+                    or relationship.secondary is None
+                ):
+                    continue
+                link = relationship.secondary
+                source_node = getattr(source.resource_class, _node_column(source))
+                query = select(source_node, link.c.linked_identifier).join(
+                    link, link.c.from_identifier == source.resource_class.identifier
+                )
+                (foreign_key,) = link.c.linked_identifier.foreign_keys
+                linked_table = foreign_key.column.table.name
+                if linked_table == AIResourceTable.__tablename__:
+                    edges.append(_edge(query, source_node, link.c.linked_identifier, reverse))
+                    continue
+                for target in self.routers:
+                    target_column = _target_column(target, linked_table)
+                    if target_column is not None:
+                        target_class = aliased(target.resource_class)
+                        target_node = getattr(target_class, _node_column(target))
+                        joined = query.join(
+                            target_class,
+                            getattr(target_class, target_column) == link.c.linked_identifier,
+                        )
+                        edges.append(_edge(joined, source_node, target_node, reverse))
+        return union_all(*edges)
+
+    @staticmethod
+    def _node(session: Session, resource_router: ResourceRouter, identifier: int) -> int:
+        """The ai_resource identifier of a resource, raising a 404 if it does not exist"""
+        resource = resource_router._retrieve_resource(session, identifier)
+        return getattr(resource, _node_column(resource_router))
+
+
+def _node_column(resource_router: ResourceRouter) -> str:
+    return _identity_column(resource_router.resource_class, AIResourceTable)
+
+
+def _edge(query, source_node, target_node, reverse: bool):
+    parent, child = (target_node, source_node) if reverse else (source_node, target_node)
+    return query.with_only_columns(parent.label("parent"), child.label("child"))
+
+
+def _raise_error_on_invalid_traversal(relation: str, max_depth: int):
+    if relation not in GRAPHS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid relation {relation}. Expected one of {', '.join(GRAPHS)}.",
+        )
+    if not 1 <= max_depth <= graph.MAX_DEPTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid max_depth {max_depth}. It should be between 1 and {graph.MAX_DEPTH}.",
+        )
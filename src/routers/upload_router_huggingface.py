@@ -2,10 +2,16 @@ from fastapi import APIRouter
 from fastapi import File, Query, UploadFile
 from sqlalchemy.engine import Engine
 
+from routers.resource_router import ResourceRouter
 from uploader.hugging_face_uploader import handle_upload
 
 
 class UploadRouterHuggingface:
+    def __init__(self, resource_routers: list[ResourceRouter]):
+        (self.dataset_router,) = [
+            router for router in resource_routers if router.resource_name == "dataset"
+        ]
+
     def create(self, engine: Engine, url_prefix: str) -> APIRouter:
         router = APIRouter()
 
@@ -22,6 +28,6 @@ class UploadRouterHuggingface:
                 ..., title="Huggingface username", description="The username of HuggingFace"
             ),
         ) -> int:
-            return handle_upload(engine, identifier, file, token, username)
+            return handle_upload(engine, self.dataset_router, identifier, file, token, username)
 
         return router
@@ -0,0 +1,76 @@
+from typing import Type
+
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from sqlalchemy.engine import Engine
+from sqlmodel import SQLModel, Session
+
+from database.model.agent.expertise import Expertise
+from database.model.agent.language import Language
+from database.model.ai_asset.license import License
+from database.model.ai_resource.application_area import ApplicationArea
+from database.model.ai_resource.keyword import Keyword
+from database.model.ai_resource.research_area import ResearchArea
+from database.vocabularies import load_vocabulary, vocabularies
+from routers.content_negotiation import EncodedResponse, negotiate
+from routers.resource_router import _wrap_as_http_exception
+
+MAX_SUGGEST_LIMIT = 100
+
+
+class VocabularyRouter:
+    """
+    Suggestions of existing names of a vocabulary, such as keywords or licenses, starting with a
+    prefix, the most used first. This can be used to autocomplete the input of a user, preventing
+    near-duplicate names.
+
+    It creates the endpoints:
+    - GET /vocabularies/[vocabulary_name]/suggest/v1
+    """
+
+    vocabularies: list[Type[SQLModel]] = [
+        Keyword,
+        License,
+        ResearchArea,
+        ApplicationArea,
+        Expertise,
+        Language,
+    ]
+
+    def create(self, engine: Engine, url_prefix: str) -> APIRouter:
+        router = APIRouter()
+        for clazz in self.vocabularies:
+            router.add_api_route(
+                path=f"{url_prefix}/vocabularies/{clazz.__tablename__}/suggest/v1",
+                endpoint=self.suggest_func(engine, clazz),
+                name=f"Suggest {clazz.__tablename__}",
+                tags=["vocabularies"],
+            )
+        return router
+
+    @staticmethod
+    def suggest_func(engine: Engine, clazz: Type[SQLModel]):
+        def load():
+            with Session(engine) as session:
+                return load_vocabulary(session, clazz)
+
+        def suggest(
+            request: Request,
+            prefix: str = Query("", description="The start of the name, ignoring case."),
+            limit: int = Query(10, description="The maximum number of suggestions."),
+        ):
+            f"""The existing {clazz.__tablename__} names starting with the prefix, with the number
+            of times they are used, the most used first."""
+            if not 0 <= limit <= MAX_SUGGEST_LIMIT:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"The limit should be between 0 and {MAX_SUGGEST_LIMIT}.",
+                )
+            try:
+                suggestions = vocabularies.suggest(clazz.__tablename__, load, prefix, limit)
+            except Exception as e:
+                raise _wrap_as_http_exception(e)
+            content = [{"name": name, "count": count} for name, count in suggestions]
+            encoding = negotiate(request.headers.get("accept"))
+            return EncodedResponse(content, encoding, headers={"Vary": "Accept"})
+
+        return suggest
@@ -0,0 +1,4 @@
+from .backend import SearchDocument, SearchIndex  # noqa:F401
+from .facets import facet_indexes, facet_values  # noqa:F401
+from .search_index import search_builds, search_document, search_index  # noqa:F401
+from .similarity import similarity_indexes  # noqa:F401
@@ -0,0 +1,352 @@
+"""
+Full-text search indexes.
+
+The SQLite index uses the FTS5 extension of the sqlite3 module of Python, and runs without any
+additional service. Its database can be kept in memory (local to a single process) or in a file,
+which can be shared by multiple workers. As the connectors run in other processes, the index is
+rebuilt from the database when it is older than max_age_seconds. The Elasticsearch index is an
+adapter for an Elasticsearch or OpenSearch server, which is shared by all processes and therefore
+does not need to be rebuilt.
+"""
+
+import abc
+import dataclasses
+import json
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Iterable
+
+import requests
+
+# The relative importance of a match in each of the fields
+FIELD_WEIGHTS = {"name": 10.0, "keyword": 5.0, "alternate_name": 5.0, "description": 1.0}
+_BATCH_SIZE = 1000
+
+
+@dataclasses.dataclass
+class SearchDocument:
+    """The searchable text of a resource"""
+
+    name: str
+    description: str = ""
+    keyword: list[str] = dataclasses.field(default_factory=list)
+    alternate_name: list[str] = dataclasses.field(default_factory=list)
+
+
+class SearchIndex(abc.ABC):
+    """An index of the resources per resource type, returning identifiers ordered by relevance"""
+
+    # The age after which the index is rebuilt from the database, to include the changes made by
+    # other processes. None for an index that is shared by all processes.
+    max_age_seconds: float | None = None
+
+    @abc.abstractmethod
+    def add(self, resource_type: str, documents: Iterable[tuple[int, SearchDocument]]):
+        """Add the (identifier, document) pairs, replacing existing documents"""
+
+    @abc.abstractmethod
+    def remove(self, resource_type: str, identifier: int):
+        pass
+
+    @abc.abstractmethod
+    def search(self, resource_type: str, query: str, limit: int, offset: int = 0) -> list[int]:
+        pass
+
+    @abc.abstractmethod
+    def built_at(self, resource_type: str) -> float | None:
+        """The time at which the index of this resource type was built from the database"""
+
+    def is_built(self, resource_type: str) -> bool:
+        return self.built_at(resource_type) is not None
+
+    @abc.abstractmethod
+    def mark_built(self, resource_type: str):
+        pass
+
+    def replace(self, resource_type: str, documents: Iterable[tuple[int, SearchDocument]]):
+        """Replace all documents of this resource type, and mark the index as built"""
+        self.clear(resource_type)
+        batch = []
+        for identifier_and_document in documents:
+            batch.append(identifier_and_document)
+            if len(batch) == _BATCH_SIZE:
+                self.add(resource_type, batch)
+                batch = []
+        self.add(resource_type, batch)
+        self.mark_built(resource_type)
+
+    @abc.abstractmethod
+    def clear(self, resource_type: str | None = None):
+        """Remove all documents (of this resource type), so that the index is built again"""
+
+
+class SqliteSearchIndex(SearchIndex):
+    """
+    An FTS5 index, ranking the results using BM25. The terms of a query should all occur in a
+    document, and the last term is matched as a prefix, to support search-as-you-type.
+
+    The index of a resource type is replaced by building the new index under a temporary resource
+    type, which is renamed when it is complete, so that searches are not blocked while building.
+    The documents added or removed meanwhile are also applied to the new index.
+    """
+
+    def __init__(self, path: str = ":memory:", max_age_seconds: float | None = None):
+        self.max_age_seconds = max_age_seconds
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        # The documents added (or removed, if None) during a replace, per resource type
+        self._replacing: dict[str, list[tuple[int, SearchDocument | None]]] = {}
+        with self._lock, self._connection:
+            self._connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS document (
+                    rowid INTEGER PRIMARY KEY,
+                    resource_type TEXT NOT NULL,
+                    identifier INTEGER NOT NULL,
+                    UNIQUE (resource_type, identifier)
+                );
+                CREATE VIRTUAL TABLE IF NOT EXISTS document_text USING fts5(
+                    name, keyword, alternate_name, description
+                );
+                CREATE TABLE IF NOT EXISTS built (
+                    resource_type TEXT PRIMARY KEY,
+                    built_at REAL NOT NULL
+                );
+                """
+            )
+
+    def add(self, resource_type: str, documents: Iterable[tuple[int, SearchDocument]]):
+        with self._lock, self._connection:
+            for identifier, document in documents:
+                self._add(resource_type, identifier, document)
+                if resource_type in self._replacing:
+                    self._replacing[resource_type].append((identifier, document))
+
+    def _add(self, resource_type: str, identifier: int, document: SearchDocument):
+        self._remove(resource_type, identifier)
+        cursor = self._connection.execute(
+            "INSERT INTO document (resource_type, identifier) VALUES (?, ?)",
+            (resource_type, identifier),
+        )
+        self._connection.execute(
+            "INSERT INTO document_text (rowid, name, keyword, alternate_name, "
+            "description) VALUES (?, ?, ?, ?, ?)",
+            (
+                cursor.lastrowid,
+                document.name,
+                " ".join(document.keyword),
+                " ".join(document.alternate_name),
+                document.description,
+            ),
+        )
+
+    def remove(self, resource_type: str, identifier: int):
+        with self._lock, self._connection:
+            self._remove(resource_type, identifier)
+            if resource_type in self._replacing:
+                self._replacing[resource_type].append((identifier, None))
+
+    def _remove(self, resource_type: str, identifier: int):
+        row = self._connection.execute(
+            "SELECT rowid FROM document WHERE resource_type = ? AND identifier = ?",
+            (resource_type, identifier),
+        ).fetchone()
+        if row is not None:
+            self._connection.execute("DELETE FROM document_text WHERE rowid = ?", row)
+            self._connection.execute("DELETE FROM document WHERE rowid = ?", row)
+
+    def search(self, resource_type: str, query: str, limit: int, offset: int = 0) -> list[int]:
+        match = _fts_query(query)
+        if match is None:
+            return []
+        weights = ", ".join(str(FIELD_WEIGHTS[field]) for field in _FTS_COLUMNS)
+        with self._lock:
+            rows = self._connection.execute(
+                f"""
+                SELECT document.identifier
+                FROM document_text JOIN document ON document.rowid = document_text.rowid
+                WHERE document_text MATCH ? AND document.resource_type = ?
+                ORDER BY bm25(document_text, {weights}), document.identifier
+                LIMIT ? OFFSET ?
+                """,
+                (match, resource_type, limit, offset),
+            ).fetchall()
+        return [identifier for (identifier,) in rows]
+
+    def built_at(self, resource_type: str) -> float | None:
+        with self._lock:
+            query = "SELECT built_at FROM built WHERE resource_type = ?"
+            row = self._connection.execute(query, (resource_type,)).fetchone()
+            return row[0] if row is not None else None
+
+    def mark_built(self, resource_type: str):
+        with self._lock, self._connection:
+            self._mark_built(resource_type)
+
+    def _mark_built(self, resource_type: str):
+        query = "INSERT OR REPLACE INTO built (resource_type, built_at) VALUES (?, ?)"
+        self._connection.execute(query, (resource_type, time.time()))
+
+    def replace(self, resource_type: str, documents: Iterable[tuple[int, SearchDocument]]):
+        temporary = f"{resource_type}:{uuid.uuid4().hex}"
+        with self._lock:
+            self._replacing[resource_type] = []
+        try:
+            batch = []
+            for identifier_and_document in documents:
+                batch.append(identifier_and_document)
+                if len(batch) == _BATCH_SIZE:
+                    self._add_batch(temporary, batch)
+                    batch = []
+            self._add_batch(temporary, batch)
+            with self._lock, self._connection:
+                for identifier, document in self._replacing[resource_type]:
+                    if document is None:
+                        self._remove(temporary, identifier)
+                    else:
+                        self._add(temporary, identifier, document)
+                self._clear(resource_type)
+                self._connection.execute(
+                    "UPDATE document SET resource_type = ? WHERE resource_type = ?",
+                    (resource_type, temporary),
+                )
+                self._mark_built(resource_type)
+        except BaseException:
+            with self._lock, self._connection:
+                self._clear(temporary)
+            raise
+        finally:
+            with self._lock:
+                self._replacing.pop(resource_type, None)
+
+    def _add_batch(self, resource_type: str, documents: list[tuple[int, SearchDocument]]):
+        with self._lock, self._connection:
+            for identifier, document in documents:
+                self._add(resource_type, identifier, document)
+
+    def clear(self, resource_type: str | None = None):
+        with self._lock, self._connection:
+            if resource_type is None:
+                self._connection.execute("DELETE FROM document_text")
+                self._connection.execute("DELETE FROM document")
+                self._connection.execute("DELETE FROM built")
+                return
+            self._clear(resource_type)
+
+    def _clear(self, resource_type: str):
+        self._connection.execute(
+            "DELETE FROM document_text WHERE rowid IN "
+            "(SELECT rowid FROM document WHERE resource_type = ?)",
+            (resource_type,),
+        )
+        for table in ("document", "built"):
+            query = f"DELETE FROM {table} WHERE resource_type = ?"
+            self._connection.execute(query, (resource_type,))
+
+
+_FTS_COLUMNS = ("name", "keyword", "alternate_name", "description")
+
+
+def _fts_query(query: str) -> str | None:
+    """
+    Convert free text into an FTS5 query, so that characters with a special meaning in the FTS5
+    query syntax (such as quotes and operators) cannot cause syntax errors.
+    """
+    terms = re.findall(r"\w+", query.lower())
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+class ElasticsearchIndex(SearchIndex):
+    """An adapter for an Elasticsearch (or OpenSearch) server, using an index per resource type"""
+
+    def __init__(self, url: str, index_prefix: str = "aiod", timeout: float = 10):
+        self.url = url.rstrip("/")
+        self.index_prefix = index_prefix
+        self.timeout = timeout
+
+    def add(self, resource_type: str, documents: Iterable[tuple[int, SearchDocument]]):
+        index = self._index(resource_type)
+        lines = []
+        for identifier, document in documents:
+            lines.append(json.dumps({"index": {"_index": index, "_id": str(identifier)}}))
+            lines.append(json.dumps(dataclasses.asdict(document)))
+        if not lines:
+            return
+        response = requests.post(
+            f"{self.url}/_bulk",
+            data="\n".join(lines) + "\n",
+            headers={"Content-Type": "application/x-ndjson"},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        if response.json().get("errors"):
+            raise RuntimeError(f"Could not index all {resource_type} documents: {response.text}")
+
+    def remove(self, resource_type: str, identifier: int):
+        url = f"{self.url}/{self._index(resource_type)}/_doc/{identifier}"
+        response = requests.delete(url, timeout=self.timeout)
+        if response.status_code != 404:
+            response.raise_for_status()
+
+    def search(self, resource_type: str, query: str, limit: int, offset: int = 0) -> list[int]:
+        fields = [f"{field}^{weight:g}" for field, weight in FIELD_WEIGHTS.items()]
+        body = {
+            "query": {
+                "multi_match": {
+                    "query": query,
+                    "fields": fields,
+                    "type": "bool_prefix",
+                    "operator": "and",
+                }
+            },
+            "sort": ["_score", {"_id": "asc"}],
+            "from": offset,
+            "size": limit,
+            "_source": False,
+        }
+        url = f"{self.url}/{self._index(resource_type)}/_search"
+        response = requests.post(url, json=body, timeout=self.timeout)
+        if response.status_code == 404:
+            return []
+        response.raise_for_status()
+        return [int(hit["_id"]) for hit in response.json()["hits"]["hits"]]
+
+    def built_at(self, resource_type: str) -> float | None:
+        """An index that is built has the time at which it was built in its metadata"""
+        url = f"{self.url}/{self._index(resource_type)}/_mapping"
+        response = requests.get(url, timeout=self.timeout)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        for index in response.json().values():
+            built_at = index["mappings"].get("_meta", {}).get("built_at")
+            if built_at is not None:
+                return built_at
+        return None
+
+    def mark_built(self, resource_type: str):
+        index_url = f"{self.url}/{self._index(resource_type)}"
+        response = requests.put(index_url, timeout=self.timeout)
+        if response.status_code != 400:  # 400: the index exists already
+            response.raise_for_status()
+        body = {"_meta": {"built_at": time.time()}}
+        response = requests.put(f"{index_url}/_mapping", json=body, timeout=self.timeout)
+        response.raise_for_status()
+
+    def clear(self, resource_type: str | None = None):
+        index = (
+            self._index(resource_type) if resource_type is not None else f"{self.index_prefix}_*"
+        )
+        response = requests.delete(f"{self.url}/{index}", timeout=self.timeout)
+        if response.status_code != 404:
+            response.raise_for_status()
+
+    def _index(self, resource_type: str) -> str:
+        return f"{self.index_prefix}_{resource_type}"
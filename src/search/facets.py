@@ -0,0 +1,404 @@
+"""
+In-memory index for facet counts, such as the number of datasets per keyword.
+
+For each facet, the index holds the (resource, term) pairs as numpy arrays, sorted on the row of
+the resource (a compressed sparse row layout), and the number of resources per term. The counts
+without filters are these maintained counts. With filters, the resources matching the filters are
+found using the pairs sorted on term (a compressed sparse column layout), and only the terms of
+these resources are counted. If most resources match, the terms of the resources that do not
+match are subtracted from the maintained counts instead.
+
+Resources are assigned a row when they are added. An updated resource is assigned a new row, and
+its old row is marked as deleted. The terms of recently added rows are kept in a small buffer,
+which is merged into the arrays when it grows, so that a write does not copy the arrays. The
+deleted rows are removed when they make up a large part of the index.
+"""
+
+import heapq
+import itertools
+from typing import Any, Iterable, Type
+
+import numpy as np
+from sqlalchemy import inspect
+from sqlmodel import SQLModel, Session, select
+
+from config import SEARCH_CONFIG
+from database.model.ai_asset.license import License
+from database.model.concept.aiod_entry import AIoDEntryORM
+from database.model.concept.status import Status
+from database.model.platform.platform import Platform
+from database.rebuilt_indexes import RebuiltIndexes
+
+FACETS = (
+    "keyword",
+    "license",
+    "platform",
+    "application_area",
+    "research_area",
+    "scientific_domain",
+    "status",
+)
+_LINKED_FACETS = ("keyword", "application_area", "research_area", "scientific_domain")
+_MAX_BUFFERED = 4096
+
+
+class _FacetPairs:
+    """The (row, term) pairs of a single facet"""
+
+    def __init__(self, n_rows: int = 0):
+        self.names: list[str] = []
+        self.term_ids: dict[str, int] = {}
+        self.counts = np.zeros(16, dtype=np.int64)  # The number of alive rows per term
+        self.buffer: dict[int, list[int]] = {}  # The terms of the rows added after merging
+        self._n_buffered = 0
+        # The merged pairs sorted on row, and the first pair of each row. The arrays have spare
+        # capacity, so that merging the buffer does not copy them.
+        self._rows = np.empty(0, dtype=np.int64)
+        self._terms = np.empty(0, dtype=np.int64)
+        self._offsets = np.zeros(n_rows + 1, dtype=np.int64)
+        self._n_pairs = 0
+        self.n_merged = n_rows
+        self._rows_by_term: tuple[np.ndarray, np.ndarray, int] | None = None
+
+    @classmethod
+    def from_arrays(
+        cls, n_rows: int, rows: np.ndarray, terms: np.ndarray, names: list[str]
+    ) -> "_FacetPairs":
+        pairs = cls(n_rows)
+        pairs.names = list(names)
+        pairs.term_ids = {name: term_id for term_id, name in enumerate(pairs.names)}
+        pairs.counts = np.bincount(terms, minlength=max(16, len(names))).astype(np.int64)
+        pairs._set_pairs(n_rows, rows, terms)
+        return pairs
+
+    @property
+    def rows(self) -> np.ndarray:
+        return self._rows[: self._n_pairs]
+
+    @property
+    def terms(self) -> np.ndarray:
+        return self._terms[: self._n_pairs]
+
+    @property
+    def offsets(self) -> np.ndarray:
+        return self._offsets[: self.n_merged + 1]
+
+    def add(self, row: int, names: Iterable[str]):
+        term_ids = []
+        for name in set(names):
+            if name not in self.term_ids:
+                self.term_ids[name] = len(self.names)
+                self.names.append(name)
+                if len(self.names) > len(self.counts):
+                    self.counts = np.concatenate([self.counts, np.zeros_like(self.counts)])
+            term_ids.append(self.term_ids[name])
+        for term_id in term_ids:  # Faster than fancy indexing, for a few terms
+            self.counts[term_id] += 1
+        self.buffer[row] = term_ids
+        self._n_buffered += len(term_ids)
+        if max(self._n_buffered, len(self.buffer)) > _MAX_BUFFERED:
+            self.merge()
+
+    def remove(self, row: int):
+        if row in self.buffer:
+            term_ids = self.buffer[row]
+        else:
+            start, end = self.offsets[row], self.offsets[row + 1]
+            term_ids = self.terms[start:end].tolist()
+        for term_id in term_ids:
+            self.counts[term_id] -= 1
+
+    def merge(self):
+        """Move the buffered rows into the arrays"""
+        if not self.buffer:
+            return
+        lengths = np.fromiter(map(len, self.buffer.values()), dtype=np.int64)
+        rows = np.repeat(np.fromiter(self.buffer.keys(), dtype=np.int64), lengths)
+        terms = np.fromiter(
+            itertools.chain.from_iterable(self.buffer.values()), dtype=np.int64, count=len(rows)
+        )
+        offsets = self._n_pairs + np.cumsum(lengths)
+        self._rows = _append(self._rows, self._n_pairs, rows)
+        self._terms = _append(self._terms, self._n_pairs, terms)
+        self._offsets = _append(self._offsets, self.n_merged + 1, offsets)
+        self._n_pairs += len(rows)
+        self.n_merged += len(lengths)
+        self.buffer, self._n_buffered = {}, 0
+
+    def mask(self, names: Iterable[str], n_rows: int) -> np.ndarray:
+        """The rows of the resources having at least one of these terms, as a boolean mask"""
+        mask = np.zeros(n_rows, dtype=bool)
+        for name in names:
+            if name in self.term_ids:
+                mask[self._rows_of(self.term_ids[name])] = True
+        return mask
+
+    def _rows_of(self, term_id: int) -> np.ndarray:
+        sorted_rows, term_offsets, n_indexed = self._term_index()
+        parts = [self.rows[n_indexed:][self.terms[n_indexed:] == term_id]]
+        if term_id + 1 < len(term_offsets):
+            start, end = term_offsets[term_id], term_offsets[term_id + 1]
+            parts.append(sorted_rows[start:end])
+        buffered = [row for row, term_ids in self.buffer.items() if term_id in term_ids]
+        parts.append(np.array(buffered, dtype=np.int64))
+        return np.concatenate(parts)
+
+    def _term_index(self) -> tuple[np.ndarray, np.ndarray, int]:
+        """
+        The rows sorted on term, with the first position of each term, for the first n_indexed
+        pairs. It is only sorted again when many pairs have been merged since, the pairs after
+        n_indexed are scanned instead.
+        """
+        n_indexed = self._rows_by_term[2] if self._rows_by_term is not None else -1
+        if n_indexed < 0 or self._n_pairs - n_indexed > max(_MAX_BUFFERED, self._n_pairs // 8):
+            order = np.argsort(self.terms, kind="stable")
+            term_offsets = np.searchsorted(self.terms[order], np.arange(len(self.names) + 1))
+            self._rows_by_term = (self.rows[order], term_offsets, self._n_pairs)
+        return self._rows_by_term
+
+    def count(self, rows: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """
+        The number of the given rows (also given as a boolean mask) per term. Few rows are counted
+        by gathering their pairs, many rows by masking all pairs.
+        """
+        merged = rows[rows < self.n_merged]
+        if 4 * len(merged) < self.n_merged:
+            starts = self.offsets[merged]
+            lengths = self.offsets[merged + 1] - starts
+            first = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+            terms = self.terms[first + np.arange(len(first))]
+        else:
+            terms = self.terms[mask[self.rows]]
+        buffered = [term_id for row, ids in self.buffer.items() if mask[row] for term_id in ids]
+        terms = np.concatenate([terms, np.array(buffered, dtype=np.int64)])
+        return np.bincount(terms, minlength=len(self.names))
+
+    def top(self, counts: np.ndarray, limit: int) -> list[tuple[str, int]]:
+        """The terms with the highest counts, ordered by count and name"""
+        counts = counts[: len(self.names)]
+        candidates = np.flatnonzero(counts)
+        if len(candidates) > limit:
+            if limit <= 0:
+                return []
+            kth = len(candidates) - limit
+            threshold = np.partition(counts[candidates], kth)[kth]
+            candidates = candidates[counts[candidates] >= threshold]
+        counted = [(-int(counts[term_id]), self.names[term_id]) for term_id in candidates.tolist()]
+        return [(name, -count) for count, name in heapq.nsmallest(limit, counted)]
+
+    def compact(self, new_rows: np.ndarray, alive: np.ndarray):
+        self.merge()
+        keep = alive[self.rows]
+        self._set_pairs(int(alive.sum()), new_rows[self.rows[keep]], self.terms[keep])
+
+    def _set_pairs(self, n_rows: int, rows: np.ndarray, terms: np.ndarray):
+        order = np.argsort(rows, kind="stable")
+        self._rows, self._terms = rows[order].astype(np.int64), terms[order].astype(np.int64)
+        self._offsets = np.zeros(n_rows + 1, dtype=np.int64)
+        self._offsets[1:] = np.cumsum(np.bincount(self._rows, minlength=n_rows))
+        self._n_pairs, self.n_merged = len(rows), n_rows
+        self._rows_by_term = None
+
+
+def _append(array: np.ndarray, length: int, values: np.ndarray) -> np.ndarray:
+    """Write the values after the first length elements, doubling the capacity if needed"""
+    if length + len(values) > len(array):
+        grown = np.empty(max(2 * len(array), length + len(values)), dtype=array.dtype)
+        grown[:length] = array[:length]
+        array = grown
+    end = length + len(values)
+    array[length:end] = values
+    return array
+
+
+class FacetIndex:
+    """The facets of the resources of a single type. Not thread-safe."""
+
+    def __init__(self, facets: Iterable[str]):
+        self.facets = {facet: _FacetPairs() for facet in facets}
+        self._rows: dict[int, int] = {}  # resource identifier -> row
+        self._alive = np.zeros(1024, dtype=bool)
+        self._size = 0
+
+    @classmethod
+    def from_arrays(
+        cls,
+        identifiers: np.ndarray,
+        pairs: dict[str, tuple[np.ndarray, np.ndarray, list[str]]],
+    ) -> "FacetIndex":
+        """
+        Build the index at once, from the identifiers of all resources and, per facet, the
+        (resource identifier, term id) pairs and the names of the terms.
+        """
+        identifiers = np.unique(identifiers)
+        index = cls([])
+        index._rows = dict(zip(identifiers.tolist(), range(len(identifiers))))
+        index._size = len(identifiers)
+        index._alive = np.zeros(max(1024, 2 * index._size), dtype=bool)
+        index._alive[: index._size] = True
+        for facet, (resource_identifiers, terms, names) in pairs.items():
+            rows = np.searchsorted(identifiers, resource_identifiers)
+            index.facets[facet] = _FacetPairs.from_arrays(index._size, rows, terms, names)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, identifier: int, values: dict[str, list[str]]):
+        """Add or replace a resource, with the terms per facet"""
+        self.remove(identifier)
+        row = self._size
+        if row == len(self._alive):
+            self._alive = np.concatenate([self._alive, np.zeros(len(self._alive), dtype=bool)])
+        self._alive[row] = True
+        self._size += 1
+        self._rows[identifier] = row
+        for facet, pairs in self.facets.items():
+            pairs.add(row, values.get(facet, []))
+
+    def remove(self, identifier: int):
+        row = self._rows.pop(identifier, None)
+        if row is not None:
+            self._alive[row] = False
+            for pairs in self.facets.values():
+                pairs.remove(row)
+            if self._size > 1024 and len(self._rows) < self._size // 2:
+                self._compact()
+
+    def counts(
+        self, filters: dict[str, list[str]], facets: Iterable[str], limit: int
+    ) -> tuple[int, dict[str, list[tuple[str, int]]]]:
+        """
+        Return the number of resources matching the filters, and the most frequent terms per facet
+        of these resources, ordered by count and name. A resource matches if, for each facet in the
+        filters, it has at least one of the filtered terms.
+        """
+        alive = self._alive[: self._size]
+        mask = None
+        for facet, names in filters.items():
+            facet_mask = self.facets[facet].mask(names, self._size)
+            mask = facet_mask if mask is None else mask & facet_mask
+        if mask is not None:
+            mask &= alive
+            selected = np.flatnonzero(mask)
+            if 2 * len(selected) > len(self._rows):  # Count the unselected resources instead
+                unselected_mask = alive & ~mask
+                unselected = np.flatnonzero(unselected_mask)
+        result = {}
+        for facet in facets:
+            pairs = self.facets[facet]
+            if mask is None:
+                counts = pairs.counts
+            elif 2 * len(selected) <= len(self._rows):
+                counts = pairs.count(selected, mask)
+            else:
+                counts = pairs.counts[: len(pairs.names)] - pairs.count(unselected, unselected_mask)
+            result[facet] = pairs.top(counts, limit)
+        return len(self._rows) if mask is None else len(selected), result
+
+    def _compact(self):
+        alive = self._alive[: self._size]
+        new_rows = np.cumsum(alive) - 1
+        for pairs in self.facets.values():
+            pairs.compact(new_rows, alive)
+        self._rows = {identifier: int(new_rows[row]) for identifier, row in self._rows.items()}
+        self._size = len(self._rows)
+        self._alive = np.zeros(max(1024, 2 * self._size), dtype=bool)
+        self._alive[: self._size] = True
+
+
+class FacetIndexes:
+    """The facet indexes of all resource types, rebuilt from the database (see RebuiltIndexes)"""
+
+    def __init__(self, max_age_seconds: float = 300):
+        self._indexes: RebuiltIndexes[FacetIndex] = RebuiltIndexes(max_age_seconds)
+
+    @property
+    def max_age_seconds(self) -> float:
+        return self._indexes.max_age_seconds
+
+    @max_age_seconds.setter
+    def max_age_seconds(self, max_age_seconds: float):
+        self._indexes.max_age_seconds = max_age_seconds
+
+    def update(self, resource_type: str, identifier: int, values: dict[str, list[str]] | None):
+        """Add, replace or (if values is None) remove a resource, if the index has been built"""
+        if values is None:
+            self._indexes.update(resource_type, lambda index: index.remove(identifier))
+        else:
+            self._indexes.update(resource_type, lambda index: index.add(identifier, values))
+
+    def counts(self, resource_type: str, build, *args, **kwargs):
+        return self._indexes.read(resource_type, build, lambda index: index.counts(*args, **kwargs))
+
+    def clear(self):
+        self._indexes.clear()
+
+
+def available_facets(resource_class: Type[SQLModel]) -> list[str]:
+    """The facets that the resources of this class have"""
+    attributes = {"status": "aiod_entry"}
+    return [facet for facet in FACETS if hasattr(resource_class, attributes.get(facet, facet))]
+
+
+def facet_values(resource: Any) -> dict[str, list[str]]:
+    """The terms per facet of a resource"""
+    values = {}
+    for facet in available_facets(type(resource)):
+        if facet in _LINKED_FACETS:
+            values[facet] = [named.name for named in getattr(resource, facet)]
+        elif facet == "license":
+            values[facet] = [resource.license.name] if resource.license is not None else []
+        elif facet == "platform":
+            values[facet] = [resource.platform] if resource.platform is not None else []
+        elif facet == "status":
+            aiod_entry = resource.aiod_entry
+            has_status = aiod_entry is not None and aiod_entry.status is not None
+            values[facet] = [aiod_entry.status.name] if has_status else []
+    return values
+
+
+def build_facet_index(session: Session, resource_class: Type[SQLModel]) -> FacetIndex:
+    """Build the index from the database, using a single query per facet"""
+    identifiers = np.fromiter(session.scalars(select(resource_class.identifier)), dtype=np.int64)
+    pairs = {}
+    for facet in available_facets(resource_class):
+        pairs_query, names_query = _facet_queries(resource_class, facet)
+        names = dict(session.execute(names_query).all())
+        rows = np.array(session.execute(pairs_query).all(), dtype=np.int64).reshape(-1, 2)
+        keys, terms = np.unique(rows[:, 1], return_inverse=True)
+        pairs[facet] = (rows[:, 0], terms, [names[key] for key in keys.tolist()])
+    return FacetIndex.from_arrays(identifiers, pairs)
+
+
+def _facet_queries(resource_class: Type[SQLModel], facet: str):
+    """
+    Select the (resource identifier, term key) pairs of a facet, and the (term key, name) pairs
+    of its terms. The terms are selected by key rather than by name, so that the pairs can be
+    handled as numpy arrays.
+    """
+    if facet in _LINKED_FACETS:
+        relationship = inspect(resource_class).relationships[facet]
+        link, named = relationship.secondary, relationship.mapper.class_
+        pairs = select(link.c.from_identifier, link.c.linked_identifier)
+        return pairs, select(named.identifier, named.name)
+    if facet == "license":
+        pairs = select(resource_class.identifier, resource_class.license_identifier).where(
+            resource_class.license_identifier.is_not(None)
+        )
+        return pairs, select(License.identifier, License.name)
+    if facet == "platform":
+        pairs = select(resource_class.identifier, Platform.identifier).join(
+            Platform, resource_class.platform == Platform.name
+        )
+        return pairs, select(Platform.identifier, Platform.name)
+    if facet == "status":
+        pairs = select(resource_class.identifier, AIoDEntryORM.status_identifier).join(
+            AIoDEntryORM, resource_class.aiod_entry_identifier == AIoDEntryORM.identifier
+        )
+        pairs = pairs.where(AIoDEntryORM.status_identifier.is_not(None))
+        return pairs, select(Status.identifier, Status.name)
+    raise ValueError(f"Unknown facet {facet}.")
+
+
+facet_indexes = FacetIndexes(max_age_seconds=SEARCH_CONFIG.get("facet_max_age_seconds", 300))
@@ -0,0 +1,92 @@
+"""
+MinHash signatures and locality-sensitive hashing (LSH), to find near-duplicate texts without
+comparing all pairs.
+
+A text is normalised (lowercase, without punctuation) and split into overlapping character
+shingles. The MinHash signature of a text holds, for each of NUM_PERMUTATIONS hash functions,
+the minimum hash of its shingles. The fraction of equal signature values of two texts estimates
+the Jaccard similarity of their shingle sets.
+
+For LSH, the signature is split into BANDS bands. Texts with an equal band (the same bucket key)
+are candidate duplicates: with 16 bands of 4 values, texts with a similarity of 0.8 share a
+bucket with a probability above 0.999, and texts with a similarity of 0.3 with a probability of
+0.12. The candidates are then checked using their signatures.
+
+The hashing is vectorised with numpy, processing the shingles of many texts at once.
+"""
+
+import re
+
+import numpy as np
+
+NUM_PERMUTATIONS = 64
+BANDS = 16
+SHINGLE_SIZE = 5
+SIMILARITY_THRESHOLD = 0.8
+
+_ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+# The permutations are (a * h + b) mod p. With a, b and h below p = 2^31 - 1, the result is
+# computed without overflowing 64 bits.
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_CHUNK_SIZE = 1 << 16  # The number of shingles hashed at once
+
+_random = np.random.default_rng(seed=1)
+_A = _random.integers(1, _MERSENNE_PRIME, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_B = _random.integers(0, _MERSENNE_PRIME, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_POWERS = np.uint64(1_000_003) ** np.arange(SHINGLE_SIZE - 1, -1, -1, dtype=np.uint64)
+
+
+def normalise(text: str) -> str:
+    return " ".join(re.findall(r"\w+", text.lower()))
+
+
+def shingle_hashes(text: str) -> np.ndarray:
+    """The distinct 32-bit hashes of the character shingles of the normalised text"""
+    encoded = np.frombuffer(normalise(text).encode(), dtype=np.uint8)
+    if len(encoded) == 0:
+        return np.empty(0, dtype=np.uint64)
+    if len(encoded) < SHINGLE_SIZE:
+        encoded = np.pad(encoded, (0, SHINGLE_SIZE - len(encoded)))
+    windows = np.lib.stride_tricks.sliding_window_view(encoded, SHINGLE_SIZE)
+    hashes = windows.astype(np.uint64) @ _POWERS
+    hashes ^= hashes >> np.uint64(29)
+    hashes *= np.uint64(0xBF58476D1CE4E5B9)
+    hashes ^= hashes >> np.uint64(32)
+    return np.unique(hashes & _MAX_HASH)
+
+
+def signatures(texts: list[str]) -> np.ndarray:
+    """
+    The MinHash signatures of the texts, as an array of shape (len(texts), NUM_PERMUTATIONS). The
+    signature of an empty text consists of the maximum hash values.
+    """
+    result = np.full((len(texts), NUM_PERMUTATIONS), _MAX_HASH, dtype=np.uint64)
+    hashes = [shingle_hashes(text) for text in texts]
+    owners = np.repeat(np.arange(len(texts)), [len(h) for h in hashes])
+    all_hashes = np.concatenate(hashes) if hashes else np.empty(0, np.uint64)
+    for start in range(0, len(all_hashes), _CHUNK_SIZE):
+        end = start + _CHUNK_SIZE
+        chunk, chunk_owners = all_hashes[start:end] % _MERSENNE_PRIME, owners[start:end]
+        permuted = (chunk[:, None] * _A + _B) % _MERSENNE_PRIME
+        # The owners are sorted, so the minimum per text is a reduction per segment
+        starts = np.flatnonzero(np.r_[True, chunk_owners[1:] != chunk_owners[:-1]])
+        segment_owners = chunk_owners[starts]
+        minimums = np.minimum.reduceat(permuted, starts, axis=0)
+        result[segment_owners] = np.minimum(result[segment_owners], minimums)
+    return result.astype(np.uint32)
+
+
+def band_keys(signatures_: np.ndarray) -> np.ndarray:
+    """The bucket key of each band of each signature, as signed 64-bit integers"""
+    bands = signatures_.reshape(len(signatures_), BANDS, _ROWS_PER_BAND).astype(np.uint64)
+    keys = np.zeros((len(signatures_), BANDS), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for row in range(_ROWS_PER_BAND):
+            keys = (keys * np.uint64(0x100000001B3)) ^ bands[:, :, row]
+    return keys.view(np.int64)
+
+
+def similarity(signature: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """The estimated Jaccard similarity of a signature to each of the other signatures"""
+    return np.mean(others == signature, axis=-1)
@@ -0,0 +1,53 @@
+"""
+The search index used by the REST API, as configured in the search section of the configuration.
+
+The documents are kept by the search backend, which may be shared with other processes. The
+backend records when the index of a resource type was built from the database; search_builds
+builds the index of a resource type in the background (see RebuiltIndexes) when the backend has
+not built it yet, or when it was built longer than max_age_seconds ago.
+"""
+
+import math
+import time
+from typing import Any
+
+from config import SEARCH_CONFIG
+from database.rebuilt_indexes import RebuiltIndexes
+from search.backend import ElasticsearchIndex, SearchDocument, SearchIndex, SqliteSearchIndex
+
+
+def search_document(resource: Any) -> SearchDocument:
+    """The searchable text of an AIResource"""
+    return SearchDocument(
+        name=resource.name,
+        description=resource.description or "",
+        keyword=[keyword.name for keyword in resource.keyword],
+        alternate_name=[alternate_name.name for alternate_name in resource.alternate_name],
+    )
+
+
+def create_search_index(config: dict) -> SearchIndex:
+    backend_name = config.get("backend", "sqlite")
+    if backend_name == "sqlite":
+        return SqliteSearchIndex(
+            path=config.get("path", ":memory:"),
+            max_age_seconds=config.get("search_max_age_seconds", 300),
+        )
+    if backend_name == "elasticsearch":
+        return ElasticsearchIndex(
+            url=config["url"], index_prefix=config.get("index_prefix", "aiod")
+        )
+    raise ValueError(f"Unknown search backend {backend_name}. Expected sqlite or elasticsearch.")
+
+
+def is_outdated(resource_type: str) -> bool:
+    """Whether the index of this resource type should be built (again) from the database"""
+    built_at = search_index.built_at(resource_type)
+    max_age = search_index.max_age_seconds
+    return built_at is None or (max_age is not None and time.time() - built_at > max_age)
+
+
+search_index = create_search_index(SEARCH_CONFIG)
+# The resource types of which this process has built, or found, the index in the backend. The age
+# is taken from the backend, so that an index rebuilt by another process is not rebuilt again.
+search_builds: RebuiltIndexes[str] = RebuiltIndexes(math.inf, is_outdated=is_outdated)
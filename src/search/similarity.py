@@ -0,0 +1,389 @@
+"""
+Precomputed similar resources, based on the TF-IDF vectors of their name, description and
+keywords.
+
+Each resource is represented by a sparse vector of at most MAX_TERMS terms, weighted by TF-IDF and
+normalized, so that the similarity of two resources is the dot product of their vectors (the
+cosine similarity). The vectors are stored in compressed sparse row (CSR) arrays. To find the
+resources similar to a resource, the index uses an inverted index (the same vectors in compressed
+sparse column layout): only the resources sharing a term are scored. Terms occurring in more than
+a small fraction of the resources, or in more than MAX_POSTINGS resources, are ignored: they say
+little about the similarity, and they would make the number of scored pairs grow quadratically.
+
+The NEIGHBOURS most similar resources of each resource are computed when the index is built, for
+batches of resources at once: the products of the batch with the inverted index are summed per
+pair of resources, and the best pairs of each resource are kept. A new
+or updated resource gets a new row: its neighbours are computed, and it is added to the
+neighbours of the resources to which it is more similar than their current neighbours. The
+resources added after the inverted index was built are scored directly, until there are enough
+of them to rebuild the inverted index. Requests only read the precomputed neighbours.
+
+The document frequencies are increased on each write (and not decreased when a resource is
+removed), but the vectors of the existing resources are not reweighted until the index is built
+again.
+"""
+
+import math
+import re
+from array import array
+from typing import Callable, Iterable
+
+import numpy as np
+
+from config import SEARCH_CONFIG
+from database.rebuilt_indexes import RebuiltIndexes
+from search.backend import SearchDocument
+
+MAX_TERMS = 32
+NEIGHBOURS = 20
+# Terms in a larger fraction of the resources are ignored, if they are in many resources
+MAX_DOCUMENT_FREQUENCY = 0.01
+_MIN_IGNORED_FREQUENCY = 100
+# Terms in more resources are always ignored, bounding the length of the posting lists
+MAX_POSTINGS = 1000
+# The number of products computed at once when the neighbours of all resources are computed
+_BATCH_PRODUCTS = 1 << 22
+_MAX_UNINDEXED_ROWS = 1024
+_KEYWORD_WEIGHT = 2.0
+_NO_NEIGHBOUR = -1
+
+
+def terms(document: SearchDocument) -> dict[str, float]:
+    """The term frequencies of a document. Keywords count double."""
+    frequencies: dict[str, float] = {}
+    text = " ".join([document.name, document.description, *document.alternate_name])
+    for term in re.findall(r"\w\w+", text.lower()):
+        frequencies[term] = frequencies.get(term, 0) + 1
+    for keyword in document.keyword:
+        for term in re.findall(r"\w\w+", keyword.lower()):
+            frequencies[term] = frequencies.get(term, 0) + _KEYWORD_WEIGHT
+    return frequencies
+
+
+class SimilarityIndex:
+    """The TF-IDF vectors and neighbours of the resources of a single type. Not thread-safe."""
+
+    def __init__(self):
+        self._term_ids: dict[str, int] = {}
+        self._document_frequency = np.zeros(1024, dtype=np.int64)
+        self._n_documents = 0
+        self._rows: dict[int, int] = {}  # resource identifier -> row
+        self._identifiers = np.zeros(1024, dtype=np.int64)
+        self._alive = np.zeros(1024, dtype=bool)
+        self._size = 0
+        # The vectors of the rows, in CSR layout
+        self._indptr = np.zeros(1025, dtype=np.int64)
+        self._indices = np.zeros(1024 * MAX_TERMS, dtype=np.int32)
+        self._data = np.zeros(1024 * MAX_TERMS, dtype=np.float32)
+        # The inverted index of the first _indexed_size rows, in CSC layout
+        self._indexed_size = 0
+        self._postings: tuple[np.ndarray, np.ndarray, np.ndarray] | None = None
+        self._neighbours = np.full((1024, NEIGHBOURS), _NO_NEIGHBOUR, dtype=np.int32)
+        self._scores = np.zeros((1024, NEIGHBOURS), dtype=np.float32)
+        self._build_postings()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @classmethod
+    def build(cls, documents: Iterable[tuple[int, SearchDocument]]) -> "SimilarityIndex":
+        """Build the index from all documents, computing the neighbours of each document"""
+        index = cls()
+        identifiers, lengths = array("q"), array("q")
+        term_ids, frequencies = array("q"), array("f")
+        for identifier, document in documents:
+            document_terms = terms(document)
+            identifiers.append(identifier)
+            lengths.append(len(document_terms))
+            term_ids.extend(
+                index._term_ids.setdefault(t, len(index._term_ids)) for t in document_terms
+            )
+            frequencies.extend(document_terms.values())
+        index._load(
+            np.asarray(identifiers, dtype=np.int64),
+            np.asarray(lengths, dtype=np.int64),
+            np.asarray(term_ids, dtype=np.int64),
+            np.asarray(frequencies, dtype=np.float32),
+        )
+        index._build_postings()
+        index._build_neighbours()
+        return index
+
+    def add(self, identifier: int, document: SearchDocument):
+        """Add or replace a document, and update the neighbours"""
+        self.remove(identifier)
+        document_terms = terms(document)
+        self._count_terms(document_terms)
+        row = self._append(identifier, document_terms)
+        if self._size - self._indexed_size > _MAX_UNINDEXED_ROWS:
+            self._build_postings()
+        candidates, scores = self._similarities(row)
+        self._set_neighbours(row, candidates, scores)
+        beats = scores > np.where(
+            self._neighbours[candidates, -1] == _NO_NEIGHBOUR, 0, self._scores[candidates, -1]
+        )
+        for candidate, score in zip(candidates[beats], scores[beats]):
+            self._insert_neighbour(candidate, row, score)
+
+    def remove(self, identifier: int):
+        row = self._rows.pop(identifier, None)
+        if row is not None:
+            self._alive[row] = False
+
+    def similar(self, identifier: int, k: int) -> list[int] | None:
+        """The identifiers of the k most similar resources, or None for an unknown identifier"""
+        row = self._rows.get(identifier)
+        if row is None:
+            return None
+        neighbours = self._neighbours[row]
+        neighbours = neighbours[neighbours != _NO_NEIGHBOUR]
+        neighbours = neighbours[self._alive[neighbours]]
+        return [int(i) for i in self._identifiers[neighbours[:k]]]
+
+    @property
+    def outdated(self) -> bool:
+        """Whether so many rows were removed or replaced that the index should be built again"""
+        return self._size > _MAX_UNINDEXED_ROWS and len(self._rows) < self._size // 2
+
+    def _count_terms(self, document_terms: dict[str, float]):
+        for term in document_terms:
+            if term not in self._term_ids:
+                self._term_ids[term] = len(self._term_ids)
+        if len(self._term_ids) > len(self._document_frequency):
+            self._document_frequency = _grow(self._document_frequency, len(self._term_ids))
+        ids = np.fromiter((self._term_ids[t] for t in document_terms), dtype=np.int64)
+        self._document_frequency[ids] += 1
+        self._n_documents += 1
+
+    def _append(self, identifier: int, document_terms: dict[str, float]) -> int:
+        """Append the normalized TF-IDF vector of the document as a new row"""
+        row = self._size
+        if row == len(self._alive):
+            self._alive = _grow(self._alive, row + 1)
+            self._identifiers = _grow(self._identifiers, row + 1)
+            self._neighbours = _grow(self._neighbours, row + 1, fill=_NO_NEIGHBOUR)
+            self._scores = _grow(self._scores, row + 1)
+            self._indptr = _grow(self._indptr, row + 2)
+        self._size += 1
+        self._alive[row] = True
+        self._identifiers[row] = identifier
+        self._rows[identifier] = row
+
+        ids = np.fromiter((self._term_ids[t] for t in document_terms), dtype=np.int32)
+        frequencies = np.fromiter(document_terms.values(), dtype=np.float32)
+        idf = np.log((1 + self._n_documents) / (1 + self._document_frequency[ids])) + 1
+        weights = (1 + np.log(frequencies)) * idf.astype(np.float32)
+        if len(ids) > MAX_TERMS:
+            keep = np.argpartition(-weights, MAX_TERMS)[:MAX_TERMS]
+            ids, weights = ids[keep], weights[keep]
+        norm = float(np.linalg.norm(weights))
+        order = np.argsort(ids)
+        start = self._indptr[row]
+        end = start + len(ids)
+        if end > len(self._indices):
+            self._indices = _grow(self._indices, end)
+            self._data = _grow(self._data, end)
+        self._indices[start:end] = ids[order]
+        self._data[start:end] = weights[order] / norm if norm > 0 else weights[order]
+        self._indptr[row + 1] = end
+        return row
+
+    def _load(
+        self,
+        identifiers: np.ndarray,
+        lengths: np.ndarray,
+        term_ids: np.ndarray,
+        frequencies: np.ndarray,
+    ):
+        """
+        Fill an empty index with the normalized TF-IDF vectors of all documents at once, given
+        the term ids and term frequencies of the documents one after the other.
+        """
+        size = len(identifiers)
+        capacity = max(size, len(self._alive))
+        self._document_frequency = np.bincount(
+            term_ids, minlength=max(len(self._term_ids), len(self._document_frequency))
+        )
+        self._n_documents = size
+        self._size = size
+        self._rows = dict(zip(identifiers.tolist(), range(size)))
+        self._identifiers = np.zeros(capacity, dtype=np.int64)
+        self._identifiers[:size] = identifiers
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._alive[:size] = True
+        self._neighbours = np.full((capacity, NEIGHBOURS), _NO_NEIGHBOUR, dtype=np.int32)
+        self._scores = np.zeros((capacity, NEIGHBOURS), dtype=np.float32)
+
+        rows = np.repeat(np.arange(size), lengths)
+        idf = np.log((1 + size) / (1 + self._document_frequency[term_ids])) + 1
+        weights = (1 + np.log(frequencies)) * idf.astype(np.float32)
+        # Keep the MAX_TERMS heaviest terms of each document
+        order = np.lexsort((-weights, rows))
+        rank = np.arange(len(order)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        keep = np.sort(order[rank < MAX_TERMS])
+        rows, term_ids, weights = rows[keep], term_ids[keep], weights[keep]
+        norms = np.sqrt(np.bincount(rows, weights=np.square(weights), minlength=size))
+        weights = weights / np.where(norms > 0, norms, 1)[rows].astype(np.float32)
+        order = np.lexsort((term_ids, rows))
+        self._indptr = np.zeros(capacity + 1, dtype=np.int64)
+        self._indptr[: size + 1] = np.concatenate(
+            ([0], np.cumsum(np.bincount(rows, minlength=size)))
+        )
+        self._indices = np.zeros(max(len(order), capacity * MAX_TERMS), dtype=np.int32)
+        self._data = np.zeros(len(self._indices), dtype=np.float32)
+        self._indices[: len(order)] = term_ids[order]
+        self._data[: len(order)] = weights[order]
+
+    def _vector(self, row: int) -> tuple[np.ndarray, np.ndarray]:
+        """The term ids and weights of a row"""
+        start, end = self._indptr[row], self._indptr[row + 1]
+        return self._indices[start:end], self._data[start:end]
+
+    def _build_postings(self):
+        """Build the inverted index of all rows, ignoring the very frequent terms"""
+        nnz = self._indptr[self._size]
+        indices, data = self._indices[:nnz], self._data[:nnz]
+        rows = np.repeat(
+            np.arange(self._size, dtype=np.int32), np.diff(self._indptr[: self._size + 1])
+        )
+        frequent = self._document_frequency[: len(self._term_ids)] > self._max_frequency()
+        keep = ~frequent[indices]
+        indices, data, rows = indices[keep], data[keep], rows[keep]
+        order = np.argsort(indices, kind="stable")
+        offsets = np.searchsorted(indices[order], np.arange(len(self._term_ids) + 1))
+        self._postings = (offsets, rows[order], data[order])
+        self._indexed_size = self._size
+
+    def _max_frequency(self) -> int:
+        frequency = max(
+            _MIN_IGNORED_FREQUENCY, math.ceil(MAX_DOCUMENT_FREQUENCY * self._n_documents)
+        )
+        return min(frequency, MAX_POSTINGS)
+
+    def _build_neighbours(self):
+        """Compute the neighbours of all rows, scoring batches of rows against the postings"""
+        offsets, posting_rows, posting_data = self._postings
+        nnz = self._indptr[self._size]
+        ids, weights = self._indices[:nnz], self._data[:nnz]
+        rows = np.repeat(np.arange(self._size), np.diff(self._indptr[: self._size + 1]))
+        lengths = offsets[ids + 1] - offsets[ids]  # Zero for the ignored terms
+        products = np.cumsum(np.bincount(rows, weights=lengths, minlength=self._size))
+        start = 0
+        while start < self._size:
+            done = products[start - 1] if start > 0 else 0
+            end = max(
+                int(np.searchsorted(products, done + _BATCH_PRODUCTS, side="right")), start + 1
+            )
+            first, last = self._indptr[start], self._indptr[end]
+            positions = _positions(offsets[ids[first:last]], lengths[first:last])
+            queries = np.repeat(rows[first:last], lengths[first:last])
+            pairs, inverse = np.unique(
+                queries * self._size + posting_rows[positions], return_inverse=True
+            )
+            scores = np.bincount(
+                inverse,
+                weights=posting_data[positions]
+                * np.repeat(weights[first:last], lengths[first:last]),
+            ).astype(np.float32)
+            queries, candidates = pairs // self._size, pairs % self._size
+            order = np.lexsort((self._identifiers[candidates], -scores, queries))
+            order = order[queries[order] != candidates[order]]
+            queries, candidates, scores = queries[order], candidates[order], scores[order]
+            rank = np.arange(len(queries)) - np.searchsorted(queries, queries)
+            best = rank < NEIGHBOURS
+            self._neighbours[queries[best], rank[best]] = candidates[best]
+            self._scores[queries[best], rank[best]] = scores[best]
+            start = end
+
+    def _similarities(self, row: int) -> tuple[np.ndarray, np.ndarray]:
+        """The rows sharing a term with this row, with their cosine similarity"""
+        ids, weights = self._vector(row)
+        rare = self._document_frequency[ids] <= self._max_frequency()
+        ids, weights = ids[rare], weights[rare]
+        offsets, posting_rows, posting_data = self._postings
+        indexed = ids < len(offsets) - 1  # Terms that are new since the postings were built
+        starts, ends = offsets[ids[indexed]], offsets[ids[indexed] + 1]
+        lengths = ends - starts
+        positions = _positions(starts, lengths)
+        candidate_rows = [posting_rows[positions]]
+        products = [posting_data[positions] * np.repeat(weights[indexed], lengths)]
+        for other in range(self._indexed_size, self._size):
+            other_ids, other_weights = self._vector(other)
+            _, mine, theirs = np.intersect1d(
+                ids, other_ids, assume_unique=True, return_indices=True
+            )
+            if mine.size:
+                candidate_rows.append(np.array([other], dtype=np.int32))
+                products.append(np.array([np.dot(weights[mine], other_weights[theirs])]))
+        candidates, inverse = np.unique(np.concatenate(candidate_rows), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(products)).astype(np.float32)
+        keep = (candidates != row) & self._alive[candidates]
+        return candidates[keep], scores[keep]
+
+    def _set_neighbours(self, row: int, candidates: np.ndarray, scores: np.ndarray):
+        if len(candidates) > NEIGHBOURS:
+            best = np.argpartition(-scores, NEIGHBOURS)[:NEIGHBOURS]
+            candidates, scores = candidates[best], scores[best]
+        order = np.lexsort((self._identifiers[candidates], -scores))
+        self._neighbours[row], self._scores[row] = _NO_NEIGHBOUR, 0
+        self._neighbours[row, : len(order)] = candidates[order]
+        self._scores[row, : len(order)] = scores[order]
+
+    def _insert_neighbour(self, row: int, neighbour: int, score: float):
+        neighbours, scores = self._neighbours[row], self._scores[row]
+        valid = neighbours != _NO_NEIGHBOUR
+        position = int(np.sum(valid & (scores >= score)))
+        shifted = slice(position + 1, None)
+        neighbours[shifted] = neighbours[position:-1].copy()
+        scores[shifted] = scores[position:-1].copy()
+        neighbours[position], scores[position] = neighbour, score
+
+
+def _positions(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """The positions in the postings of the concatenated ranges [start, start + length)"""
+    positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    positions += np.arange(lengths.sum())
+    return positions
+
+
+def _grow(array: np.ndarray, minimum: int, fill=0) -> np.ndarray:
+    """A copy of the array, with at least twice the length"""
+    new = np.full((max(minimum, 2 * len(array)), *array.shape[1:]), fill, dtype=array.dtype)
+    new[: len(array)] = array
+    return new
+
+
+class SimilarityIndexes:
+    """
+    The similarity indexes of all resource types. An index is built from the database in the
+    background when it is first used, and built again when it is older than max_age_seconds or
+    when many of its rows were removed (see RebuiltIndexes).
+    """
+
+    def __init__(self, max_age_seconds: float = 86400):
+        self._indexes: RebuiltIndexes[SimilarityIndex] = RebuiltIndexes(
+            max_age_seconds, is_outdated=lambda index: index.outdated
+        )
+
+    def similar(
+        self, resource_type: str, build: Callable[[], SimilarityIndex], identifier: int, k: int
+    ) -> list[int] | None:
+        """The similar resources. Raises NotBuiltYet while the index is built for the first time."""
+        return self._indexes.read(
+            resource_type, build, lambda index: index.similar(identifier, k), wait=False
+        )
+
+    def update(self, resource_type: str, identifier: int, document: SearchDocument | None):
+        """Add, replace or (if document is None) remove a resource, if the index has been built"""
+        if document is None:
+            self._indexes.update(resource_type, lambda index: index.remove(identifier))
+        else:
+            self._indexes.update(resource_type, lambda index: index.add(identifier, document))
+
+    def clear(self):
+        self._indexes.clear()
+
+
+similarity_indexes = SimilarityIndexes(
+    max_age_seconds=SEARCH_CONFIG.get("similarity_max_age_seconds", 86400)
+)
@@ -0,0 +1,49 @@
+from cache.backend import InMemoryCache
+from cache.response_cache import CachedResponse, ResponseCache
+
+
+def test_least_recently_used_is_evicted():
+    cache = InMemoryCache(max_size=2)
+    cache.set("a", b"1", ttl_seconds=60)
+    cache.set("b", b"2", ttl_seconds=60)
+    assert cache.get("a") == b"1"
+    cache.set("c", b"3", ttl_seconds=60)
+    assert cache.get("a") == b"1"
+    assert cache.get("b") is None
+    assert cache.get("c") == b"3"
+
+
+def test_expired_value_is_not_returned():
+    cache = InMemoryCache()
+    cache.set("a", b"1", ttl_seconds=-1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_invalidate_only_affects_resource_type():
+    cache = ResponseCache(InMemoryCache())
+    response = CachedResponse(body=b'{"a": 1}', headers={"etag": '"abc"'})
+    cache.set(cache.key("dataset", "/datasets/v1/1"), response)
+    cache.set(cache.key("person", "/persons/v1/1"), response)
+    cache.invalidate("dataset")
+    assert cache.get(cache.key("dataset", "/datasets/v1/1")) is None
+    assert cache.get(cache.key("person", "/persons/v1/1")) == response
+    assert cache.statistics()["hits"] == 1
+    assert cache.statistics()["misses"] == 1
+
+
+def test_invalidation_during_fetch_is_not_overwritten():
+    cache = ResponseCache(InMemoryCache())
+    key = cache.key("dataset", "/datasets/v1/1")
+    assert cache.get(key) is None
+    cache.invalidate("dataset")  # a write commits while the response is being fetched
+    cache.set(key, CachedResponse(body=b'{"name": "stale"}', headers={}))
+    assert cache.get(cache.key("dataset", "/datasets/v1/1")) is None
+
+
+def test_disabled_cache():
+    cache = ResponseCache(None)
+    key = cache.key("dataset", "/datasets/v1/1")
+    cache.set(key, CachedResponse(body=b"{}", headers={}))
+    assert cache.get(key) is None
+    assert not cache.statistics()["enabled"]
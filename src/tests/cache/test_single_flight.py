@@ -0,0 +1,51 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from cache import SingleFlight
+
+
+def test_followers_wait_for_leader():
+    single_flight: SingleFlight[str] = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fetch() -> str:
+        calls.append(1)
+        started.set()
+        release.wait(timeout=5)
+        return "result"
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        leader = executor.submit(single_flight.do, "key", fetch)
+        started.wait(timeout=5)
+        followers = [executor.submit(single_flight.do, "key", fetch) for _ in range(3)]
+        other_key = executor.submit(single_flight.do, "other", lambda: "other")
+        assert other_key.result(timeout=5) == "other"
+        time.sleep(0.1)  # Give the followers time to start waiting
+        release.set()
+        assert leader.result(timeout=5) == "result"
+        assert [f.result(timeout=5) for f in followers] == ["result"] * 3
+    assert len(calls) == 1
+
+
+def test_exception_is_shared():
+    single_flight: SingleFlight[None] = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def fetch():
+        started.set()
+        release.wait(timeout=5)
+        raise ValueError("database unavailable")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(single_flight.do, "key", fetch)
+        started.wait(timeout=5)
+        follower = executor.submit(single_flight.do, "key", fetch)
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(ValueError, match="database unavailable"):
+                future.result(timeout=5)
+    assert single_flight.in_flight() == 0
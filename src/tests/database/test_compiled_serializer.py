@@ -0,0 +1,88 @@
+import datetime
+import enum
+import json
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+import routers
+from database.model.agent.organisation import Organisation
+from database.model.agent.person import Person
+from database.model.compiled_serializer import compile_serializer
+from database.model.dataset.dataset import Dataset
+from database.model.knowledge_asset.publication import Publication
+from database.model.models_and_experiments.experiment import Experiment
+from database.model.serializers import AttributeSerializer, create_getter_dict
+
+
+class Color(enum.Enum):
+    RED = "red"
+
+
+class Nested(BaseModel):
+    name: str
+    description: str | None
+
+    class Config:
+        orm_mode = True
+
+
+class Model(BaseModel):
+    identifier: int
+    color: Color
+    date: datetime.datetime
+    score: float
+    nested: list[Nested]
+    keyword: list[str]
+    creator: list[int]
+    missing: str = "default"
+
+    class Config:
+        orm_mode = True
+        getter_dict = create_getter_dict(
+            {"keyword": AttributeSerializer("name"), "creator": AttributeSerializer("identifier")}
+        )
+
+
+def test_equal_to_from_orm():
+    obj = SimpleNamespace(
+        identifier=1,
+        color="red",
+        date=datetime.datetime(2023, 1, 2, 3, 4, 5, 6),
+        score=1,
+        nested=[SimpleNamespace(name="a", description=None, other="ignored")],
+        keyword=[SimpleNamespace(name="tag1"), SimpleNamespace(name="tag2")],
+        creator=[SimpleNamespace(identifier=3)],
+    )
+    expected = jsonable_encoder(Model.from_orm(obj), exclude_none=True)
+    assert compile_serializer(Model)(obj) == expected
+    assert expected["nested"] == [{"name": "a"}]
+
+
+def test_resources_byte_for_byte(
+    engine: Engine,
+    dataset: Dataset,
+    person: Person,
+    publication: Publication,
+    organisation: Organisation,
+    experiment: Experiment,
+):
+    with Session(engine) as session:
+        for resource in (person, dataset, publication, organisation, experiment):
+            session.merge(resource)
+        session.commit()
+
+        serialized_types = set()
+        for router in routers.resource_routers:
+            for resource in session.scalars(select(router.resource_class)).all():
+                read = router.resource_class_read.from_orm(resource)
+                expected = jsonable_encoder(
+                    type(read).parse_obj(read.dict(exclude_none=True)), exclude_none=True
+                )
+                actual = compile_serializer(router.resource_class_read)(resource)
+                assert json.dumps(actual) == json.dumps(expected)
+                serialized_types.add(router.resource_name)
+    assert {"dataset", "person", "publication", "organisation", "experiment"} <= serialized_types
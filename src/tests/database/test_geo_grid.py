@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from database.model import geo_grid
+
+
+def test_cell():
+    assert geo_grid.cell(None, 4.35) is None
+    assert geo_grid.cell(-90, -180) == 0
+    assert geo_grid.cell(90, 180) == 180 * 360 - 1
+    assert geo_grid.cell(50.85, 4.35) == 140 * 360 + 184
+
+
+def test_cell_ranges():
+    assert geo_grid.cell_ranges(50.5, 4.1, 51.5, 5.9) == [
+        (140 * 360 + 184, 140 * 360 + 185),
+        (141 * 360 + 184, 141 * 360 + 185),
+    ]
+    assert geo_grid.cell_ranges(0.5, 179.5, 0.5, -179.5) == [
+        (90 * 360 + 359, 90 * 360 + 359),
+        (90 * 360, 90 * 360),
+    ]
+
+
+def test_bounding_box():
+    min_latitude, min_longitude, max_latitude, max_longitude = geo_grid.bounding_box(0, 179, 222)
+    assert (min_latitude, max_latitude) == pytest.approx((-2, 2), abs=0.01)
+    assert (min_longitude, max_longitude) == pytest.approx((177, -179), abs=0.01)
+    assert geo_grid.bounding_box(89, 0, 500)[1:4:2] == (-180, 180)
+
+
+def test_distances_km():
+    distances = geo_grid.distances_km(50.85, 4.35, np.array([48.86, 50.85]), np.array([2.35, 4.35]))
+    assert distances == pytest.approx([264, 0], abs=1)
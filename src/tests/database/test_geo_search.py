@@ -0,0 +1,25 @@
+from sqlalchemy import create_engine, inspect, text
+
+from database.geo_search import backfill_grid_cells
+from database.model import geo_grid
+
+
+def test_backfill_adds_grid_cell_column():
+    engine = create_engine("sqlite://")
+    with engine.connect() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE geo (identifier INTEGER PRIMARY KEY, latitude FLOAT, "
+                "longitude FLOAT, elevation_millimeters INTEGER)"
+            )
+        )
+        connection.execute(
+            text("INSERT INTO geo VALUES (1, 50.85, 4.35, NULL), (2, NULL, 4.35, 0)")
+        )
+        assert backfill_grid_cells(connection) == 1
+        assert backfill_grid_cells(connection) == 0
+
+        rows = connection.execute(text("SELECT identifier, grid_cell FROM geo ORDER BY 1")).all()
+        assert rows == [(1, geo_grid.cell(50.85, 4.35)), (2, None)]
+        indexes = inspect(connection).get_indexes("geo")
+        assert [index["column_names"] for index in indexes] == [["grid_cell"]]
@@ -0,0 +1,50 @@
+import threading
+import time
+
+import pytest
+
+from database.rebuilt_indexes import NotBuiltYet, RebuiltIndexes
+
+
+def _wait_until(condition):
+    deadline = time.monotonic() + 10
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert condition()
+
+
+def test_rebuilt_off_lock_with_changes_applied():
+    indexes: RebuiltIndexes[list] = RebuiltIndexes(max_age_seconds=-1)
+    assert indexes.read("a", lambda: [1], list) == [1]
+
+    building, release = threading.Event(), threading.Event()
+
+    def build():
+        building.set()
+        release.wait(10)
+        return [1, 2]
+
+    assert indexes.read("a", build, list) == [1]  # The stale index is rebuilt in the background
+    assert building.wait(10)
+    indexes.update("a", lambda index: index.append(3))  # Not blocked by the build
+    assert indexes.read("a", build, list) == [1, 3]
+    release.set()
+    _wait_until(lambda: indexes.read("a", build, list) == [1, 2, 3])
+
+
+def test_not_built_yet():
+    indexes: RebuiltIndexes[list] = RebuiltIndexes(max_age_seconds=300)
+    with pytest.raises(NotBuiltYet):
+        indexes.read("a", lambda: [1], list, wait=False)
+    _wait_until(lambda: indexes.read("a", lambda: [2], list) == [1])
+
+
+def test_failed_rebuild_keeps_index():
+    indexes: RebuiltIndexes[list] = RebuiltIndexes(max_age_seconds=-1)
+    indexes.read("a", lambda: [1], list)
+
+    def build():
+        raise RuntimeError("database unavailable")
+
+    for _ in range(3):
+        assert indexes.read("a", build, list) == [1]
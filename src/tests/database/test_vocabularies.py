@@ -0,0 +1,35 @@
+import time
+
+from database.vocabularies import Vocabularies, Vocabulary
+
+
+def test_suggest():
+    vocabulary = Vocabulary({"Rain": 1, "rainfall": 5, "Railway": 5, "traffic": 10})
+    assert vocabulary.suggest("rai", limit=10) == [("Railway", 5), ("rainfall", 5), ("Rain", 1)]
+    assert vocabulary.suggest("RAIN", limit=1) == [("rainfall", 5)]
+    assert vocabulary.suggest("", limit=2) == [("traffic", 10), ("Railway", 5)]
+    assert vocabulary.suggest("x", limit=10) == []
+
+
+def test_add():
+    vocabulary = Vocabulary({"rainfall": 1})
+    vocabulary.add("Rain")
+    vocabulary.add("rainfall", usage=2)
+    assert len(vocabulary) == 2
+    assert vocabulary.suggest("rain", limit=10) == [("rainfall", 3), ("Rain", 1)]
+
+
+def test_vocabularies_reloaded_in_background():
+    vocabularies = Vocabularies(max_age_seconds=-1)
+    vocabularies.add("keyword", ["ignored"])  # Not loaded yet
+    assert vocabularies.suggest("keyword", lambda: Vocabulary({"rain": 1}), "", 10) == [("rain", 1)]
+    vocabularies.add("keyword", ["rainfall"])
+
+    def reload() -> Vocabulary:
+        return Vocabulary({"rain": 2})
+
+    assert vocabularies.suggest("keyword", reload, "", 10) == [("rain", 1), ("rainfall", 1)]
+    deadline = time.monotonic() + 10
+    while vocabularies.suggest("keyword", reload, "", 10) != [("rain", 2)]:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
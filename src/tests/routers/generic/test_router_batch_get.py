@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+from starlette.testclient import TestClient
+
+from database.model.concept.status import Status
+from routers.resource_router import MAX_LIMIT
+from tests.routers.generic.test_router_eager_loading import QueryCounter
+from tests.testutils.test_resource import test_resource_factory
+
+
+@pytest.fixture
+def engine_with_resources(engine_test_resource: Engine) -> Engine:
+    with Session(engine_test_resource) as session:
+        draft = Status(name="draft")
+        session.add_all(
+            [
+                test_resource_factory(title=f"title {i}", status=draft, platform_identifier=str(i))
+                for i in range(5)
+            ]
+        )
+        session.commit()
+    return engine_test_resource
+
+
+def test_batch_get_in_request_order(
+    client_test_resource: TestClient, engine_with_resources: Engine
+):
+    response = client_test_resource.post(
+        "/test_resources/v0/batch_get", json={"identifiers": [4, 99, 1, 4, 2]}
+    )
+    assert response.status_code == 200, response.json()
+    response_json = response.json()
+    assert [r["identifier"] for r in response_json["resources"]] == [4, 1, 2]
+    assert response_json["resources"][0]["title"] == "title 3"
+    assert response_json["resources"][0]["aiod_entry"]["status"] == "draft"
+    assert response_json["not_found"] == [99]
+
+
+def test_batch_get_number_of_queries(
+    client_test_resource: TestClient, engine_with_resources: Engine
+):
+    with QueryCounter(engine_with_resources) as counter_single:
+        client_test_resource.post("/test_resources/v0/batch_get", json={"identifiers": [1]})
+    with QueryCounter(engine_with_resources) as counter_all:
+        response = client_test_resource.post(
+            "/test_resources/v0/batch_get", json={"identifiers": [1, 2, 3, 4, 5]}
+        )
+    assert len(response.json()["resources"]) == 5
+    assert counter_all.count == counter_single.count
+
+
+def test_batch_get_with_fields(client_test_resource: TestClient, engine_with_resources: Engine):
+    response = client_test_resource.post(
+        "/test_resources/v0/batch_get?fields=title", json={"identifiers": [2]}
+    )
+    assert response.status_code == 200, response.json()
+    assert response.json()["resources"] == [{"identifier": 2, "title": "title 1"}]
+
+
+def test_batch_get_too_many(client_test_resource: TestClient, engine_with_resources: Engine):
+    identifiers = list(range(MAX_LIMIT + 1))
+    response = client_test_resource.post(
+        "/test_resources/v0/batch_get", json={"identifiers": identifiers}
+    )
+    assert response.status_code == 400, response.json()
+    assert response.json()["detail"].startswith(f"Too many identifiers ({MAX_LIMIT + 1}).")
@@ -0,0 +1,85 @@
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy.engine import Engine
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from cache import response_cache
+from tests.routers.generic.test_router_eager_loading import QueryCounter
+
+
+@pytest.mark.parametrize(
+    "url",
+    ["/test_resources/v0/1", "/test_resources/v0", "/platforms/example/test_resources/v0/1"],
+)
+def test_second_get_from_cache(
+    client_test_resource: TestClient, engine_test_resource_filled: Engine, url: str
+):
+    response = client_test_resource.get(url)
+    assert response.status_code == 200, response.json()
+    with QueryCounter(engine_test_resource_filled) as counter:
+        cached = client_test_resource.get(url)
+    assert counter.count == 0
+    assert cached.status_code == 200
+    assert cached.content == response.content
+    assert cached.headers["etag"] == response.headers["etag"]
+    assert response_cache.statistics()["hits"] == 1
+    assert response_cache.statistics()["misses"] == 1
+
+
+def test_query_parameters_in_key(
+    client_test_resource: TestClient, engine_test_resource_filled: Engine
+):
+    client_test_resource.get("/test_resources/v0/1?fields=title")
+    response = client_test_resource.get("/test_resources/v0/1")
+    assert "platform" in response.json()
+    client_test_resource.get("/test_resources/v0?limit=1&offset=0")
+    client_test_resource.get("/test_resources/v0?offset=0&limit=1")
+    assert response_cache.statistics()["hits"] == 1
+
+
+def test_conditional_get_on_cached_response(
+    client_test_resource: TestClient, engine_test_resource_filled: Engine
+):
+    etag = client_test_resource.get("/test_resources/v0/1").headers["etag"]
+    response = client_test_resource.get("/test_resources/v0/1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response_cache.statistics()["hits"] == 1
+
+
+def test_invalidated_on_write(
+    client_test_resource: TestClient,
+    engine_test_resource_filled: Engine,
+    mocked_privileged_token: Mock,
+):
+    keycloak_openid.userinfo = mocked_privileged_token
+    headers = {"Authorization": "Fake token"}
+    assert len(client_test_resource.get("/test_resources/v0").json()) == 1
+
+    body = {
+        "title": "Another title",
+        "platform": "example",
+        "platform_identifier": "2",
+        "aiod_entry": {"status": "draft"},
+    }
+    response = client_test_resource.post("/test_resources/v0", json=body, headers=headers)
+    assert response.status_code == 200, response.json()
+    assert len(client_test_resource.get("/test_resources/v0").json()) == 2
+
+    body["title"] = "Changed title"
+    response = client_test_resource.put("/test_resources/v0/2", json=body, headers=headers)
+    assert response.status_code == 200, response.json()
+    assert client_test_resource.get("/test_resources/v0/2").json()["title"] == "Changed title"
+
+    response = client_test_resource.delete("/test_resources/v0/2", headers=headers)
+    assert response.status_code == 200, response.json()
+    assert len(client_test_resource.get("/test_resources/v0").json()) == 1
+    assert client_test_resource.get("/test_resources/v0/2").status_code == 404
+    assert response_cache.statistics()["hits"] == 0
+
+
+def test_statistics_endpoint(client: TestClient, engine: Engine):
+    response = client.get("/cache/v1/statistics")
+    assert response.status_code == 200, response.json()
+    assert response.json() == {"enabled": True, "backend": "InMemoryCache", "hits": 0, "misses": 0}
@@ -0,0 +1,88 @@
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy.engine import Engine
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/test_resources/v0/1",
+        "/test_resources/v0",
+        "/platforms/example/test_resources/v0/1",
+        "/platforms/example/test_resources/v0",
+    ],
+)
+def test_if_none_match(
+    client_test_resource: TestClient, engine_test_resource_filled: Engine, url: str
+):
+    response = client_test_resource.get(url)
+    assert response.status_code == 200, response.json()
+    etag = response.headers["etag"]
+    assert "last-modified" in response.headers
+
+    response = client_test_resource.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    response = client_test_resource.get(url, headers={"If-None-Match": '"other", ' + etag})
+    assert response.status_code == 304
+
+    response = client_test_resource.get(url, headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
+
+
+def test_if_modified_since(client_test_resource: TestClient, engine_test_resource_filled: Engine):
+    response = client_test_resource.get("/test_resources/v0/1")
+    last_modified = response.headers["last-modified"]
+
+    response = client_test_resource.get(
+        "/test_resources/v0/1", headers={"If-Modified-Since": last_modified}
+    )
+    assert response.status_code == 304
+
+    response = client_test_resource.get(
+        "/test_resources/v0/1", headers={"If-Modified-Since": "Thu, 21 Apr 2022 00:00:00 GMT"}
+    )
+    assert response.status_code == 200
+    assert response.json()["title"] == "A title"
+
+
+def test_etag_depends_on_representation(
+    client_test_resource: TestClient, engine_test_resource_filled: Engine
+):
+    etag = client_test_resource.get("/test_resources/v0/1").headers["etag"]
+    etag_fields = client_test_resource.get("/test_resources/v0/1?fields=title").headers["etag"]
+    assert etag != etag_fields
+
+
+def test_etag_changes_after_update(
+    client_test_resource: TestClient,
+    engine_test_resource_filled: Engine,
+    mocked_privileged_token: Mock,
+):
+    keycloak_openid.userinfo = mocked_privileged_token
+    etag = client_test_resource.get("/test_resources/v0/1").headers["etag"]
+    etag_list = client_test_resource.get("/test_resources/v0").headers["etag"]
+
+    response = client_test_resource.put(
+        "/test_resources/v0/1",
+        json={"title": "new title", "platform": "example", "platform_identifier": "1"},
+        headers={"Authorization": "Fake token"},
+    )
+    assert response.status_code == 200, response.json()
+
+    response = client_test_resource.get("/test_resources/v0/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["title"] == "new title"
+    response = client_test_resource.get("/test_resources/v0", headers={"If-None-Match": etag_list})
+    assert response.status_code == 200
+
+
+def test_not_found_with_etag(client_test_resource: TestClient, engine_test_resource_filled: Engine):
+    response = client_test_resource.get("/test_resources/v0/99", headers={"If-None-Match": "*"})
+    assert response.status_code == 404, response.json()
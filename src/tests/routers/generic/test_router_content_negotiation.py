@@ -0,0 +1,110 @@
+import io
+
+import pytest
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+from starlette.testclient import TestClient
+
+from database.model.concept.status import Status
+from routers.content_negotiation import negotiate
+from tests.testutils.test_resource import test_resource_factory
+
+msgpack = pytest.importorskip("msgpack")
+cbor2 = pytest.importorskip("cbor2")
+
+
+@pytest.fixture
+def engine_with_resources(engine_test_resource: Engine) -> Engine:
+    with Session(engine_test_resource) as session:
+        draft = Status(name="draft")
+        session.add_all(
+            [
+                test_resource_factory(title=f"title {i}", status=draft, platform_identifier=str(i))
+                for i in range(3)
+            ]
+        )
+        session.commit()
+    return engine_test_resource
+
+
+@pytest.mark.parametrize(
+    "accept,media_type",
+    [
+        (None, "application/json"),
+        ("text/html,application/xhtml+xml,*/*;q=0.8", "application/json"),
+        ("application/cbor;q=0.5, application/msgpack", "application/msgpack"),
+        ("application/x-msgpack", "application/msgpack"),
+        ("application/msgpack;q=0, application/cbor", "application/cbor"),
+        ("text/csv", "application/json"),
+    ],
+)
+def test_negotiate(accept: str | None, media_type: str):
+    assert negotiate(accept).media_type == media_type
+
+
+@pytest.mark.parametrize(
+    "url",
+    ["/test_resources/v0", "/test_resources/v0/1", "/platforms/example/test_resources/v0/2"],
+)
+@pytest.mark.parametrize(
+    "media_type,decode",
+    [("application/msgpack", msgpack.unpackb), ("application/cbor", cbor2.loads)],
+)
+def test_binary_equals_json(
+    client_test_resource: TestClient, engine_with_resources: Engine, url: str, media_type, decode
+):
+    response_json = client_test_resource.get(url)
+    assert response_json.headers["content-type"] == "application/json"
+    response = client_test_resource.get(url, headers={"Accept": media_type})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == media_type
+    assert response.headers["vary"] == "Accept"
+    assert decode(response.content) == response_json.json()
+    assert response.headers["etag"] != response_json.headers["etag"]
+
+
+def test_batch_get_msgpack(client_test_resource: TestClient, engine_with_resources: Engine):
+    response = client_test_resource.post(
+        "/test_resources/v0/batch_get",
+        json={"identifiers": [2, 1]},
+        headers={"Accept": "application/msgpack"},
+    )
+    assert response.status_code == 200
+    content = msgpack.unpackb(response.content)
+    assert [r["identifier"] for r in content["resources"]] == [2, 1]
+
+
+def test_cached_per_media_type(client_test_resource: TestClient, engine_with_resources: Engine):
+    for _ in range(2):
+        response_json = client_test_resource.get("/test_resources/v0/1")
+        response_cbor = client_test_resource.get(
+            "/test_resources/v0/1", headers={"Accept": "application/cbor"}
+        )
+        assert response_json.headers["content-type"] == "application/json"
+        assert response_cbor.headers["content-type"] == "application/cbor"
+        assert cbor2.loads(response_cbor.content) == response_json.json()
+
+
+def test_export_msgpack(client_test_resource: TestClient, engine_with_resources: Engine):
+    response = client_test_resource.get(
+        "/test_resources/v0/export", headers={"Accept": "application/msgpack"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/msgpack"
+    unpacker = msgpack.Unpacker()
+    unpacker.feed(response.content)
+    assert [resource["title"] for resource in unpacker] == ["title 0", "title 1", "title 2"]
+
+
+def test_export_cbor_sequence(client_test_resource: TestClient, engine_with_resources: Engine):
+    response = client_test_resource.get(
+        "/test_resources/v0/export", headers={"Accept": "application/cbor"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/cbor-seq"
+    titles = []
+    content = response.content
+    stream = io.BytesIO(content)
+    while stream.tell() < len(content):
+        titles.append(cbor2.load(stream)["title"])
+    assert titles == ["title 0", "title 1", "title 2"]
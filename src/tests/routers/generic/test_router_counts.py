@@ -0,0 +1,146 @@
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from database import resource_counts
+from database.model.agent.person import Person
+from database.model.concept.status import Status
+from database.resource_counts import ResourceCount
+from tests.testutils.test_resource import RouterTestResource, test_resource_factory
+
+
+def _count(client: TestClient, query: str = "") -> int:
+    response = client.get(f"/counts/test_resources/v1{query}")
+    assert response.status_code == 200, response.json()
+    return response.json()
+
+
+def test_counts_maintained_on_write(
+    client_test_resource: TestClient,
+    engine_test_resource_filled: Engine,
+    mocked_privileged_token: Mock,
+):
+    keycloak_openid.userinfo = mocked_privileged_token
+    headers = {"Authorization": "Fake token"}
+    assert _count(client_test_resource) == 1  # Initialized from the table
+
+    for i, (platform, status) in enumerate(
+        [("example", "published"), ("openml", "draft"), (None, "draft")]
+    ):
+        body = {
+            "title": f"title {i}",
+            "platform": platform,
+            "platform_identifier": str(i + 10) if platform is not None else None,
+            "aiod_entry": {"status": status},
+        }
+        response = client_test_resource.post("/test_resources/v0", json=body, headers=headers)
+        assert response.status_code == 200, response.json()
+
+    assert _count(client_test_resource) == 4
+    assert _count(client_test_resource, "?platform=example") == 2
+    assert _count(client_test_resource, "?status=draft") == 3
+    assert _count(client_test_resource, "?platform=example&status=draft") == 1
+    assert _count(client_test_resource, "?platform=zenodo") == 0
+
+    body = {
+        "title": "title 1",
+        "platform": "openml",
+        "platform_identifier": "11",
+        "aiod_entry": {"status": "published"},
+    }
+    response = client_test_resource.put("/test_resources/v0/3", json=body, headers=headers)
+    assert response.status_code == 200, response.json()
+    assert _count(client_test_resource, "?status=draft") == 2
+    assert _count(client_test_resource, "?status=published") == 2
+
+    response = client_test_resource.delete("/test_resources/v0/2", headers=headers)
+    assert response.status_code == 200, response.json()
+    assert _count(client_test_resource) == 3
+    assert _count(client_test_resource, "?status=published") == 1
+
+
+def test_counts_of_all_types(
+    client: TestClient,
+    engine: Engine,
+    mocked_privileged_token: Mock,
+    body_asset: dict,
+    person: Person,
+):
+    keycloak_openid.userinfo = mocked_privileged_token
+    with Session(engine) as session:
+        session.add(person)
+        session.commit()
+    response = client.post("/datasets/v1", json=body_asset, headers={"Authorization": "Fake"})
+    assert response.status_code == 200, response.json()
+
+    response = client.get("/counts/v1")
+    assert response.status_code == 200, response.json()
+    counts = response.json()
+    assert counts["datasets"] == 1
+    assert counts["persons"] == 1
+    assert counts["publications"] == 0
+
+    counts = client.get("/counts/v1?platform=example&status=published").json()
+    assert counts["datasets"] == 0
+
+
+def test_counts_read_only(
+    client_test_resource: TestClient, engine_test_resource: Engine, draft: Status
+):
+    with Session(engine_test_resource) as session:
+        session.add(test_resource_factory(title="first", status=draft, platform_identifier="1"))
+        session.commit()
+    assert _count(client_test_resource) == 1  # Counted from the table
+    assert _count(client_test_resource, "?status=draft") == 1
+    assert _count(client_test_resource, "?platform=openml") == 0
+    with Session(engine_test_resource) as session:
+        assert session.scalars(select(ResourceCount)).all() == []
+
+
+def test_counts_initialized_once(
+    client_test_resource: TestClient, engine_test_resource: Engine, draft: Status
+):
+    with Session(engine_test_resource) as session:
+        session.add(test_resource_factory(title="first", status=draft, platform_identifier="1"))
+        RouterTestResource().initialize_counts(session)
+        session.commit()
+    assert _count(client_test_resource) == 1
+    with Session(engine_test_resource) as session:
+        # Bypassing the router: the counters are not updated
+        session.add(test_resource_factory(title="second", status=draft, platform_identifier="2"))
+        session.commit()
+    assert _count(client_test_resource) == 1
+
+
+def test_counts_initialized_without_resources(
+    client_test_resource: TestClient, engine_test_resource: Engine
+):
+    with Session(engine_test_resource) as session:
+        RouterTestResource().initialize_counts(session)
+        session.commit()
+        (counter,) = session.scalars(select(ResourceCount)).all()
+        assert (counter.resource_type, counter.total) == ("test_resource", 0)
+    assert _count(client_test_resource) == 0
+    assert _count(client_test_resource, "?platform=example") == 0
+
+
+def test_counts_on_other_databases(
+    client_test_resource: TestClient,
+    engine_test_resource: Engine,
+    mocked_privileged_token: Mock,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(resource_counts, "_DIALECTS", ())
+    keycloak_openid.userinfo = mocked_privileged_token
+    body = {"title": "title", "platform": "example", "platform_identifier": "1"}
+    response = client_test_resource.post(
+        "/test_resources/v0", json=body, headers={"Authorization": "Fake token"}
+    )
+    assert response.status_code == 200, response.json()
+    assert _count(client_test_resource) == 1  # Counted from the table
+    with Session(engine_test_resource) as session:
+        assert session.scalars(select(ResourceCount)).all() == []
@@ -28,6 +28,7 @@ class DeprecatedRouter(RouterTestResource):
         ("get", "/test_resources/v1/"),
         # ("get", "/platforms/example/test_resources/v1"),
         ("get", "/test_resources/v1/1"),
+        ("get", "/test_resources/v1/export"),
         # ("get", "/platforms/example/test_resources/v1/1"),
         ("post", "/test_resources/v1/"),
         ("put", "/test_resources/v1/1"),
@@ -0,0 +1,140 @@
+import datetime
+from unittest.mock import Mock
+
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select, update
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from cache import response_cache
+from database.document_store import ResourceDocument
+from database.model.concept.aiod_entry import AIoDEntryORM
+from database.model.dataset.dataset import Dataset
+
+
+def _documents(engine: Engine) -> list[ResourceDocument]:
+    with Session(engine) as session:
+        query = select(ResourceDocument).order_by(
+            ResourceDocument.resource_type, ResourceDocument.identifier
+        )
+        return session.scalars(query).all()
+
+
+def test_document_rendered_on_read(
+    client_test_resource: TestClient, engine_test_resource_filled: Engine
+):
+    assert _documents(engine_test_resource_filled) == []
+    response = client_test_resource.get("/test_resources/v0/1")
+    assert response.status_code == 200, response.json()
+
+    (document,) = _documents(engine_test_resource_filled)
+    assert (document.resource_type, document.identifier, document.schema_name) == (
+        "test_resource",
+        1,
+        "aiod",
+    )
+    assert document.content == response.content
+    assert document.date_modified is not None
+
+
+def test_served_from_document(
+    client_test_resource: TestClient, engine_test_resource_filled: Engine
+):
+    client_test_resource.get("/test_resources/v0/1")
+    with Session(engine_test_resource_filled) as session:
+        document = session.scalars(select(ResourceDocument)).one()
+        document.content = document.content.replace(b"A title", b"From the store")
+        session.commit()
+    response_cache.clear()
+
+    assert client_test_resource.get("/test_resources/v0/1").json()["title"] == "From the store"
+    (resource,) = client_test_resource.get("/test_resources/v0").json()
+    assert resource["title"] == "From the store"
+
+
+def test_outdated_document_rendered_again(
+    client_test_resource: TestClient, engine_test_resource_filled: Engine
+):
+    client_test_resource.get("/test_resources/v0")
+    with Session(engine_test_resource_filled) as session:
+        document = session.scalars(select(ResourceDocument)).one()
+        document.content = document.content.replace(b"A title", b"Outdated")
+        session.execute(update(AIoDEntryORM).values(date_modified=datetime.datetime(2030, 1, 1)))
+        session.commit()
+    response_cache.clear()
+
+    (resource,) = client_test_resource.get("/test_resources/v0").json()
+    assert resource["title"] == "A title"
+    (document,) = _documents(engine_test_resource_filled)
+    assert document.date_modified == datetime.datetime(2030, 1, 1)
+
+
+def test_invalidated_on_write(
+    client_test_resource: TestClient, engine_test_resource: Engine, mocked_privileged_token: Mock
+):
+    keycloak_openid.userinfo = mocked_privileged_token
+    headers = {"Authorization": "Fake token"}
+    body = {
+        "title": "first",
+        "platform": "example",
+        "platform_identifier": "1",
+        "aiod_entry": {"status": "draft"},
+    }
+    response = client_test_resource.post("/test_resources/v0", json=body, headers=headers)
+    assert response.status_code == 200, response.json()
+    assert _documents(engine_test_resource) == []
+    response = client_test_resource.get("/test_resources/v0/1")
+    (document,) = _documents(engine_test_resource)
+    assert document.content == response.content
+
+    body["title"] = "second"
+    response = client_test_resource.put("/test_resources/v0/1", json=body, headers=headers)
+    assert response.status_code == 200, response.json()
+    assert _documents(engine_test_resource) == []
+    assert client_test_resource.get("/test_resources/v0/1").json()["title"] == "second"
+    (document,) = _documents(engine_test_resource)
+    assert b'"second"' in document.content
+
+    response = client_test_resource.delete("/test_resources/v0/1", headers=headers)
+    assert response.status_code == 200, response.json()
+    assert _documents(engine_test_resource) == []
+
+
+def test_only_aiod_documents_stored(client: TestClient, engine: Engine, dataset: Dataset):
+    with Session(engine) as session:
+        session.add(dataset)
+        session.commit()
+    response = client.get("/datasets/v1/1?schema=schema.org")
+    assert response.status_code == 200, response.json()
+    assert response.json()["@type"] == "Dataset"
+    client.get("/datasets/v1")
+
+    documents = _documents(engine)
+    assert [document.schema_name for document in documents] == ["aiod"]
+
+
+def test_converted_schema_follows_related_resources(
+    client: TestClient, mocked_privileged_token: Mock, body_asset: dict, body_agent: dict
+):
+    keycloak_openid.userinfo = mocked_privileged_token
+    headers = {"Authorization": "Fake token"}
+    person = body_agent | {"name": "First Name"}
+    response = client.post("/persons/v1", json=person, headers=headers)
+    assert response.status_code == 200, response.json()
+    response = client.post("/datasets/v1", json=body_asset | {"creator": [1]}, headers=headers)
+    assert response.status_code == 200, response.json()
+
+    response = client.get("/datasets/v1/1?schema=schema.org")
+    assert response.json()["creator"]["name"] == "First Name"
+    etag = response.headers["etag"]
+    assert "last-modified" not in response.headers
+    response = client.get("/datasets/v1/1?schema=schema.org", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = client.put("/persons/v1/1", json=person | {"name": "Renamed"}, headers=headers)
+    assert response.status_code == 200, response.json()
+    response = client.get("/datasets/v1/1?schema=schema.org", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["creator"]["name"] == "Renamed"
+    response = client.get("/datasets/v1?schema=schema.org")
+    assert response.json()[0]["creator"]["name"] == "Renamed"
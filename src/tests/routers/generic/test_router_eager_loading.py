@@ -0,0 +1,91 @@
+import copy
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from database.model.agent.person import Person
+
+
+class QueryCounter:
+    """Count the number of SQL statements executed on an engine"""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.count = 0
+
+    def _callback(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._callback)
+        return self
+
+    def __exit__(self, *args):
+        event.remove(self.engine, "before_cursor_execute", self._callback)
+
+
+def _post_datasets(client: TestClient, body_asset: dict, platform_identifiers: range):
+    for i in platform_identifiers:
+        body = copy.deepcopy(body_asset)
+        body["platform_identifier"] = str(i)
+        body["creator"] = [1]
+        body["spatial_coverage"] = {"geo": {"latitude": 37.42242, "longitude": -122.08585}}
+        response = client.post("/datasets/v1", json=body, headers={"Authorization": "Fake token"})
+        assert response.status_code == 200, response.json()
+
+
+@pytest.mark.parametrize("url", ["/datasets/v1", "/platforms/example/datasets/v1"])
+def test_number_of_queries_independent_of_page_size(
+    client: TestClient,
+    engine: Engine,
+    mocked_privileged_token: Mock,
+    body_asset: dict,
+    person: Person,
+    url: str,
+):
+    keycloak_openid.userinfo = mocked_privileged_token
+    with Session(engine) as session:
+        session.add(person)
+        session.commit()
+
+    _post_datasets(client, body_asset, range(0, 2))
+    with QueryCounter(engine) as counter_small:
+        response = client.get(url)
+    assert response.status_code == 200, response.json()
+    assert len(response.json()) == 2
+
+    _post_datasets(client, body_asset, range(2, 8))
+    with QueryCounter(engine) as counter_large:
+        response = client.get(url)
+    assert response.status_code == 200, response.json()
+    response_json = response.json()
+    assert len(response_json) == 8
+    assert response_json[0]["creator"] == [1]
+    assert response_json[0]["aiod_entry"]["status"] == "draft"
+    assert response_json[0]["spatial_coverage"]["geo"]["latitude"] == 37.42242
+    assert counter_large.count == counter_small.count
+
+
+def test_get_single_resource_eagerly(
+    client: TestClient,
+    engine: Engine,
+    mocked_privileged_token: Mock,
+    body_asset: dict,
+    person: Person,
+):
+    keycloak_openid.userinfo = mocked_privileged_token
+    with Session(engine) as session:
+        session.add(person)
+        session.commit()
+    _post_datasets(client, body_asset, range(0, 1))
+
+    with QueryCounter(engine) as counter:
+        response = client.get("/datasets/v1/1")
+    assert response.status_code == 200, response.json()
+    assert sorted(response.json()["keyword"]) == ["tag1", "tag2"]
+    assert counter.count < 30
@@ -0,0 +1,80 @@
+import copy
+import json
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from database.model.concept.status import Status
+from routers import resource_router
+from tests.testutils.test_resource import test_resource_factory
+
+
+@pytest.fixture
+def engine_with_resources(engine_test_resource: Engine) -> Engine:
+    with Session(engine_test_resource) as session:
+        draft = Status(name="draft")
+        session.add_all(
+            [
+                test_resource_factory(
+                    title=f"title {i}",
+                    status=draft,
+                    platform="example" if i % 2 else "openml",
+                    platform_identifier=str(i),
+                )
+                for i in range(5)
+            ]
+        )
+        session.commit()
+    return engine_test_resource
+
+
+def _parse_ndjson(content: bytes) -> list[dict]:
+    return [json.loads(line) for line in content.decode("utf-8").splitlines()]
+
+
+def test_export_happy_path(
+    client_test_resource: TestClient, engine_with_resources: Engine, monkeypatch
+):
+    monkeypatch.setattr(resource_router, "EXPORT_BATCH_SIZE", 2)
+    response = client_test_resource.get("/test_resources/v0/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    resources = _parse_ndjson(response.content)
+    assert [r["identifier"] for r in resources] == [1, 2, 3, 4, 5]
+    assert resources[0]["title"] == "title 0"
+    assert resources[0]["aiod_entry"]["status"] == "draft"
+
+
+def test_export_platform(client_test_resource: TestClient, engine_with_resources: Engine):
+    response = client_test_resource.get("/platforms/example/test_resources/v0/export")
+    assert response.status_code == 200
+    resources = _parse_ndjson(response.content)
+    assert [r["platform_identifier"] for r in resources] == ["1", "3"]
+
+
+def test_export_empty(client_test_resource: TestClient, engine_test_resource: Engine):
+    response = client_test_resource.get("/test_resources/v0/export")
+    assert response.status_code == 200
+    assert response.content == b""
+
+
+def test_export_schema(
+    client: TestClient, mocked_privileged_token: Mock, body_asset: dict, engine: Engine
+):
+    keycloak_openid.userinfo = mocked_privileged_token
+    for i in range(2):
+        body = copy.deepcopy(body_asset)
+        body["platform_identifier"] = str(i)
+        response = client.post("/datasets/v1", json=body, headers={"Authorization": "Fake token"})
+        assert response.status_code == 200, response.json()
+
+    response = client.get("/datasets/v1/export?schema=dcat-ap")
+    assert response.status_code == 200
+    resources = _parse_ndjson(response.content)
+    assert len(resources) == 2
+    assert all("@graph" in r for r in resources)
+    assert resources == [client.get(f"/datasets/v1/{i}?schema=dcat-ap").json() for i in (1, 2)]
@@ -0,0 +1,73 @@
+import copy
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+
+
+@pytest.fixture
+def client_with_dataset(
+    client: TestClient, mocked_privileged_token: Mock, body_asset: dict
+) -> TestClient:
+    keycloak_openid.userinfo = mocked_privileged_token
+    body = copy.deepcopy(body_asset)
+    response = client.post("/datasets/v1", json=body, headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+    return client
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/datasets/v1?fields=name,keyword,aiod_entry",
+        "/platforms/example/datasets/v1?fields=name,keyword,aiod_entry",
+    ],
+)
+def test_get_all_with_fields(client_with_dataset: TestClient, engine: Engine, url: str):
+    statements = []
+
+    def log_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", log_statement)
+    try:
+        response = client_with_dataset.get(url)
+    finally:
+        event.remove(engine, "before_cursor_execute", log_statement)
+    assert response.status_code == 200, response.json()
+    (resource,) = response.json()
+    assert set(resource.keys()) == {"identifier", "name", "keyword", "aiod_entry"}
+    assert sorted(resource["keyword"]) == ["tag1", "tag2"]
+    assert resource["aiod_entry"]["status"] == "draft"
+
+    assert not any("dataset.description" in statement for statement in statements)
+    assert not any("alternate_name" in statement for statement in statements)
+
+
+@pytest.mark.parametrize(
+    "url", ["/datasets/v1/1?fields=name,platform", "/platforms/example/datasets/v1/1?fields=name"]
+)
+def test_get_with_fields(client_with_dataset: TestClient, url: str):
+    response = client_with_dataset.get(url)
+    assert response.status_code == 200, response.json()
+    resource = response.json()
+    assert resource["identifier"] == 1
+    assert resource["name"] == "The name"
+    assert "description" not in resource
+    assert "keyword" not in resource
+
+
+def test_unknown_field(client_with_dataset: TestClient):
+    response = client_with_dataset.get("/datasets/v1?fields=name,unknown")
+    assert response.status_code == 400, response.json()
+    assert response.json()["detail"].startswith("Unknown field(s) unknown.")
+
+
+def test_fields_with_other_schema(client_with_dataset: TestClient):
+    response = client_with_dataset.get("/datasets/v1/1?fields=name&schema=schema.org")
+    assert response.status_code == 400, response.json()
+    assert response.json()["detail"] == "Selecting fields is only supported for the aiod schema."
@@ -0,0 +1,82 @@
+import copy
+from unittest.mock import Mock
+
+import pytest
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+
+
+@pytest.fixture
+def client_with_datasets(
+    client: TestClient, mocked_privileged_token: Mock, body_asset: dict
+) -> TestClient:
+    """Four datasets, differing in status, date_published, keyword, license and application_area"""
+    keycloak_openid.userinfo = mocked_privileged_token
+    variations = [
+        ("draft", "2022-01-01T15:15:00", ["tag1"], "license_a", ["Voice Assistance"]),
+        ("published", "2022-06-01T00:00:00", ["tag1", "tag2"], "license_b", []),
+        ("published", "2023-01-01T00:00:00", ["tag2"], "license_a", ["Voice Assistance"]),
+        ("draft", None, [], None, []),
+    ]
+    for i, (status, date_published, keyword, license_, application_area) in enumerate(variations):
+        body = copy.deepcopy(body_asset)
+        body["platform_identifier"] = str(i)
+        body["aiod_entry"]["status"] = status
+        body["date_published"] = date_published
+        body["keyword"] = keyword
+        body["license"] = license_
+        body["application_area"] = application_area
+        response = client.post("/datasets/v1", json=body, headers={"Authorization": "Fake token"})
+        assert response.status_code == 200, response.json()
+    return client
+
+
+def _identifiers(client: TestClient, url: str) -> list[int]:
+    response = client.get(url)
+    assert response.status_code == 200, response.json()
+    return [resource["identifier"] for resource in response.json()]
+
+
+@pytest.mark.parametrize(
+    "query,expected",
+    [
+        ("status=published", [2, 3]),
+        ("keyword=tag1", [1, 2]),
+        ("keyword=unknown", []),
+        ("license=license_a", [1, 3]),
+        ("application_area=Voice Assistance", [1, 3]),
+        ("date_published_from=2022-06-01", [2, 3]),
+        ("date_published_before=2022-06-01T00:00:00", [1]),
+        ("date_published_from=2022-01-02&date_published_before=2023-01-01", [2]),
+        ("status=draft&keyword=tag1&license=license_a", [1]),
+        ("modified_since=2000-01-01", [1, 2, 3, 4]),
+        ("modified_since=2999-01-01", []),
+    ],
+)
+def test_filters(client_with_datasets: TestClient, query: str, expected: list[int]):
+    assert _identifiers(client_with_datasets, f"/datasets/v1?{query}") == expected
+    platform_url = f"/platforms/example/datasets/v1?{query}"
+    assert _identifiers(client_with_datasets, platform_url) == expected
+
+
+def test_filters_with_pagination(client_with_datasets: TestClient):
+    response = client_with_datasets.get("/datasets/v1?keyword=tag2&limit=1")
+    assert [resource["identifier"] for resource in response.json()] == [2]
+    next_url = response.links["next"]["url"]
+    assert "keyword=tag2" in next_url
+    assert _identifiers(client_with_datasets, next_url) == [3]
+
+
+def test_filters_with_other_schema(client_with_datasets: TestClient):
+    response = client_with_datasets.get("/datasets/v1?schema=schema.org&license=license_b")
+    assert response.status_code == 200, response.json()
+    (resource,) = response.json()
+    assert resource["identifier"] == "2"
+    assert resource["license"] == "license_b"
+
+
+def test_filter_not_available(client: TestClient):
+    response = client.get("/persons/v1?license=license_a")
+    assert response.status_code == 400, response.json()
+    assert response.json()["detail"] == "The persons cannot be filtered on license."
@@ -0,0 +1,109 @@
+import datetime
+
+import pytest
+from sqlalchemy.future import Engine
+from sqlmodel import Session
+from starlette.testclient import TestClient
+
+from database.model.concept.aiod_entry import AIoDEntryORM
+from database.model.concept.status import Status
+from routers.resource_router import MAX_LIMIT
+from tests.testutils.test_resource import TestResource
+
+
+@pytest.fixture
+def engine_with_five_resources(engine_test_resource: Engine) -> Engine:
+    """Five resources, of which the date_modified is in reversed order of the identifier"""
+    with Session(engine_test_resource) as session:
+        draft = Status(name="draft")
+        session.add_all(
+            [
+                TestResource(
+                    title=f"title {i}",
+                    platform="example",
+                    platform_identifier=str(i),
+                    aiod_entry=AIoDEntryORM(
+                        status=draft, date_modified=datetime.datetime(2023, 1, 10 - i)
+                    ),
+                )
+                for i in range(5)
+            ]
+        )
+        session.commit()
+    return engine_test_resource
+
+
+def _follow_links(client: TestClient, url: str) -> list[list[int]]:
+    pages = []
+    while url is not None:
+        response = client.get(url)
+        assert response.status_code == 200, response.json()
+        pages.append([resource["identifier"] for resource in response.json()])
+        link = response.links.get("next")
+        url = link["url"] if link is not None else None
+    return pages
+
+
+@pytest.mark.parametrize(
+    "url", ["/test_resources/v0?limit=2", "/platforms/example/test_resources/v0?limit=2"]
+)
+def test_keyset_pagination(
+    client_test_resource: TestClient, engine_with_five_resources: Engine, url: str
+):
+    pages = _follow_links(client_test_resource, url)
+    assert pages == [[1, 2], [3, 4], [5]]
+
+
+def test_keyset_pagination_sorted_on_date_modified(
+    client_test_resource: TestClient, engine_with_five_resources: Engine
+):
+    pages = _follow_links(client_test_resource, "/test_resources/v0?limit=2&sort=date_modified")
+    assert pages == [[5, 4], [3, 2], [1]]
+
+
+def test_offset_pagination_is_ordered(
+    client_test_resource: TestClient, engine_with_five_resources: Engine
+):
+    response = client_test_resource.get("/test_resources/v0?offset=3&limit=2")
+    assert response.status_code == 200, response.json()
+    assert [resource["identifier"] for resource in response.json()] == [4, 5]
+    assert "next" in response.links
+    assert "offset" not in response.links["next"]["url"]
+
+
+def test_last_page_without_link(
+    client_test_resource: TestClient, engine_with_five_resources: Engine
+):
+    response = client_test_resource.get("/test_resources/v0?limit=10")
+    assert response.status_code == 200, response.json()
+    assert len(response.json()) == 5
+    assert "link" not in response.headers
+
+
+@pytest.mark.parametrize(
+    "query,detail",
+    [
+        (
+            f"limit={MAX_LIMIT + 1}",
+            f"Invalid limit {MAX_LIMIT + 1}. The limit should be between 0 and {MAX_LIMIT}.",
+        ),
+        ("offset=-1", "Invalid offset -1. The offset should not be negative."),
+        ("next=abc&offset=2", "Use either an offset or a cursor (next), not both."),
+    ],
+)
+def test_invalid_pagination(
+    client_test_resource: TestClient, engine_with_five_resources: Engine, query: str, detail: str
+):
+    response = client_test_resource.get(f"/test_resources/v0?{query}")
+    assert response.status_code == 400, response.json()
+    assert response.json()["detail"] == detail
+
+
+def test_cursor_of_other_sort_order(
+    client_test_resource: TestClient, engine_with_five_resources: Engine
+):
+    response = client_test_resource.get("/test_resources/v0?limit=2")
+    cursor = response.links["next"]["url"].split("next=")[-1]
+    response = client_test_resource.get(f"/test_resources/v0?sort=date_modified&next={cursor}")
+    assert response.status_code == 400, response.json()
+    assert response.json()["detail"].startswith("Invalid cursor (next)")
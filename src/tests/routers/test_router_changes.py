@@ -0,0 +1,93 @@
+import copy
+import datetime
+from unittest.mock import Mock
+
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from database.change_log import Change
+
+
+def _changes(client: TestClient, query: str = "") -> tuple[list[tuple], int]:
+    response = client.get(f"/changes/v1?{query}")
+    assert response.status_code == 200, response.json()
+    content = response.json()
+    changes = [
+        (change["type"], change["identifier"], change["operation"], change["platform_identifier"])
+        for change in content["changes"]
+    ]
+    return changes, content["next"]
+
+
+def test_changes(
+    client: TestClient, mocked_privileged_token: Mock, body_asset: dict, body_agent: dict
+):
+    keycloak_openid.userinfo = mocked_privileged_token
+    headers = {"Authorization": "Fake token"}
+    assert _changes(client) == ([], 0)
+
+    for i in (1, 2):
+        body = copy.deepcopy(body_asset)
+        body["platform_identifier"] = str(i)
+        response = client.post("/datasets/v1", json=body, headers=headers)
+        assert response.status_code == 200, response.json()
+    response = client.post("/persons/v1", json=body_agent, headers=headers)
+    assert response.status_code == 200, response.json()
+    body = copy.deepcopy(body_asset)
+    body["name"] = "Updated"
+    body["platform_identifier"] = "1"
+    response = client.put("/datasets/v1/1", json=body, headers=headers)
+    assert response.status_code == 200, response.json()
+    response = client.delete("/datasets/v1/2", headers=headers)
+    assert response.status_code == 200, response.json()
+
+    changes, cursor = _changes(client)
+    assert changes == [
+        ("dataset", 1, "create", "1"),
+        ("dataset", 2, "create", "2"),
+        ("person", 1, "create", body_agent["platform_identifier"]),
+        ("dataset", 1, "update", "1"),
+        ("dataset", 2, "delete", "2"),
+    ]
+    assert _changes(client, f"since={cursor}") == ([], cursor)
+
+    changes, cursor = _changes(client, "limit=2")
+    assert changes == [("dataset", 1, "create", "1"), ("dataset", 2, "create", "2")]
+    changes, _ = _changes(client, f"since={cursor}&type=dataset")
+    assert changes == [("dataset", 1, "update", "1"), ("dataset", 2, "delete", "2")]
+    changes, _ = _changes(client, "type=person&type=news")
+    assert changes == [("person", 1, "create", body_agent["platform_identifier"])]
+
+
+def test_changes_dated_and_numbered(
+    client: TestClient, engine: Engine, mocked_privileged_token: Mock, body_asset: dict
+):
+    keycloak_openid.userinfo = mocked_privileged_token
+    with Session(engine) as session:
+        # Logged before the sequence existed
+        session.add(
+            Change(
+                identifier=10,
+                resource_type="dataset",
+                resource_identifier=99,
+                operation="delete",
+                date_modified=datetime.datetime(2020, 1, 1),
+            )
+        )
+        session.commit()
+    response = client.post("/datasets/v1", json=body_asset, headers={"Authorization": "Fake"})
+    assert response.status_code == 200, response.json()
+
+    response = client.get("/changes/v1?since=10")
+    (change,) = response.json()["changes"]
+    assert response.json()["next"] == 11
+    date_modified = client.get("/datasets/v1/1").json()["aiod_entry"]["date_modified"]
+    assert change["date_modified"] == date_modified
+
+
+def test_changes_invalid(client: TestClient):
+    for query in ("limit=-1", "since=-1", "type=unknown"):
+        response = client.get(f"/changes/v1?{query}")
+        assert response.status_code == 400, response.json()
@@ -0,0 +1,119 @@
+import copy
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from cache import response_cache
+from database.model.agent.person import Person
+from routers.expansion import MAX_EXPAND_DEPTH
+from tests.routers.generic.test_router_eager_loading import QueryCounter
+
+
+@pytest.fixture
+def client_with_datasets(
+    client: TestClient,
+    engine: Engine,
+    mocked_privileged_token: Mock,
+    body_asset: dict,
+    person: Person,
+) -> TestClient:
+    keycloak_openid.userinfo = mocked_privileged_token
+    headers = {"Authorization": "Fake token"}
+    with Session(engine) as session:
+        session.add(person)
+        session.commit()
+
+    body = copy.deepcopy(body_asset)
+    body["creator"] = [1]
+    response = client.post("/publications/v1", json=body, headers=headers)
+    assert response.status_code == 200, response.json()
+
+    for i in range(3):
+        body = copy.deepcopy(body_asset)
+        body["platform_identifier"] = str(i)
+        body["creator"] = [1]
+        body["citation"] = [1]
+        body["funder"] = [1]
+        response = client.post("/datasets/v1", json=body, headers=headers)
+        assert response.status_code == 200, response.json()
+    return client
+
+
+def test_expand(client_with_datasets: TestClient):
+    person = client_with_datasets.get("/persons/v1/1").json()
+    response = client_with_datasets.get("/datasets/v1/1?expand=creator,citation,funder")
+    assert response.status_code == 200, response.json()
+    dataset = response.json()
+    (creator,) = dataset["creator"]
+    assert creator["identifier"] == 1
+    assert creator == person
+    (citation,) = dataset["citation"]
+    assert citation["identifier"] == 1
+    assert citation["creator"] == [1]
+    (funder,) = dataset["funder"]
+    assert funder["type"] == "person"
+    assert funder["resource"]["identifier"] == 1
+    assert dataset["contact"] == []
+    assert "etag" not in response.headers
+
+
+def test_expand_nested(client_with_datasets: TestClient):
+    person = client_with_datasets.get("/persons/v1/1").json()
+    response = client_with_datasets.get("/datasets/v1/1?expand=citation,creator&expand_depth=2")
+    assert response.status_code == 200, response.json()
+    (citation,) = response.json()["citation"]
+    (creator,) = citation["creator"]
+    assert creator == person
+
+
+def test_expand_list_with_constant_number_of_queries(
+    client_with_datasets: TestClient, engine: Engine
+):
+    with QueryCounter(engine) as counter_single:
+        response = client_with_datasets.get("/datasets/v1?limit=1&expand=creator,citation")
+    assert response.status_code == 200, response.json()
+    with QueryCounter(engine) as counter_all:
+        response = client_with_datasets.get("/datasets/v1?expand=creator,citation")
+    assert response.status_code == 200, response.json()
+    assert len(response.json()) == 3
+    assert all(dataset["creator"][0]["identifier"] == 1 for dataset in response.json())
+    assert counter_all.count == counter_single.count
+
+
+def test_expand_batch_get(client_with_datasets: TestClient):
+    response = client_with_datasets.post(
+        "/datasets/v1/batch_get?expand=creator", json={"identifiers": [2, 3]}
+    )
+    assert response.status_code == 200, response.json()
+    resources = response.json()["resources"]
+    assert [r["creator"][0]["identifier"] for r in resources] == [1, 1]
+
+
+def test_expanded_response_not_cached(client_with_datasets: TestClient):
+    client_with_datasets.get("/datasets/v1/1?expand=creator")
+    client_with_datasets.get("/datasets/v1/1?expand=creator")
+    assert response_cache.statistics()["hits"] == 0
+
+
+@pytest.mark.parametrize(
+    "query,detail",
+    [
+        ("expand=unknown", "Cannot expand unknown. Expected a subset of "),
+        (
+            f"expand=creator&expand_depth={MAX_EXPAND_DEPTH + 1}",
+            f"Invalid expand_depth {MAX_EXPAND_DEPTH + 1}.",
+        ),
+        (
+            "expand=creator&schema=schema.org",
+            "Expanding relationships is only supported for the aiod schema.",
+        ),
+    ],
+)
+def test_invalid_expand(client_with_datasets: TestClient, query: str, detail: str):
+    response = client_with_datasets.get(f"/datasets/v1/1?{query}")
+    assert response.status_code == 400, response.json()
+    assert response.json()["detail"].startswith(detail)
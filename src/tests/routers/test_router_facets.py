@@ -0,0 +1,130 @@
+import copy
+import time
+from unittest.mock import Mock
+
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from database.model.dataset.dataset import Dataset
+from search import facet_indexes
+
+
+def _post_dataset(client: TestClient, body_asset: dict, i: int, **fields) -> int:
+    body = copy.deepcopy(body_asset)
+    body["platform_identifier"] = str(i)
+    body.update(fields)
+    response = client.post("/datasets/v1", json=body, headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+    return response.json()["identifier"]
+
+
+def _facets(client: TestClient, query: str = "") -> dict:
+    response = client.get(f"/facets/datasets/v1?{query}")
+    assert response.status_code == 200, response.json()
+    return response.json()
+
+
+def test_facets(client: TestClient, mocked_privileged_token: Mock, body_asset: dict):
+    keycloak_openid.userinfo = mocked_privileged_token
+    _post_dataset(client, body_asset, 1)
+    _post_dataset(client, body_asset, 2, keyword=["tag1", "other"], license="mit")
+    _post_dataset(client, body_asset, 3, keyword=[], aiod_entry={"status": "published"})
+
+    response_json = _facets(client)
+    assert response_json["total"] == 3
+    facets = response_json["facets"]
+    assert facets["keyword"] == [
+        {"name": "tag1", "count": 2},
+        {"name": "other", "count": 1},
+        {"name": "tag2", "count": 1},
+    ]
+    assert facets["license"] == [
+        {"name": "https://creativecommons.org/licenses/by/4.0/", "count": 2},
+        {"name": "mit", "count": 1},
+    ]
+    assert facets["platform"] == [{"name": "example", "count": 3}]
+    assert facets["application_area"] == [{"name": "Voice Assistance", "count": 3}]
+    assert facets["research_area"] == [{"name": "Explainable AI", "count": 3}]
+    assert facets["scientific_domain"] == [{"name": "Voice Recognition", "count": 3}]
+    assert facets["status"] == [
+        {"name": "draft", "count": 2},
+        {"name": "published", "count": 1},
+    ]
+
+
+def test_facets_filtered(client: TestClient, mocked_privileged_token: Mock, body_asset: dict):
+    keycloak_openid.userinfo = mocked_privileged_token
+    _post_dataset(client, body_asset, 1)
+    _post_dataset(client, body_asset, 2, keyword=["other"], license="mit")
+    _post_dataset(client, body_asset, 3, keyword=["tag2"], license="mit")
+
+    response_json = _facets(client, "keyword=tag1&keyword=other&facets=keyword,license")
+    assert response_json == {
+        "total": 2,
+        "facets": {
+            "keyword": [
+                {"name": "other", "count": 1},
+                {"name": "tag1", "count": 1},
+                {"name": "tag2", "count": 1},
+            ],
+            "license": [
+                {"name": "https://creativecommons.org/licenses/by/4.0/", "count": 1},
+                {"name": "mit", "count": 1},
+            ],
+        },
+    }
+    response_json = _facets(client, "keyword=tag2&license=mit&status=draft&facets=keyword&limit=1")
+    assert response_json == {"total": 1, "facets": {"keyword": [{"name": "tag2", "count": 1}]}}
+
+
+def test_facets_updated_on_write(
+    client: TestClient, mocked_privileged_token: Mock, body_asset: dict
+):
+    keycloak_openid.userinfo = mocked_privileged_token
+    headers = {"Authorization": "Fake token"}
+    _post_dataset(client, body_asset, 1)
+    _post_dataset(client, body_asset, 2)
+    assert _facets(client, "facets=keyword")["facets"]["keyword"][0] == {"name": "tag1", "count": 2}
+
+    body = copy.deepcopy(body_asset)
+    body.update({"platform_identifier": "2", "keyword": ["other"]})
+    response = client.put("/datasets/v1/2", json=body, headers=headers)
+    assert response.status_code == 200, response.json()
+    response = client.delete("/datasets/v1/1", headers=headers)
+    assert response.status_code == 200, response.json()
+    _post_dataset(client, body_asset, 3, keyword=["other"])
+
+    assert _facets(client, "facets=keyword") == {
+        "total": 2,
+        "facets": {"keyword": [{"name": "other", "count": 2}]},
+    }
+
+
+def test_facets_built_from_database(client: TestClient, engine: Engine, dataset: Dataset):
+    with Session(engine) as session:
+        session.add(dataset)
+        session.commit()
+    assert _facets(client, "facets=platform")["total"] == 1
+
+    facet_indexes.max_age_seconds, max_age_seconds = -1, facet_indexes.max_age_seconds
+    try:
+        with Session(engine) as session:
+            session.delete(session.get(Dataset, 1))
+            session.commit()
+        deadline = time.monotonic() + 10  # The stale index is rebuilt in the background
+        while _facets(client, "facets=platform")["total"] != 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert _facets(client, "facets=platform")["total"] == 0
+    finally:
+        facet_indexes.max_age_seconds = max_age_seconds
+
+
+def test_unknown_facet(client: TestClient):
+    response = client.get("/facets/datasets/v1?facets=keyword,unknown")
+    assert response.status_code == 400, response.json()
+    assert response.json()["detail"].startswith("The datasets have no facet unknown.")
+    response = client.get("/facets/persons/v1?license=mit")
+    assert response.status_code == 400, response.json()
+    assert response.json()["detail"].startswith("The persons have no facet license.")
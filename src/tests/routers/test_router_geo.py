@@ -0,0 +1,123 @@
+import copy
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy.engine import Engine
+from sqlmodel import update
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from database.geo_search import backfill_grid_cells
+from database.model.ai_resource.location import GeoORM
+from tests.routers.generic.test_router_eager_loading import QueryCounter
+
+BRUSSELS = (50.85, 4.35)
+PARIS = (48.86, 2.35)
+NEW_YORK = (40.71, -74.01)
+FIJI = (-17.71, 178.07)
+
+
+def _post_dataset(client: TestClient, body_asset: dict, i: int, coordinates) -> int:
+    body = copy.deepcopy(body_asset)
+    body["platform_identifier"] = str(i)
+    if coordinates is not None:
+        latitude, longitude = coordinates
+        body["spatial_coverage"] = {"geo": {"latitude": latitude, "longitude": longitude}}
+    response = client.post("/datasets/v1", json=body, headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+    return response.json()["identifier"]
+
+
+@pytest.fixture
+def datasets(client: TestClient, mocked_privileged_token: Mock, body_asset: dict):
+    keycloak_openid.userinfo = mocked_privileged_token
+    for i, coordinates in enumerate([BRUSSELS, PARIS, NEW_YORK, FIJI, None], start=1):
+        _post_dataset(client, body_asset, i, coordinates)
+
+
+def _identifiers(client: TestClient, query: str) -> list[int]:
+    response = client.get(f"/datasets/v1?{query}")
+    assert response.status_code == 200, response.json()
+    return [resource["identifier"] for resource in response.json()]
+
+
+@pytest.mark.usefixtures("datasets")
+def test_bbox(client: TestClient):
+    assert _identifiers(client, "bbox=2,48,5,51") == [1, 2]
+    assert _identifiers(client, "bbox=3,48,5,51") == [1]
+    assert _identifiers(client, "bbox=-180,-90,180,90") == [1, 2, 3, 4]
+    # Crossing the antimeridian
+    assert _identifiers(client, "bbox=170,-20,-170,0") == [4]
+
+
+@pytest.mark.usefixtures("datasets")
+def test_bbox_after_backfill(client: TestClient, engine: Engine):
+    with engine.connect() as connection:
+        connection.execute(update(GeoORM).values(grid_cell=None))  # Written before the grid
+        connection.commit()
+    assert _identifiers(client, "bbox=2,48,5,51") == []
+
+    with engine.connect() as connection:
+        assert backfill_grid_cells(connection) == 4
+        connection.commit()
+    assert _identifiers(client, "bbox=2,48,5,51") == [1, 2]
+
+
+@pytest.mark.usefixtures("datasets")
+def test_near(client: TestClient):
+    assert _identifiers(client, "near=50.85,4.35&radius_km=100") == [1]
+    assert _identifiers(client, "near=50.85,4.35&radius_km=300") == [1, 2]
+    assert _identifiers(client, "near=50.85,4.35&radius_km=300&bbox=3,48,5,51") == [1]
+    assert _identifiers(client, "near=-17,-179&radius_km=400") == [4]
+    # Brussels and Paris are 264 km apart
+    assert _identifiers(client, "near=50.85,4.35&radius_km=260") == [1]
+    assert _identifiers(client, "near=50.85,4.35&radius_km=270") == [1, 2]
+
+
+@pytest.mark.usefixtures("datasets")
+def test_near_in_single_query(client: TestClient, engine: Engine):
+    _identifiers(client, "bbox=-180,-90,180,90")
+    with QueryCounter(engine) as bbox_counter:
+        _identifiers(client, "bbox=2,48,5,51")
+    with QueryCounter(engine) as near_counter:
+        _identifiers(client, "near=50.85,4.35&radius_km=300")
+    assert near_counter.count == bbox_counter.count  # The locations are not read separately
+
+
+@pytest.mark.usefixtures("datasets")
+def test_nearest(client: TestClient):
+    response = client.get("/nearest/datasets/v1?latitude=48&longitude=2&k=2")
+    assert response.status_code == 200, response.json()
+    nearest = response.json()
+    assert [item["resource"]["identifier"] for item in nearest] == [2, 1]
+    assert nearest[0]["resource"] == client.get("/datasets/v1/2").json()
+    assert 90 < nearest[0]["distance_km"] < 100
+    assert nearest[1]["distance_km"] == pytest.approx(360, abs=10)
+
+    response = client.get("/nearest/datasets/v1?latitude=0&longitude=0&k=10")
+    identifiers = [item["resource"]["identifier"] for item in response.json()]
+    assert identifiers == [2, 1, 3, 4]
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "bbox=1,2,3",
+        "bbox=a,b,c,d",
+        "bbox=0,-100,1,1",
+        "near=50,4",
+        "near=50,4&radius_km=-1",
+        "near=100,4&radius_km=1",
+    ],
+)
+def test_invalid_geo_filters(client: TestClient, query: str):
+    response = client.get(f"/datasets/v1?{query}")
+    assert response.status_code == 400, response.json()
+
+
+def test_geo_filter_without_location(client: TestClient):
+    response = client.get("/events/v1?bbox=0,0,1,1")
+    assert response.status_code == 400, response.json()
+    assert response.json()["detail"] == "The events cannot be filtered on bbox or near."
+    response = client.get("/nearest/events/v1?latitude=0&longitude=0")
+    assert response.status_code == 404, response.json()
@@ -0,0 +1,102 @@
+import copy
+from unittest.mock import Mock
+
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, delete
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from connectors.near_duplicates import _texts
+from database import near_duplicates
+from database.model.dataset.dataset import Dataset
+
+DESCRIPTION = "Daily rainfall measured at 300 stations in Europe between 1950 and 2020."
+
+
+def _post_dataset(client: TestClient, body_asset: dict, i: int, platform: str, **fields) -> int:
+    body = copy.deepcopy(body_asset)
+    body.update({"platform": platform, "platform_identifier": str(i), **fields})
+    response = client.post("/datasets/v1", json=body, headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+    return response.json()["identifier"]
+
+
+def _clusters(client: TestClient, query: str = "") -> list[list[int]]:
+    response = client.get(f"/near_duplicates/datasets/v1?{query}")
+    assert response.status_code == 200, response.json()
+    return [[resource["identifier"] for resource in cluster] for cluster in response.json()]
+
+
+def test_near_duplicates(client: TestClient, mocked_privileged_token: Mock, body_asset: dict):
+    keycloak_openid.userinfo = mocked_privileged_token
+    headers = {"Authorization": "Fake token"}
+    _post_dataset(client, body_asset, 1, "zenodo", name="Rainfall", description=DESCRIPTION)
+    _post_dataset(client, body_asset, 2, "example", name="Traffic", description="Cars")
+    _post_dataset(client, body_asset, 3, "huggingface", name="rainfall", description=DESCRIPTION)
+    _post_dataset(client, body_asset, 4, "example", name="Cars", description="Traffic")
+    _post_dataset(client, body_asset, 5, "example", name="Traffic.", description="Cars!")
+
+    response = client.get("/near_duplicates/datasets/v1")
+    assert response.status_code == 200, response.json()
+    assert response.json()[0] == [
+        {"identifier": 1, "platform": "zenodo", "platform_identifier": "1", "name": "Rainfall"},
+        {
+            "identifier": 3,
+            "platform": "huggingface",
+            "platform_identifier": "3",
+            "name": "rainfall",
+        },
+    ]
+    assert _clusters(client) == [[1, 3], [2, 5]]
+    assert _clusters(client, "cross_platform=true") == [[1, 3]]
+    assert _clusters(client, "offset=1&limit=1") == [[2, 5]]
+
+    body = copy.deepcopy(body_asset)
+    body.update({"platform": "huggingface", "platform_identifier": "3", "name": "Other"})
+    response = client.put("/datasets/v1/3", json=body, headers=headers)
+    assert response.status_code == 200, response.json()
+    response = client.delete("/datasets/v1/5", headers=headers)
+    assert response.status_code == 200, response.json()
+    assert _clusters(client) == []
+
+
+def test_update_keeps_unchanged_signature(
+    client: TestClient, mocked_privileged_token: Mock, body_asset: dict, monkeypatch
+):
+    keycloak_openid.userinfo = mocked_privileged_token
+    _post_dataset(client, body_asset, 1, "zenodo", name="Rainfall", description=DESCRIPTION)
+    _post_dataset(client, body_asset, 2, "huggingface", name="rainfall", description=DESCRIPTION)
+    update = Mock(wraps=near_duplicates.update)
+    monkeypatch.setattr(near_duplicates, "update", update)
+
+    body = copy.deepcopy(body_asset)
+    body.update({"platform": "huggingface", "platform_identifier": "2", "version": "2"})
+    body.update({"name": "rainfall", "description": DESCRIPTION})
+    response = client.put("/datasets/v1/2", json=body, headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+    update.assert_not_called()
+    assert _clusters(client) == [[1, 2]]
+
+    body["name"] = "Traffic"
+    response = client.put("/datasets/v1/2", json=body, headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+    update.assert_called_once()
+
+
+def test_rebuild(
+    client: TestClient, engine: Engine, mocked_privileged_token: Mock, body_asset: dict
+):
+    keycloak_openid.userinfo = mocked_privileged_token
+    _post_dataset(client, body_asset, 1, "zenodo", name="Rainfall", description=DESCRIPTION)
+    _post_dataset(client, body_asset, 2, "example", name="Traffic", description="Cars")
+    _post_dataset(client, body_asset, 3, "openml", name="rainfall", description=DESCRIPTION)
+    with Session(engine) as session:
+        session.execute(delete(near_duplicates.MinHashSignature))
+        session.commit()
+    assert _clusters(client) == []
+
+    with Session(engine) as session:
+        texts = _texts(session, Dataset)
+        near_duplicates.rebuild(session, "dataset", texts, batch_size=2)
+        session.commit()
+    assert _clusters(client) == [[1, 3]]
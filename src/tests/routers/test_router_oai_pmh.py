@@ -0,0 +1,190 @@
+import copy
+import datetime
+import json
+from unittest.mock import Mock
+from xml.etree import ElementTree
+
+import pytest
+from starlette.testclient import TestClient
+
+import routers
+from authentication import keycloak_openid
+from routers.oai_pmh_router import OaiPmhRouter
+
+NAMESPACES = {
+    "oai": "http://www.openarchives.org/OAI/2.0/",
+    "oai_dc": "http://www.openarchives.org/OAI/2.0/oai_dc/",
+    "dc": "http://purl.org/dc/elements/1.1/",
+    "json": "https://aiod.eu/oai-pmh/json/",
+}
+
+
+def _get(client: TestClient, query: str) -> ElementTree.Element:
+    response = client.get(f"/oai/v1?{query}")
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "text/xml; charset=utf-8"
+    return ElementTree.fromstring(response.content)
+
+
+def _error(client: TestClient, query: str) -> str:
+    error = _get(client, query).find("oai:error", NAMESPACES)
+    assert error is not None
+    return error.attrib["code"]
+
+
+def _identifiers(root: ElementTree.Element) -> list[str]:
+    return [e.text for e in root.iterfind(".//oai:header/oai:identifier", NAMESPACES)]
+
+
+def _resumption_token(root: ElementTree.Element) -> str | None:
+    token = root.find(".//oai:resumptionToken", NAMESPACES)
+    assert token is not None
+    return token.text
+
+
+@pytest.fixture
+def resources(client: TestClient, mocked_privileged_token: Mock, body_asset: dict):
+    keycloak_openid.userinfo = mocked_privileged_token
+    for path, i in (("datasets", 1), ("datasets", 2), ("publications", 1), ("datasets", 3)):
+        body = copy.deepcopy(body_asset)
+        body["platform_identifier"] = str(i)
+        body["name"] = f"{path} {i}"
+        response = client.post(f"/{path}/v1", json=body, headers={"Authorization": "Fake token"})
+        assert response.status_code == 200, response.json()
+
+
+@pytest.fixture
+def page_size(monkeypatch) -> int:
+    (router,) = [r for r in routers.other_routers if isinstance(r, OaiPmhRouter)]
+    monkeypatch.setattr(router, "page_size", 2)
+    return 2
+
+
+@pytest.mark.usefixtures("resources")
+def test_identify_and_formats(client: TestClient):
+    root = _get(client, "verb=Identify")
+    assert root.findtext("oai:Identify/oai:baseURL", namespaces=NAMESPACES).endswith("/oai/v1")
+    assert root.findtext("oai:Identify/oai:protocolVersion", namespaces=NAMESPACES) == "2.0"
+    sets = _get(client, "verb=ListSets")
+    assert [e.text for e in sets.iterfind(".//oai:setSpec", NAMESPACES)] == [
+        "datasets",
+        "publications",
+    ]
+    root = _get(client, "verb=ListMetadataFormats")
+    prefixes = [e.text for e in root.iterfind(".//oai:metadataPrefix", NAMESPACES)]
+    assert prefixes == ["oai_dc", "schema.org", "dcat-ap"]
+    root = _get(client, "verb=ListMetadataFormats&identifier=oai:aiod.eu:publication/1")
+    prefixes = [e.text for e in root.iterfind(".//oai:metadataPrefix", NAMESPACES)]
+    assert prefixes == ["oai_dc"]
+
+
+@pytest.mark.usefixtures("resources")
+def test_get_record(client: TestClient, body_asset: dict):
+    root = _get(client, "verb=GetRecord&identifier=oai:aiod.eu:dataset/2&metadataPrefix=oai_dc")
+    record = root.find("oai:GetRecord/oai:record", NAMESPACES)
+    assert record.findtext("oai:header/oai:setSpec", namespaces=NAMESPACES) == "datasets"
+    dc = record.find("oai:metadata/oai_dc:dc", NAMESPACES)
+    assert dc.findtext("dc:title", namespaces=NAMESPACES) == "datasets 2"
+    subjects = [e.text for e in dc.iterfind("dc:subject", NAMESPACES)]
+    assert sorted(subjects) == sorted(body_asset["keyword"])
+    assert dc.findtext("dc:rights", namespaces=NAMESPACES) == body_asset["license"]
+    assert dc.findtext("dc:type", namespaces=NAMESPACES) == "Dataset"
+
+    root = _get(client, "verb=GetRecord&identifier=oai:aiod.eu:dataset/2&metadataPrefix=schema.org")
+    metadata = root.findtext(".//oai:metadata/json:json", namespaces=NAMESPACES)
+    expected = client.get("/datasets/v1/2?schema=schema.org").json()
+    assert json.loads(metadata) == expected
+
+
+@pytest.mark.usefixtures("resources")
+def test_post(client: TestClient):
+    body = {"verb": "GetRecord", "identifier": "oai:aiod.eu:dataset/2", "metadataPrefix": "oai_dc"}
+    response = client.post("/oai/v1", data=body)
+    assert response.status_code == 200, response.text
+    root = ElementTree.fromstring(response.content)
+    assert _identifiers(root) == ["oai:aiod.eu:dataset/2"]
+    request = root.find("oai:request", NAMESPACES)
+    assert request.attrib["verb"] == "GetRecord"
+
+    response = client.post("/oai/v1", data={"verb": "Unknown"})
+    error = ElementTree.fromstring(response.content).find("oai:error", NAMESPACES)
+    assert error.attrib["code"] == "badVerb"
+
+
+@pytest.mark.usefixtures("resources", "page_size")
+def test_deleted_records(client: TestClient):
+    root = _get(client, "verb=Identify")
+    assert root.findtext("oai:Identify/oai:deletedRecord", namespaces=NAMESPACES) == "persistent"
+    for path in ("/datasets/v1/2", "/publications/v1/1", "/datasets/v1/1"):
+        response = client.delete(path, headers={"Authorization": "Fake token"})
+        assert response.status_code == 200, response.json()
+
+    root = _get(client, "verb=GetRecord&identifier=oai:aiod.eu:dataset/2&metadataPrefix=oai_dc")
+    header = root.find("oai:GetRecord/oai:record/oai:header", NAMESPACES)
+    assert header.attrib["status"] == "deleted"
+    assert root.find(".//oai:metadata", NAMESPACES) is None
+
+    root = _get(client, "verb=ListIdentifiers&metadataPrefix=oai_dc")
+    assert _identifiers(root) == ["oai:aiod.eu:dataset/3", "oai:aiod.eu:dataset/2"]
+    headers = root.findall(".//oai:header", NAMESPACES)
+    assert [header.attrib.get("status") for header in headers] == [None, "deleted"]
+    root = _get(client, f"verb=ListIdentifiers&resumptionToken={_resumption_token(root)}")
+    assert _identifiers(root) == ["oai:aiod.eu:publication/1", "oai:aiod.eu:dataset/1"]
+    headers = root.findall(".//oai:header", NAMESPACES)
+    assert [header.attrib.get("status") for header in headers] == ["deleted", "deleted"]
+    assert _resumption_token(root) is None
+
+    root = _get(client, "verb=ListRecords&metadataPrefix=oai_dc&set=publications")
+    assert _identifiers(root) == ["oai:aiod.eu:publication/1"]
+
+
+@pytest.mark.usefixtures("resources", "page_size")
+def test_list_records_with_resumption(client: TestClient):
+    root = _get(client, "verb=ListIdentifiers&metadataPrefix=oai_dc")
+    assert _identifiers(root) == ["oai:aiod.eu:dataset/1", "oai:aiod.eu:dataset/2"]
+    token = _resumption_token(root)
+    root = _get(client, f"verb=ListIdentifiers&resumptionToken={token}")
+    assert _identifiers(root) == ["oai:aiod.eu:dataset/3", "oai:aiod.eu:publication/1"]
+    assert _resumption_token(root) is None
+
+    root = _get(client, "verb=ListRecords&metadataPrefix=dcat-ap")
+    assert _identifiers(root) == ["oai:aiod.eu:dataset/1", "oai:aiod.eu:dataset/2"]
+    assert len(root.findall(".//oai:metadata/json:json", NAMESPACES)) == 2
+    root = _get(client, f"verb=ListRecords&resumptionToken={_resumption_token(root)}")
+    assert _identifiers(root) == ["oai:aiod.eu:dataset/3"]
+
+    root = _get(client, "verb=ListRecords&metadataPrefix=oai_dc&set=publications")
+    assert _identifiers(root) == ["oai:aiod.eu:publication/1"]
+    assert root.find(".//oai:resumptionToken", NAMESPACES) is None
+
+
+@pytest.mark.usefixtures("resources")
+def test_list_records_selective(client: TestClient):
+    today = datetime.datetime.utcnow().date()
+    tomorrow = today + datetime.timedelta(days=1)
+    root = _get(client, f"verb=ListIdentifiers&metadataPrefix=oai_dc&from={today}&until={today}")
+    assert len(_identifiers(root)) == 4
+    query = f"verb=ListIdentifiers&metadataPrefix=oai_dc&from={tomorrow}"
+    assert _error(client, query) == "noRecordsMatch"
+    query = f"verb=ListIdentifiers&metadataPrefix=oai_dc&from={today}T00:00:00Z&until={today}"
+    assert _error(client, query) == "badArgument"
+
+
+@pytest.mark.parametrize(
+    "query,code",
+    [
+        ("", "badVerb"),
+        ("verb=Unknown", "badVerb"),
+        ("verb=Identify&verb=Identify", "badArgument"),
+        ("verb=Identify&metadataPrefix=oai_dc", "badArgument"),
+        ("verb=ListRecords", "badArgument"),
+        ("verb=ListRecords&metadataPrefix=oai_dc&resumptionToken=x", "badArgument"),
+        ("verb=ListRecords&resumptionToken=invalid", "badResumptionToken"),
+        ("verb=ListRecords&metadataPrefix=marc", "cannotDisseminateFormat"),
+        ("verb=ListRecords&metadataPrefix=oai_dc", "noRecordsMatch"),
+        ("verb=GetRecord&identifier=oai:aiod.eu:dataset/1&metadataPrefix=oai_dc", "idDoesNotExist"),
+        ("verb=GetRecord&identifier=unknown&metadataPrefix=oai_dc", "idDoesNotExist"),
+    ],
+)
+def test_errors(client: TestClient, query: str, code: str):
+    assert _error(client, query) == code
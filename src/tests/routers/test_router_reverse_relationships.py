@@ -0,0 +1,89 @@
+import copy
+from unittest.mock import Mock
+
+import pytest
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+
+
+def _post(client: TestClient, path: str, body: dict, i: int, **fields) -> int:
+    body = copy.deepcopy(body)
+    body["platform_identifier"] = str(i)
+    body.update(fields)
+    response = client.post(path, json=body, headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+    return response.json()["identifier"]
+
+
+def _reverse(client: TestClient, path: str) -> list[tuple[str, int]]:
+    response = client.get(path)
+    assert response.status_code == 200, response.json()
+    return [(item["type"], item["resource"]["identifier"]) for item in response.json()]
+
+
+@pytest.fixture
+def linked(client: TestClient, mocked_privileged_token: Mock, body_asset: dict, body_agent: dict):
+    keycloak_openid.userinfo = mocked_privileged_token
+    _post(client, "/publications/v1", body_asset, 1)
+    _post(client, "/persons/v1", body_agent, 1)
+    _post(client, "/organisations/v1", body_agent, 1)
+    funder = client.get("/organisations/v1/1").json()["agent_identifier"]
+    for i in range(1, 4):
+        _post(client, "/datasets/v1", body_asset, i, citation=[1], creator=[1], funder=[funder])
+    _post(client, "/datasets/v1", body_asset, 4)
+    _post(client, "/publications/v1", body_asset, 2, citation=[1], creator=[1])
+
+
+@pytest.mark.usefixtures("linked")
+def test_reverse_relationships(client: TestClient):
+    citing = [("dataset", 1), ("dataset", 2), ("dataset", 3), ("publication", 2)]
+    assert _reverse(client, "/publications/v1/1/cited_by") == citing
+    assert _reverse(client, "/persons/v1/1/created") == citing
+    assert _reverse(client, "/organisations/v1/1/funded") == citing[:3]
+    assert _reverse(client, "/publications/v1/2/cited_by") == []
+    assert _reverse(client, "/publications/v1/1/cited_by?type=publication") == [("publication", 2)]
+
+    response = client.get("/publications/v1/1/cited_by")
+    assert response.json()[0]["resource"] == client.get("/datasets/v1/1").json()
+
+
+@pytest.mark.usefixtures("linked")
+def test_reverse_relationships_msgpack(client: TestClient):
+    msgpack = pytest.importorskip("msgpack")
+    response = client.get(
+        "/publications/v1/1/cited_by?limit=1", headers={"Accept": "application/msgpack"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/msgpack"
+    assert (
+        msgpack.unpackb(response.content)
+        == client.get("/publications/v1/1/cited_by?limit=1").json()
+    )
+    assert "next" in response.links
+
+
+@pytest.mark.usefixtures("linked")
+def test_reverse_relationships_pagination(client: TestClient):
+    response = client.get("/publications/v1/1/cited_by?limit=3")
+    assert response.status_code == 200, response.json()
+    assert len(response.json()) == 3
+    next_url = response.links["next"]["url"]
+    assert _reverse(client, next_url) == [("publication", 2)]
+
+    response = client.get("/publications/v1/1/cited_by?limit=2")
+    assert _reverse(client, response.links["next"]["url"]) == [("dataset", 3), ("publication", 2)]
+
+
+@pytest.mark.parametrize(
+    "path,status_code",
+    [
+        ("/publications/v1/1/cited_by", 404),
+        ("/publications/v1/1/cited_by?type=news", 400),
+        ("/publications/v1/1/cited_by?limit=-1", 400),
+        ("/publications/v1/1/cited_by?next=invalid", 400),
+    ],
+)
+def test_reverse_relationships_invalid(client: TestClient, path: str, status_code: int):
+    response = client.get(path)
+    assert response.status_code == status_code, response.json()
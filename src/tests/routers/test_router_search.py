@@ -0,0 +1,113 @@
+import copy
+import time
+from unittest.mock import Mock
+
+from httpx import Response
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from search import search_builds, search_index
+
+
+def _post_dataset(client: TestClient, body_asset: dict, i: int, **fields) -> int:
+    body = copy.deepcopy(body_asset)
+    body["platform_identifier"] = str(i)
+    body.update(fields)
+    response = client.post("/datasets/v1", json=body, headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+    return response.json()["identifier"]
+
+
+def _get(client: TestClient, path: str) -> Response:
+    """Get the path, waiting until the search index has been built in the background"""
+    deadline = time.monotonic() + 10
+    response = client.get(path)
+    while response.status_code == 503 and time.monotonic() < deadline:
+        time.sleep(0.01)
+        response = client.get(path)
+    return response
+
+
+def _search(client: TestClient, query: str) -> list[int]:
+    response = _get(client, f"/search/datasets/v1?q={query}")
+    assert response.status_code == 200, response.json()
+    return [resource["identifier"] for resource in response.json()]
+
+
+def test_search_updated_on_write(
+    client: TestClient, mocked_privileged_token: Mock, body_asset: dict
+):
+    keycloak_openid.userinfo = mocked_privileged_token
+    headers = {"Authorization": "Fake token"}
+    _post_dataset(client, body_asset, 1, name="Rainfall", description="Rainfall in Europe")
+    _post_dataset(client, body_asset, 2, name="Europe", keyword=["rainfall"])
+    _post_dataset(client, body_asset, 3, name="Traffic", description="Cars in Europe")
+
+    response = _get(client, "/search/datasets/v1?q=rainfall")
+    assert response.status_code == 200, response.json()
+    response_json = response.json()
+    assert [resource["identifier"] for resource in response_json] == [1, 2]
+    assert response_json[0] == client.get("/datasets/v1/1").json()
+    assert _search(client, "europ") == [2, 1, 3]
+
+    body = copy.deepcopy(body_asset)
+    body.update({"platform_identifier": "3", "name": "Rainfall and traffic"})
+    response = client.put("/datasets/v1/3", json=body, headers=headers)
+    assert response.status_code == 200, response.json()
+    assert _search(client, "rainfall") == [1, 3, 2]
+
+    response = client.delete("/datasets/v1/1", headers=headers)
+    assert response.status_code == 200, response.json()
+    assert _search(client, "rainfall") == [3, 2]
+
+
+def test_index_built_from_database(
+    client: TestClient, mocked_privileged_token: Mock, body_asset: dict
+):
+    keycloak_openid.userinfo = mocked_privileged_token
+    _post_dataset(client, body_asset, 1, name="Rainfall")
+    _post_dataset(client, body_asset, 2, name="Traffic", alternate_name=["rainfall per road"])
+    search_index.clear()
+    search_builds.clear()  # As if the worker has just started
+
+    response = client.get("/search/datasets/v1?q=rainfall")
+    if response.status_code == 503:  # Unless the index was built in the background already
+        assert response.headers["retry-after"] == "5"
+    assert _search(client, "rainfall") == [1, 2]
+    assert search_index.is_built("dataset")
+
+
+def test_index_built_by_other_process(
+    client: TestClient, mocked_privileged_token: Mock, body_asset: dict
+):
+    keycloak_openid.userinfo = mocked_privileged_token
+    _post_dataset(client, body_asset, 1, name="Rainfall")
+    search_index.mark_built("dataset")
+    search_builds.clear()  # As if the worker has just started
+
+    response = client.get("/search/datasets/v1?q=rainfall")
+    assert response.status_code == 200, response.json()
+    assert [resource["identifier"] for resource in response.json()] == [1]
+
+
+def test_outdated_index_rebuilt_in_background(
+    client: TestClient, mocked_privileged_token: Mock, body_asset: dict, monkeypatch
+):
+    keycloak_openid.userinfo = mocked_privileged_token
+    _post_dataset(client, body_asset, 1, name="Rainfall")
+    _post_dataset(client, body_asset, 2, name="Rainfall per road")
+    assert _search(client, "rainfall") == [1, 2]
+    search_index.remove("dataset", 2)  # As if it was written by another process
+
+    monkeypatch.setattr(search_index, "max_age_seconds", 0)
+    assert _search(client, "rainfall") == [1]  # Served from the current index
+    monkeypatch.setattr(search_index, "max_age_seconds", 300)
+    deadline = time.monotonic() + 10
+    while _search(client, "rainfall") != [1, 2] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert _search(client, "rainfall") == [1, 2]
+
+
+def test_search_invalid_limit(client: TestClient):
+    response = client.get("/search/datasets/v1?q=rain&limit=-1")
+    assert response.status_code == 400, response.json()
@@ -0,0 +1,98 @@
+import pytest
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+from starlette.testclient import TestClient
+
+from database.model.agent.person import Person
+from database.model.dataset.dataset import Dataset
+from database.model.knowledge_asset.publication import Publication
+
+
+@pytest.fixture
+def resources(engine: Engine, person: Person, dataset: Dataset, publication: Publication):
+    with Session(engine) as session:
+        session.add(person)
+        session.merge(dataset)
+        session.merge(publication)
+        session.commit()
+
+
+def test_get_ai_resource(client: TestClient, resources):
+    dataset = client.get("/datasets/v1/1").json()
+    response = client.get(f"/ai_resources/v1/{dataset['resource_identifier']}")
+    assert response.status_code == 200, response.json()
+    response_json = response.json()
+    assert response_json["type"] == "dataset"
+    assert response_json["resource"] == dataset
+
+
+def test_get_agent(client: TestClient, resources):
+    person = client.get("/persons/v1/1").json()
+    response = client.get(f"/agents/v1/{person['agent_identifier']}")
+    assert response.status_code == 200, response.json()
+    assert response.json()["type"] == "person"
+    assert response.json()["resource"]["identifier"] == 1
+
+
+def test_get_ai_resource_not_found(client: TestClient, resources):
+    response = client.get("/ai_resources/v1/99")
+    assert response.status_code == 404, response.json()
+    assert response.json()["detail"] == "ai_resource '99' not found in the database."
+
+
+def test_batch_get_ai_resources(client: TestClient, resources):
+    response = client.post("/ai_resources/v1/batch_get", json={"identifiers": [3, 99, 1, 2]})
+    assert response.status_code == 200, response.json()
+    response_json = response.json()
+    types = [resource["type"] for resource in response_json["resources"]]
+    assert sorted(types) == ["dataset", "person", "publication"]
+    identifiers = [
+        resource["resource"]["resource_identifier"] for resource in response_json["resources"]
+    ]
+    assert identifiers == [3, 1, 2]
+    assert response_json["not_found"] == [99]
+
+
+def test_list_ai_resources(client: TestClient, resources):
+    response = client.get("/ai_resources/v1?limit=2")
+    assert response.status_code == 200, response.json()
+    first_page = response.json()
+    assert [r["resource"]["resource_identifier"] for r in first_page] == [1, 2]
+
+    response = client.get(response.links["next"]["url"])
+    assert response.status_code == 200, response.json()
+    assert [r["resource"]["resource_identifier"] for r in response.json()] == [3]
+    assert "next" not in response.links
+
+
+def test_list_ai_resources_of_type(client: TestClient, resources):
+    response = client.get("/ai_resources/v1?type=publication")
+    assert response.status_code == 200, response.json()
+    (publication,) = response.json()
+    assert publication["type"] == "publication"
+    assert publication["resource"]["isbn"] == "9783161484100"
+
+
+def test_list_ai_resources_invalid_type(client: TestClient, resources):
+    response = client.get("/ai_resources/v1?type=unknown")
+    assert response.status_code == 400, response.json()
+    assert response.json()["detail"].startswith("Invalid type unknown.")
+
+
+@pytest.mark.parametrize(
+    "method,path,body",
+    [
+        ("GET", "/ai_resources/v1", None),
+        ("GET", "/ai_resources/v1/1", None),
+        ("POST", "/ai_resources/v1/batch_get", {"identifiers": [1, 99]}),
+    ],
+)
+def test_ai_resources_msgpack(
+    client: TestClient, resources, method: str, path: str, body: dict | None
+):
+    msgpack = pytest.importorskip("msgpack")
+    response = client.request(method, path, json=body, headers={"Accept": "application/msgpack"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/msgpack"
+    assert response.headers["vary"] == "Accept"
+    assert msgpack.unpackb(response.content) == client.request(method, path, json=body).json()
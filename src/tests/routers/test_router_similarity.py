@@ -0,0 +1,76 @@
+import copy
+import time
+from unittest.mock import Mock
+
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+from httpx import Response
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from database.model.dataset.dataset import Dataset
+
+
+def _post_dataset(client: TestClient, body_asset: dict, i: int, **fields) -> int:
+    body = copy.deepcopy(body_asset)
+    body["platform_identifier"] = str(i)
+    body.update({"keyword": [], "description": None, "alternate_name": []}, **fields)
+    response = client.post("/datasets/v1", json=body, headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+    return response.json()["identifier"]
+
+
+def _get(client: TestClient, path: str) -> Response:
+    """Get the path, waiting until the similarity index has been built in the background"""
+    deadline = time.monotonic() + 10
+    response = client.get(path)
+    while response.status_code == 503 and time.monotonic() < deadline:
+        time.sleep(0.01)
+        response = client.get(path)
+    return response
+
+
+def _similar(client: TestClient, identifier: int, query: str = "") -> list[int]:
+    response = _get(client, f"/datasets/v1/{identifier}/similar?{query}")
+    assert response.status_code == 200, response.json()
+    return [resource["identifier"] for resource in response.json()]
+
+
+def test_similar(client: TestClient, mocked_privileged_token: Mock, body_asset: dict):
+    keycloak_openid.userinfo = mocked_privileged_token
+    headers = {"Authorization": "Fake token"}
+    _post_dataset(client, body_asset, 1, name="Rainfall in Europe")
+    _post_dataset(client, body_asset, 2, name="Daily rainfall", keyword=["europe"])
+    _post_dataset(client, body_asset, 3, name="Traffic")
+
+    response = client.get("/datasets/v1/1/similar")
+    assert response.status_code == 503, response.json()
+    assert response.headers["Retry-After"] == "5"
+    response = _get(client, "/datasets/v1/1/similar")
+    assert response.status_code == 200, response.json()
+    assert response.json() == [client.get("/datasets/v1/2").json()]
+    assert _similar(client, 3) == []
+
+    _post_dataset(client, body_asset, 4, name="Traffic in Europe")
+    assert _similar(client, 1) == [4, 2]
+    assert _similar(client, 1, "k=1") == [4]
+    assert _similar(client, 3) == [4]
+
+    response = client.delete("/datasets/v1/2", headers=headers)
+    assert response.status_code == 200, response.json()
+    assert _similar(client, 1) == [4]
+
+
+def test_similar_built_from_database(client: TestClient, engine: Engine, dataset: Dataset):
+    with Session(engine) as session:
+        session.add(dataset)
+        session.commit()
+    assert _similar(client, 1) == []
+
+
+def test_similar_not_found(client: TestClient):
+    response = _get(client, "/datasets/v1/1/similar")
+    assert response.status_code == 404, response.json()
+    assert response.json()["detail"] == "Dataset '1' not found in the database."
+    response = client.get("/datasets/v1/1/similar?k=1000")
+    assert response.status_code == 400, response.json()
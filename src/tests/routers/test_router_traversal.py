@@ -0,0 +1,112 @@
+import copy
+from unittest.mock import Mock
+
+import pytest
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from database import graph as graph_module
+
+
+def _post(client: TestClient, path: str, body: dict, i: int, **fields) -> int:
+    body = copy.deepcopy(body)
+    body["platform_identifier"] = str(i)
+    body.update(fields)
+    response = client.post(path, json=body, headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+    return response.json()["identifier"]
+
+
+def _resource_id(client: TestClient, path: str) -> int:
+    return client.get(path).json()["resource_identifier"]
+
+
+def _traverse(client: TestClient, path: str) -> list:
+    response = client.get(path)
+    assert response.status_code == 200, response.json()
+    return [
+        (item["type"], item["resource"]["identifier"], item.get("depth"))
+        for item in response.json()
+    ]
+
+
+@pytest.fixture
+def graph(client: TestClient, mocked_privileged_token: Mock, body_asset: dict):
+    """
+    Dataset 1 has part dataset 2 (using is_part_of) and publication 1 (using has_part). Dataset 2
+    has part dataset 3. Publication 2 cites publication 1, and publication 3 cites both.
+    """
+    keycloak_openid.userinfo = mocked_privileged_token
+    _post(client, "/publications/v1", body_asset, 1)
+    publication_1 = _resource_id(client, "/publications/v1/1")
+    _post(client, "/datasets/v1", body_asset, 1, has_part=[publication_1])
+    dataset_1 = _resource_id(client, "/datasets/v1/1")
+    _post(client, "/datasets/v1", body_asset, 2, is_part_of=[dataset_1])
+    dataset_2 = _resource_id(client, "/datasets/v1/2")
+    _post(client, "/datasets/v1", body_asset, 3, is_part_of=[dataset_2])
+    _post(client, "/publications/v1", body_asset, 2, citation=[1])
+    _post(client, "/publications/v1", body_asset, 3, citation=[1, 2])
+
+
+@pytest.mark.usefixtures("graph")
+def test_descendants_and_ancestors(client: TestClient):
+    descendants = _traverse(client, "/datasets/v1/1/descendants?relation=has_part")
+    assert descendants == [("publication", 1, 1), ("dataset", 2, 1), ("dataset", 3, 2)]
+    assert _traverse(client, "/datasets/v1/1/descendants?relation=has_part&max_depth=1") == [
+        ("publication", 1, 1),
+        ("dataset", 2, 1),
+    ]
+    assert _traverse(client, "/datasets/v1/3/ancestors?relation=has_part") == [
+        ("dataset", 2, 1),
+        ("dataset", 1, 2),
+    ]
+    assert _traverse(client, "/publications/v1/1/ancestors?relation=citation") == [
+        ("publication", 2, 1),
+        ("publication", 3, 1),
+    ]
+    assert _traverse(client, "/publications/v1/3/descendants?relation=citation") == [
+        ("publication", 1, 1),
+        ("publication", 2, 1),
+    ]
+    assert _traverse(client, "/datasets/v1/1/ancestors?relation=has_part") == []
+
+    response = client.get("/datasets/v1/1/descendants?relation=has_part")
+    assert response.json()[1]["resource"] == client.get("/datasets/v1/2").json()
+
+
+@pytest.mark.usefixtures("graph")
+def test_descendants_limited(client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    path = "/datasets/v1/1/descendants?relation=has_part"
+    assert _traverse(client, path + "&limit=2") == [("publication", 1, 1), ("dataset", 2, 1)]
+    assert _traverse(client, path + "&limit=0") == []
+
+    monkeypatch.setattr(graph_module, "MAX_ROWS", 2)
+    assert _traverse(client, path) == [("publication", 1, 1), ("dataset", 2, 1)]
+
+
+@pytest.mark.usefixtures("graph")
+def test_path(client: TestClient):
+    path = "/datasets/v1/1/path?relation=has_part&to_type=datasets&to=3"
+    assert _traverse(client, path) == [
+        ("dataset", 1, None),
+        ("dataset", 2, None),
+        ("dataset", 3, None),
+    ]
+    assert _traverse(client, path + "&max_depth=1") == []
+    assert _traverse(client, "/datasets/v1/3/path?relation=has_part&to_type=datasets&to=1") == []
+    path = "/publications/v1/3/path?relation=citation&to_type=publications&to=1"
+    assert _traverse(client, path) == [("publication", 3, None), ("publication", 1, None)]
+
+
+@pytest.mark.parametrize(
+    "path,status_code",
+    [
+        ("/datasets/v1/1/descendants?relation=has_part", 404),
+        ("/datasets/v1/1/descendants?relation=unknown", 400),
+        ("/datasets/v1/1/ancestors?relation=has_part&max_depth=0", 400),
+        ("/datasets/v1/1/path?relation=has_part&to_type=unknown&to=1", 400),
+    ],
+)
+def test_traversal_invalid(client: TestClient, path: str, status_code: int):
+    response = client.get(path)
+    assert response.status_code == status_code, response.json()
@@ -0,0 +1,61 @@
+import copy
+from unittest.mock import Mock
+
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+
+
+def _post_dataset(client: TestClient, body_asset: dict, i: int, **fields):
+    body = copy.deepcopy(body_asset)
+    body["platform_identifier"] = str(i)
+    body.update(fields)
+    response = client.post("/datasets/v1", json=body, headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+
+
+def _suggest(client: TestClient, vocabulary: str, query: str) -> list[dict]:
+    response = client.get(f"/vocabularies/{vocabulary}/suggest/v1?{query}")
+    assert response.status_code == 200, response.json()
+    return response.json()
+
+
+def test_suggest_ranked_by_usage(
+    client: TestClient, mocked_privileged_token: Mock, body_asset: dict
+):
+    keycloak_openid.userinfo = mocked_privileged_token
+    _post_dataset(client, body_asset, 1, keyword=["rain", "rainfall"])
+    _post_dataset(client, body_asset, 2, keyword=["rainfall", "traffic"])
+
+    assert _suggest(client, "keyword", "prefix=RAIN") == [
+        {"name": "rainfall", "count": 2},
+        {"name": "rain", "count": 1},
+    ]
+    assert _suggest(client, "keyword", "prefix=t&limit=1") == [{"name": "traffic", "count": 1}]
+    assert _suggest(client, "license", "prefix=https") == [
+        {"name": "https://creativecommons.org/licenses/by/4.0/", "count": 2}
+    ]
+
+
+def test_suggest_updated_on_insert(
+    client: TestClient, mocked_privileged_token: Mock, body_asset: dict
+):
+    keycloak_openid.userinfo = mocked_privileged_token
+    _post_dataset(client, body_asset, 1, keyword=["rainfall"])
+    assert _suggest(client, "keyword", "prefix=rain") == [{"name": "rainfall", "count": 1}]
+
+    _post_dataset(client, body_asset, 2, keyword=["rain"])
+    body = copy.deepcopy(body_asset)
+    body.update({"platform_identifier": "1", "keyword": ["raining"]})
+    response = client.post("/datasets/v1", json=body, headers={"Authorization": "Fake token"})
+    assert response.status_code == 409, response.json()  # Rolled back: raining is not added
+
+    assert _suggest(client, "keyword", "prefix=rain") == [
+        {"name": "rain", "count": 1},
+        {"name": "rainfall", "count": 1},
+    ]
+
+
+def test_suggest_invalid_limit(client: TestClient):
+    response = client.get("/vocabularies/keyword/suggest/v1?limit=1000")
+    assert response.status_code == 400, response.json()
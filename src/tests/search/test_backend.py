@@ -0,0 +1,112 @@
+import json
+
+import pytest
+import responses
+
+from search.backend import ElasticsearchIndex, SearchDocument, SqliteSearchIndex
+
+
+@pytest.fixture
+def index() -> SqliteSearchIndex:
+    index = SqliteSearchIndex()
+    index.add(
+        "dataset",
+        [
+            (1, SearchDocument(name="Weather", description="Daily temperature of cities")),
+            (2, SearchDocument(name="Temperature", description="Sensor data")),
+            (3, SearchDocument(name="Images", keyword=["temperature", "vision"])),
+        ],
+    )
+    index.add("publication", [(1, SearchDocument(name="Temperature forecasting"))])
+    return index
+
+
+def test_ranked_on_field(index: SqliteSearchIndex):
+    assert index.search("dataset", "temperature", limit=10) == [2, 3, 1]
+    assert index.search("dataset", "temperature", limit=1, offset=1) == [3]
+
+
+def test_all_terms_and_prefix(index: SqliteSearchIndex):
+    assert index.search("dataset", "temp", limit=10) == [2, 3, 1]
+    assert index.search("dataset", "temperature cit", limit=10) == [1]
+    assert index.search("dataset", "Forecasting", limit=10) == []
+    assert index.search("publication", "forecast", limit=10) == [1]
+
+
+@pytest.mark.parametrize("query", ['"', "temp AND (", "NEAR(", "*", ""])
+def test_query_syntax_is_escaped(index: SqliteSearchIndex, query: str):
+    index.search("dataset", query, limit=10)
+
+
+def test_replace_and_remove(index: SqliteSearchIndex):
+    index.add("dataset", [(2, SearchDocument(name="Humidity"))])
+    assert index.search("dataset", "temperature", limit=10) == [3, 1]
+    index.remove("dataset", 3)
+    assert index.search("dataset", "temperature", limit=10) == [1]
+    assert index.search("publication", "temperature", limit=10) == [1]
+
+
+def test_clear_resource_type(index: SqliteSearchIndex):
+    index.mark_built("dataset")
+    index.mark_built("publication")
+    index.clear("dataset")
+    assert not index.is_built("dataset")
+    assert index.is_built("publication")
+    assert index.search("dataset", "temperature", limit=10) == []
+    assert index.search("publication", "temperature", limit=10) == [1]
+
+
+def test_replace(index: SqliteSearchIndex):
+    def documents():
+        yield 4, SearchDocument(name="Temperature of rivers")
+        # Searches use the current index, and writes are also applied to the new index
+        assert index.search("dataset", "temperature", limit=10) == [2, 3, 1]
+        assert not index.is_built("dataset")
+        index.add("dataset", [(5, SearchDocument(name="Temperature of lakes"))])
+        index.remove("dataset", 4)
+        yield 1, SearchDocument(name="Weather", description="Daily temperature of cities")
+
+    index.replace("dataset", documents())
+    assert index.search("dataset", "temperature", limit=10) == [5, 1]
+    assert index.search("publication", "temperature", limit=10) == [1]
+    assert index.is_built("dataset")
+
+
+def test_replace_failure_keeps_index(index: SqliteSearchIndex):
+    def documents():
+        yield 4, SearchDocument(name="Temperature of rivers")
+        raise RuntimeError("Lost the connection")
+
+    with pytest.raises(RuntimeError):
+        index.replace("dataset", documents())
+    assert index.search("dataset", "temperature", limit=10) == [2, 3, 1]
+    index.add("dataset", [(5, SearchDocument(name="Temperature of lakes"))])
+    assert index.search("dataset", "lakes", limit=10) == [5]
+
+
+@responses.activate
+def test_elasticsearch_adapter():
+    index = ElasticsearchIndex("http://search:9200/", index_prefix="test")
+    responses.post("http://search:9200/_bulk", json={"errors": False})
+    responses.post(
+        "http://search:9200/test_dataset/_search",
+        json={"hits": {"hits": [{"_id": "2"}, {"_id": "1"}]}},
+    )
+    responses.delete("http://search:9200/test_dataset/_doc/3", status=404)
+    responses.get(
+        "http://search:9200/test_dataset/_mapping",
+        json={"test_dataset": {"mappings": {"_meta": {"built_at": 1700000000.0}}}},
+    )
+
+    index.add("dataset", [(1, SearchDocument(name="Weather", keyword=["temperature"]))])
+    assert index.search("dataset", "temperature", limit=5, offset=10) == [2, 1]
+    index.remove("dataset", 3)
+    assert index.is_built("dataset")
+
+    bulk = responses.calls[0].request.body.splitlines()
+    assert json.loads(bulk[0]) == {"index": {"_index": "test_dataset", "_id": "1"}}
+    assert json.loads(bulk[1])["keyword"] == ["temperature"]
+    search = json.loads(responses.calls[1].request.body)
+    assert search["query"]["multi_match"]["query"] == "temperature"
+    assert search["query"]["multi_match"]["fields"][0] == "name^10"
+    assert (search["from"], search["size"]) == (10, 5)
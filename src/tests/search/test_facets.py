@@ -0,0 +1,102 @@
+from collections import Counter
+
+import numpy as np
+
+from search.facets import FacetIndex
+
+
+def _index() -> FacetIndex:
+    index = FacetIndex(["keyword", "license"])
+    index.add(1, {"keyword": ["a", "b"], "license": ["mit"]})
+    index.add(2, {"keyword": ["b"], "license": ["apache"]})
+    index.add(3, {"keyword": ["b", "c"]})
+    return index
+
+
+def test_counts():
+    total, counts = _index().counts({}, ["keyword", "license"], limit=10)
+    assert total == 3
+    assert counts == {
+        "keyword": [("b", 3), ("a", 1), ("c", 1)],
+        "license": [("apache", 1), ("mit", 1)],
+    }
+
+
+def test_counts_filtered():
+    index = _index()
+    total, counts = index.counts({"keyword": ["a", "c"]}, ["keyword", "license"], limit=10)
+    assert total == 2
+    assert counts == {"keyword": [("b", 2), ("a", 1), ("c", 1)], "license": [("mit", 1)]}
+
+    total, counts = index.counts({"keyword": ["b"], "license": ["apache"]}, ["keyword"], limit=10)
+    assert (total, counts) == (1, {"keyword": [("b", 1)]})
+    assert index.counts({"keyword": ["unknown"]}, ["keyword"], limit=10) == (0, {"keyword": []})
+
+
+def test_counts_limited():
+    _, counts = _index().counts({}, ["keyword"], limit=2)
+    assert counts == {"keyword": [("b", 3), ("a", 1)]}
+
+
+def test_replace_and_remove():
+    index = _index()
+    index.add(1, {"keyword": ["c"]})
+    index.remove(2)
+    index.remove(4)
+    total, counts = index.counts({}, ["keyword", "license"], limit=10)
+    assert total == 2
+    assert counts == {"keyword": [("c", 2), ("b", 1)], "license": []}
+
+
+def test_compaction():
+    index = FacetIndex(["keyword"])
+    for identifier in range(3000):
+        index.add(identifier, {"keyword": [str(identifier % 3)]})
+    for identifier in range(2000):
+        index.remove(identifier)
+    index.add(2999, {"keyword": ["new"]})
+    assert len(index) == 1000
+    total, counts = index.counts({"keyword": ["0", "new"]}, ["keyword"], limit=10)
+    assert (total, counts) == (334, {"keyword": [("0", 333), ("new", 1)]})
+
+
+def test_from_arrays():
+    pairs = {
+        "keyword": (np.array([3, 1, 1, 2]), np.array([1, 0, 1, 1]), ["a", "b"]),
+        "license": (np.array([1]), np.array([0]), ["mit"]),
+    }
+    index = FacetIndex.from_arrays(np.array([3, 1, 2]), pairs)
+    assert index.counts({}, ["keyword", "license"], limit=10) == (
+        3,
+        {"keyword": [("b", 3), ("a", 1)], "license": [("mit", 1)]},
+    )
+    index.add(2, {"keyword": ["a"]})
+    index.remove(1)
+    assert index.counts({"keyword": ["a"]}, ["keyword"], limit=10) == (1, {"keyword": [("a", 1)]})
+
+
+def test_counts_large():
+    index = FacetIndex(["keyword", "license"])
+    for identifier in range(20000):
+        keywords = [str(identifier % 7), str(identifier % 11)]
+        index.add(identifier, {"keyword": keywords, "license": [str(identifier % 2)]})
+    for identifier in range(0, 20000, 5):
+        index.add(identifier, {"keyword": ["updated"], "license": ["0"]})
+
+    for filters in ({"license": ["0"]}, {"license": ["1"]}, {"keyword": ["1", "updated"]}):
+        total, counts = index.counts(filters, ["keyword", "license"], limit=3)
+        values = [_values(identifier) for identifier in range(20000)]
+        selected = [v for v in values if all(set(v[f]) & set(n) for f, n in filters.items())]
+        assert total == len(selected)
+        for facet in ("keyword", "license"):
+            expected = Counter(name for v in selected for name in set(v[facet]))
+            assert counts[facet] == sorted(expected.items(), key=lambda c: (-c[1], c[0]))[:3]
+
+
+def _values(identifier: int) -> dict[str, list[str]]:
+    if identifier % 5 == 0:
+        return {"keyword": ["updated"], "license": ["0"]}
+    return {
+        "keyword": [str(identifier % 7), str(identifier % 11)],
+        "license": [str(identifier % 2)],
+    }
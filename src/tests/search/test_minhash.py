@@ -0,0 +1,68 @@
+import numpy as np
+
+from search import minhash
+
+
+def test_normalise():
+    assert minhash.normalise(" The  Rainfall, (in) EUROPE!") == "the rainfall in europe"
+
+
+def test_similarity_estimates_jaccard():
+    texts = [
+        "Daily rainfall in Europe between 1950 and 2020",
+        "daily rainfall in europe between 1950 and 2020.",
+        "Daily rainfall in Europe between 1950 and 2021",
+        "Traffic intensity on Dutch highways",
+    ]
+    signatures = minhash.signatures(texts)
+    assert signatures.shape == (4, minhash.NUM_PERMUTATIONS)
+    assert signatures.dtype == np.uint32
+    similarity = minhash.similarity(signatures[0], signatures)
+    assert similarity[0] == similarity[1] == 1
+    assert similarity[2] >= minhash.SIMILARITY_THRESHOLD
+    assert similarity[3] < 0.2
+
+
+def test_signatures_independent_of_batch():
+    texts = [f"dataset number {i}" for i in range(100)]
+    batch = minhash.signatures(texts)
+    assert np.array_equal(batch[42], minhash.signatures([texts[42]])[0])
+
+
+def test_band_keys():
+    signatures = minhash.signatures(["rainfall in europe", "rainfall in europe", "traffic"])
+    keys = minhash.band_keys(signatures)
+    assert keys.shape == (3, minhash.BANDS)
+    assert keys.dtype == np.int64
+    assert np.array_equal(keys[0], keys[1])
+    assert not np.any(keys[0] == keys[2])
+
+
+def test_similarity_close_to_exact_jaccard():
+    random = np.random.default_rng(seed=0)
+    words = [f"word{i}" for i in range(200)]
+    base = list(random.choice(words, size=60))
+    texts = [" ".join(base)]
+    for changed in range(0, 60, 3):
+        text = list(base)
+        text[:changed] = random.choice(words, size=changed)
+        texts.append(" ".join(text))
+    signatures = minhash.signatures(texts)
+    shingles = [set(minhash.shingle_hashes(text).tolist()) for text in texts]
+
+    estimated = minhash.similarity(signatures[0], signatures)
+    exact = np.array([len(shingles[0] & s) / len(shingles[0] | s) for s in shingles])
+    assert exact.min() < 0.4 and exact.max() == 1
+    assert np.all(np.abs(estimated - exact) < 0.2)
+    assert np.mean(np.abs(estimated - exact)) < 0.05
+
+
+def test_signatures_without_overflow():
+    text = "Daily rainfall in Europe between 1950 and 2020"
+    hashes = minhash.shingle_hashes(text).tolist()
+    prime = int(minhash._MERSENNE_PRIME)
+    expected = [
+        min((int(a) * (h % prime) + int(b)) % prime for h in hashes)
+        for a, b in zip(minhash._A, minhash._B)
+    ]
+    assert minhash.signatures([text])[0].tolist() == expected
@@ -0,0 +1,78 @@
+from search import SearchDocument
+from search import similarity
+from search.similarity import SimilarityIndex, terms
+
+DOCUMENTS = [
+    (1, SearchDocument(name="Rainfall in Europe", keyword=["weather"])),
+    (2, SearchDocument(name="Rainfall in Asia", description="Daily rainfall", keyword=["weather"])),
+    (3, SearchDocument(name="Traffic in Europe", keyword=["cars"])),
+    (4, SearchDocument(name="Car traffic", description="Counted cars", keyword=["cars"])),
+    (5, SearchDocument(name="Unrelated")),
+]
+
+
+def test_terms():
+    document = SearchDocument(name="Rain, rain", description="A storm", keyword=["rain"])
+    assert terms(document) == {"rain": 4, "storm": 1}
+
+
+def test_similar():
+    index = SimilarityIndex.build(DOCUMENTS)
+    assert index.similar(1, k=10) == [2, 3]
+    assert index.similar(1, k=1) == [2]
+    assert index.similar(4, k=10) == [3]
+    assert index.similar(5, k=10) == []
+    assert index.similar(6, k=10) is None
+
+
+def test_add_and_remove():
+    index = SimilarityIndex.build(DOCUMENTS)
+    index.add(6, SearchDocument(name="Daily rainfall in Asia", keyword=["weather"]))
+    assert index.similar(6, k=10) == [2, 1, 3]
+    assert index.similar(1, k=10) == [2, 6, 3]
+
+    index.add(2, SearchDocument(name="Car traffic in Asia", keyword=["cars"]))
+    index.remove(3)
+    assert index.similar(1, k=10) == [6, 2]
+    assert index.similar(4, k=10) == [2]
+
+
+def test_incremental_equals_batch():
+    incremental = SimilarityIndex()
+    for identifier, document in DOCUMENTS:
+        incremental.add(identifier, document)
+    for identifier, _ in DOCUMENTS:
+        assert set(incremental.similar(identifier, k=10)) == set(
+            SimilarityIndex.build(DOCUMENTS).similar(identifier, k=10)
+        )
+
+
+def test_postings_rebuilt_and_frequent_terms_ignored(monkeypatch):
+    monkeypatch.setattr(similarity, "_MAX_UNINDEXED_ROWS", 2)
+    monkeypatch.setattr(similarity, "_MIN_IGNORED_FREQUENCY", 2)
+    index = SimilarityIndex()
+    for identifier in range(10):
+        index.add(identifier, SearchDocument(name=f"dataset number{identifier // 2}"))
+    assert index.similar(4, k=10) == [5]
+    assert index.similar(9, k=10) == [8]
+
+
+def test_build_in_batches(monkeypatch):
+    expected = {
+        identifier: SimilarityIndex.build(DOCUMENTS).similar(identifier, k=10)
+        for identifier, _ in DOCUMENTS
+    }
+    monkeypatch.setattr(similarity, "_BATCH_PRODUCTS", 1)
+    index = SimilarityIndex.build(DOCUMENTS)
+    assert {identifier: index.similar(identifier, k=10) for identifier, _ in DOCUMENTS} == expected
+
+
+def test_long_postings_ignored(monkeypatch):
+    monkeypatch.setattr(similarity, "MAX_POSTINGS", 2)
+    documents = [
+        (identifier, SearchDocument(name=f"dataset number{identifier // 2}"))
+        for identifier in range(10)
+    ]
+    index = SimilarityIndex.build(documents)
+    assert index.similar(4, k=10) == [5]
+    assert index.similar(9, k=10) == [8]
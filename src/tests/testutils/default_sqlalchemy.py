@@ -10,9 +10,13 @@ from sqlalchemy.engine import Engine
 from sqlmodel import create_engine, SQLModel, Session
 from starlette.testclient import TestClient
 
+from cache import response_cache
+from database import resource_counts
 from database.model.platform.platform import Platform
 from database.model.platform.platform_names import PlatformName
+from database.vocabularies import vocabularies
 from main import add_routes
+from search import facet_indexes, search_builds, search_index, similarity_indexes
 from tests.testutils.test_resource import RouterTestResource, test_resource_factory
 
 
@@ -33,7 +37,15 @@ def clear_db(request):
     """
     This fixture will be used by every test and checks if the test uses an engine.
     If it does, it deletes the content of the database, so the test has a fresh db to work with.
+    The response cache and the in-memory indexes are always cleared.
     """
+    response_cache.clear()
+    search_index.clear()
+    search_builds.clear()
+    facet_indexes.clear()
+    vocabularies.clear()
+    similarity_indexes.clear()
+    resource_counts.forget_initialized()
 
     for engine_name in ("engine", "engine_test_resource", "engine_test_resource_filled"):
         if engine_name in request.fixturenames:
@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 from starlette.testclient import TestClient
 
 from authentication import keycloak_openid
+from cache import response_cache
 from database.model.ai_asset.ai_asset_table import AIAssetTable
 from database.model.dataset.dataset import Dataset
 from tests.testutils.paths import path_test_resources
@@ -99,3 +100,90 @@ def test_repo_already_exists(client: TestClient, engine: Engine, mocked_privileg
 
 
 # TODO: tests some error handling?
+
+
+def _upload(client: TestClient, identifier: int):
+    with open(path_test_resources() / "uploaders" / "huggingface" / "example.csv", "rb") as f:
+        files = {"file": f.read()}
+    with responses.RequestsMock() as mocked_requests:
+        mocked_requests.add(
+            responses.POST,
+            "https://huggingface.co/api/repos/create",
+            json={"url": "url"},
+            status=200,
+        )
+        huggingface_hub.upload_file = Mock(return_value=None)
+        response = client.post(
+            f"/upload/datasets/{identifier}/huggingface",
+            params={"username": "Fake-username", "token": "Fake-token"},
+            headers={"Authorization": "Fake token"},
+            files=files,
+        )
+    assert response.status_code == 200, response.json()
+
+
+def test_upload_visible_on_read(
+    client: TestClient, engine: Engine, mocked_privileged_token: Mock, dataset: Dataset
+):
+    keycloak_openid.userinfo = mocked_privileged_token
+    name = "".join(c if c.isalnum() else "_" for c in dataset.name)
+    with Session(engine) as session:
+        session.add(dataset)
+        session.commit()
+    before = client.get("/datasets/v1/1").json()  # Stores the document
+
+    _upload(client, 1)
+    after = client.get("/datasets/v1/1").json()
+    assert [d["name"] for d in after["distribution"]] == [
+        d["name"] for d in before["distribution"]
+    ] + [f"Fake-username/{name}"]
+    assert after["aiod_entry"]["date_modified"] > before["aiod_entry"]["date_modified"]
+
+
+def test_upload_changes_etag(
+    client: TestClient, engine: Engine, mocked_privileged_token: Mock, dataset: Dataset
+):
+    keycloak_openid.userinfo = mocked_privileged_token
+    with Session(engine) as session:
+        session.add(dataset)
+        session.commit()
+    etag = client.get("/datasets/v1/1").headers["etag"]
+    response = client.get("/datasets/v1/1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    _upload(client, 1)
+    response = client.get("/datasets/v1/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_upload_invalidates_cache(
+    client: TestClient, engine: Engine, mocked_privileged_token: Mock, dataset: Dataset
+):
+    keycloak_openid.userinfo = mocked_privileged_token
+    with Session(engine) as session:
+        session.add(dataset)
+        session.commit()
+    (before,) = client.get("/datasets/v1").json()
+    client.get("/datasets/v1")
+    assert response_cache.statistics()["hits"] == 1
+
+    _upload(client, 1)
+    (after,) = client.get("/datasets/v1").json()
+    assert len(after["distribution"]) == len(before["distribution"]) + 1
+    assert response_cache.statistics()["hits"] == 1
+
+
+def test_upload_logged_as_change(
+    client: TestClient, engine: Engine, mocked_privileged_token: Mock, dataset: Dataset
+):
+    keycloak_openid.userinfo = mocked_privileged_token
+    with Session(engine) as session:
+        session.add(dataset)
+        session.commit()
+
+    _upload(client, 1)
+    (change,) = client.get("/changes/v1").json()["changes"]
+    assert (change["type"], change["identifier"], change["operation"]) == ("dataset", 1, "update")
+    date_modified = client.get("/datasets/v1/1").json()["aiod_entry"]["date_modified"]
+    assert change["date_modified"] == date_modified
@@ -7,11 +7,13 @@ from sqlalchemy.orm import joinedload
 from sqlmodel import Session
 
 from database.model.dataset.dataset import Dataset
+from routers.resource_router import ResourceRouter
 from .utils import huggingface_license_identifiers
 
 
 def handle_upload(
     engine: Engine,
+    dataset_router: ResourceRouter,
     identifier: int,
     file: UploadFile,
     token: str,
@@ -62,7 +64,7 @@ def handle_upload(
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=msg)
 
     if not any(data.name == repo_id for data in dataset.distribution):
-        _store_resource_updated(engine, dataset, url, repo_id)
+        _store_resource_updated(engine, dataset_router, identifier, url, repo_id)
 
     return dataset.identifier
 
@@ -75,27 +77,37 @@ def _get_resource(engine: Engine, identifier: int) -> Dataset:
     with Session(engine) as session:
         query = (
             session.query(Dataset)
-            .options(joinedload(Dataset.keyword), joinedload(Dataset.distribution))
+            .options(
+                joinedload(Dataset.keyword),
+                joinedload(Dataset.distribution),
+                joinedload(Dataset.license),
+            )
             .filter(Dataset.identifier == identifier)
         )
-
-    resource = query.first()
+        resource = query.first()
     if not resource:
         msg = f"Dataset '{identifier} not found in the database."
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=msg)
     return resource
 
 
-def _store_resource_updated(engine: Engine, resource: Dataset, url: str, repo_id: str):
+def _store_resource_updated(
+    engine: Engine, dataset_router: ResourceRouter, identifier: int, url: str, repo_id: str
+):
+    """Add the distribution to the dataset, as an update through the dataset router"""
+
+    def add_distribution(resource: Dataset):
+        # Hack to get the right DistributionORM class (for each class, such as Dataset
+        # and Publication, there is a different DistributionORM table).
+        dist = resource.RelationshipConfig.distribution.deserializer.clazz  # type: ignore
+        resource.distribution.append(dist(content_url=url, name=repo_id))
+
     with Session(engine) as session:
         try:
-            # Hack to get the right DistributionORM class (for each class, such as Dataset
-            # and Publication, there is a different DistributionORM table).
-            dist = resource.RelationshipConfig.distribution.deserializer.clazz  # type: ignore
-            distribution = dist(content_url=url, name=repo_id, dataset=resource)
-            resource.distribution.append(distribution)
-            session.merge(resource)
-            session.commit()
+            resource = dataset_router._retrieve_resource(session, identifier)
+            dataset_router.update_resource(session, resource, add_distribution)
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_502_BAD_GATEWAY,